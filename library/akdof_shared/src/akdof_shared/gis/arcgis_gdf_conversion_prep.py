@@ -1,5 +1,7 @@
 from dataclasses import dataclass
-from typing import Iterable
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Iterable, Literal, Mapping
 import json
 import logging
 from pathlib import Path
@@ -7,6 +9,18 @@ from pathlib import Path
 import geopandas as gpd
 import pandas as pd
 
+DEFAULT_CONFIG_IGNORE: tuple[str, ...] = ("OBJECTID", "GlobalID", "Shape__Area", "Shape__Length")
+"""System-maintained field names that are ignored by default when formatting a GeoDataFrame for a target hosted feature layer."""
+
+DtypeBackend = Literal["numpy_nullable", "pyarrow"]
+"""
+Pandas data type backend to use for formatted columns, following the `dtype_backend` convention of Pandas I/O functions.
+"numpy_nullable" uses NumPy-backed nullable types (`string`, `Int32`, `Int64`, `float64`).
+"pyarrow" uses Arrow-backed types (`string[pyarrow]`, `int32[pyarrow]`, `int64[pyarrow]`, `double[pyarrow]`), and requires the optional `pyarrow` dependency.
+"""
+
+class SchemaPlanMismatch(Exception): pass
+
 @dataclass
 class FieldDefinition:
     """Represents a field definition from an ArcGIS Online hosted feature layer JSON schema"""
@@ -43,6 +57,68 @@ class ArcGisTargetLayerConfig:
         with open(json_path) as f:
             data = json.load(f)
         return cls._from_dict(data)
+
+    @classmethod
+    def load_plan(
+        cls,
+        json_path: Path,
+        config_ignore: Iterable[str] | None = DEFAULT_CONFIG_IGNORE,
+        dtype_backend: DtypeBackend = "numpy_nullable",
+        resource_info: dict | None = None
+    ) -> "ArcGisSchemaPlan":
+        """
+        Load the `ArcGisTargetLayerConfig` from a locally saved JSON file and compile it to an `ArcGisSchemaPlan`.
+        Compiled plans are cached by file path and modification time, so repeated calls only re-read the file after it changes.
+
+        Parameters
+        ----------
+        json_path : Path
+            Locally saved JSON file for the target layer configuration
+        config_ignore : Iterable[str] | None, optional
+            Field names in the configuration to ignore, by default ("OBJECTID", "GlobalID", "Shape__Area", "Shape__Length")
+        dtype_backend : DtypeBackend, optional
+            Pandas data type backend the plan will convert columns to, by default "numpy_nullable"
+        resource_info : dict | None, optional
+            Resource info of the live target layer. If provided, the compiled plan is validated against it, by default None
+
+        Returns
+        -------
+        ArcGisSchemaPlan
+            Cached, immutable schema plan
+
+        Raises
+        ------
+        SchemaPlanMismatch
+            `resource_info` was provided and the live layer does not match the compiled plan.
+        """
+        json_path = Path(json_path).resolve()
+        plan = _load_cached_schema_plan(
+            json_path=str(json_path),
+            mtime_ns=json_path.stat().st_mtime_ns,
+            config_ignore=tuple(config_ignore or tuple()),
+            dtype_backend=dtype_backend
+        )
+        if resource_info is not None:
+            plan.validate_resource_info(resource_info)
+        return plan
+
+    def compile(
+        self,
+        config_ignore: Iterable[str] | None = DEFAULT_CONFIG_IGNORE,
+        dtype_backend: DtypeBackend = "numpy_nullable"
+    ) -> "ArcGisSchemaPlan":
+        """Compile the `ArcGisTargetLayerConfig` to an immutable `ArcGisSchemaPlan`"""
+        config_ignore = frozenset(config_ignore or tuple())
+        fields = [field for field in self.fields if field.name not in config_ignore]
+        return ArcGisSchemaPlan(
+            url=self.url,
+            columns=tuple(field.name for field in fields),
+            esri_types=MappingProxyType({field.name: field.type for field in fields}),
+            pd_types=MappingProxyType({field.name: _esri_field_type_to_pd(field.type, dtype_backend) for field in fields}),
+            field_lengths=MappingProxyType({field.name: field.length for field in fields if field.length is not None}),
+            ignored_fields=config_ignore,
+            dtype_backend=dtype_backend
+        )
    
     @classmethod
     def _from_dict(cls, data: dict):
@@ -50,10 +126,70 @@ class ArcGisTargetLayerConfig:
         fields = [FieldDefinition(**field_data) for field_data in data["fields"]]
         return cls(url=data["url"], fields=fields)
 
+@dataclass(frozen=True)
+class ArcGisSchemaPlan:
+    """
+    Immutable formatting plan compiled from an `ArcGisTargetLayerConfig`.
+    Everything `format_gdf_using_arcgis_config()` needs is resolved once at compile time, so a single plan can be reused across calls.
+
+    Attributes
+    -------
+    url : str
+        URL endpoint for the target hosted feature layer
+    columns : tuple[str, ...]
+        Ordered names of the fields that will be written to the target hosted feature layer
+    esri_types : Mapping[str, str]
+        ESRI field type for each column
+    pd_types : Mapping[str, str]
+        Pandas data type for each column
+    field_lengths : Mapping[str, int]
+        Maximum value length for each column that specifies one
+    ignored_fields : frozenset[str]
+        Field names from the target layer configuration that were left out of the plan
+    dtype_backend : DtypeBackend
+        Pandas data type backend used by `pd_types`
+    """
+    url: str
+    columns: tuple[str, ...]
+    esri_types: Mapping[str, str]
+    pd_types: Mapping[str, str]
+    field_lengths: Mapping[str, int]
+    ignored_fields: frozenset[str]
+    dtype_backend: DtypeBackend = "numpy_nullable"
+
+    def validate_resource_info(self, resource_info: dict) -> None:
+        """
+        Validate the plan against resource info of the live target hosted feature layer.
+
+        Raises
+        ------
+        SchemaPlanMismatch
+            A planned column is missing from the live layer, or its field type or length differs from the live layer.
+        """
+        live_fields = {field["name"]: field for field in resource_info.get("fields", list())}
+        mismatches = list()
+        for c in self.columns:
+            live_field = live_fields.get(c)
+            if live_field is None:
+                mismatches.append(f"'{c}' not found in live layer")
+                continue
+            if live_field.get("type") != self.esri_types[c]:
+                mismatches.append(f"'{c}' has type {live_field.get('type')} in live layer, planned {self.esri_types[c]}")
+            if live_field.get("length") != self.field_lengths.get(c, live_field.get("length")):
+                mismatches.append(f"'{c}' has length {live_field.get('length')} in live layer, planned {self.field_lengths[c]}")
+        if mismatches:
+            raise SchemaPlanMismatch(f"Schema plan for {self.url} does not match the live layer: {'; '.join(mismatches)}")
+
+@lru_cache(maxsize=32)
+def _load_cached_schema_plan(json_path: str, mtime_ns: int, config_ignore: tuple[str, ...], dtype_backend: DtypeBackend) -> ArcGisSchemaPlan:
+    """Cache entries are keyed on `mtime_ns` so that edits to the JSON file produce a freshly compiled plan"""
+    return ArcGisTargetLayerConfig.load(Path(json_path)).compile(config_ignore=config_ignore, dtype_backend=dtype_backend)
+
 def format_gdf_using_arcgis_config(
     gdf: gpd.GeoDataFrame,
-    target_layer_config: ArcGisTargetLayerConfig,
-    config_ignore: Iterable[str] | None = ("OBJECTID", "GlobalID", "Shape__Area", "Shape__Length"),
+    target_layer_config: ArcGisTargetLayerConfig | ArcGisSchemaPlan,
+    config_ignore: Iterable[str] | None = DEFAULT_CONFIG_IGNORE,
+    dtype_backend: DtypeBackend = "numpy_nullable",
     logger: logging.Logger | None = None
 ) -> gpd.GeoDataFrame:
     """
@@ -66,10 +202,16 @@ def format_gdf_using_arcgis_config(
     ----------
     gdf : gpd.GeoDataFrame
         GDF which will be formatted according to `target_layer_config`
-    target_layer_config : ArcGisTargetLayerConfig
-        Configuration to inform data type conversions and/or formatting applied to a GeoDataFrame
+    target_layer_config : ArcGisTargetLayerConfig | ArcGisSchemaPlan
+        Configuration to inform data type conversions and/or formatting applied to a GeoDataFrame.
+        Passing a precompiled `ArcGisSchemaPlan` avoids recompiling the configuration on every call.
     config_ignore : Iterable[str] | None, optional
-        Field names in the `target_layer_config` field definitions to ignore, by default ("OBJECTID", "GlobalID", "Shape__Area", "Shape__Length")
+        Field names in the `target_layer_config` field definitions to ignore, by default ("OBJECTID", "GlobalID", "Shape__Area", "Shape__Length").
+        Not used when `target_layer_config` is an `ArcGisSchemaPlan`, which already records its ignored fields.
+    dtype_backend : DtypeBackend, optional
+        Pandas data type backend for formatted columns, by default "numpy_nullable".
+        "pyarrow" keeps string-heavy attributes in Arrow memory, so truncation and other string operations run in native code.
+        Not used when `target_layer_config` is an `ArcGisSchemaPlan`, which already records its data type backend.
     logger : Logger | None, optional
         Logger used to record field truncation warnings
         
@@ -78,9 +220,12 @@ def format_gdf_using_arcgis_config(
     gpd.GeoDataFrame
         Formatted GDF
     """
-    config_ignore = config_ignore or tuple()
-    columns_to_keep = [field.name for field in target_layer_config.fields if field.name not in config_ignore]
-    columns_to_keep.append(gdf.geometry.name)
+    if isinstance(target_layer_config, ArcGisSchemaPlan):
+        schema_plan = target_layer_config
+    else:
+        schema_plan = target_layer_config.compile(config_ignore=config_ignore, dtype_backend=dtype_backend)
+
+    columns_to_keep = [*schema_plan.columns, gdf.geometry.name]
 
     for c in columns_to_keep:
         if c not in gdf.columns:
@@ -89,28 +234,27 @@ def format_gdf_using_arcgis_config(
 
     gdf = _convert_gdf_column_types_to_match_arcgis_field_types(
         gdf=gdf,
-        target_layer_config=target_layer_config
+        schema_plan=schema_plan
     )
     gdf = _truncate_gdf_column_values_to_match_arcgis_field_length(
         gdf=gdf,
-        target_layer_config=target_layer_config,
+        schema_plan=schema_plan,
         logger=logger
     )
     return gdf
 
 def _convert_gdf_column_types_to_match_arcgis_field_types(
     gdf: gpd.GeoDataFrame,
-    target_layer_config: ArcGisTargetLayerConfig
+    schema_plan: ArcGisSchemaPlan
 ) -> gpd.GeoDataFrame:
-    """Converts GDF column data types to match associated fields in the target layer configuration"""
-    field_types = {field.name: field.type for field in target_layer_config.fields}
+    """Converts GDF column data types to match associated fields in the target layer schema plan"""
     for c in gdf.columns:
         if c == gdf.geometry.name:
             continue
-        esri_type = field_types[c]
-        pd_type = _esri_field_type_to_pd(esri_type)
+        esri_type = schema_plan.esri_types[c]
+        pd_type = schema_plan.pd_types[c]
         try:
-            if pd_type in ["Int32", "Int64", "float64"]:
+            if esri_type in _NUMERIC_ESRI_FIELD_TYPES:
                 converted = pd.to_numeric(gdf[c], errors="coerce").astype(pd_type)
             else:
                 converted = gdf[c].astype(pd_type)
@@ -122,16 +266,16 @@ def _convert_gdf_column_types_to_match_arcgis_field_types(
         
 def _truncate_gdf_column_values_to_match_arcgis_field_length(
     gdf: gpd.GeoDataFrame,
-    target_layer_config: ArcGisTargetLayerConfig,
+    schema_plan: ArcGisSchemaPlan,
     logger: logging.Logger | None = None
 ) -> gpd.GeoDataFrame:
     """Truncates column values which once converted to JSON attributes would cause a feature layer edit operation to fail due to length requirements"""
-    field_lengths = {field.name: field.length for field in target_layer_config.fields if field.length is not None}
+    field_lengths = schema_plan.field_lengths
     for c in gdf.columns:
         if c not in field_lengths:
             continue
         max_length_raw = gdf[c].str.len().max()
-        gdf[c] = gdf[c].apply(lambda x: x[:field_lengths[c]] if pd.notna(x) else x)
+        gdf[c] = gdf[c].str.slice(stop=field_lengths[c])
         max_length_truncated = gdf[c].str.len().max()
         if (pd.notna(max_length_raw) and pd.notna(max_length_truncated)) and (max_length_raw != max_length_truncated) and logger:
             logger.warning(f"One or more values in column '{c}' were truncated to satisfy target layer field length requirements")
@@ -139,17 +283,30 @@ def _truncate_gdf_column_values_to_match_arcgis_field_length(
             logger.info(f"After truncation, the maximum value length in column '{c}' is {max_length_truncated} characters")
     return gdf
 
-def _esri_field_type_to_pd(field_type: str) -> str:
+_NUMERIC_ESRI_FIELD_TYPES: frozenset[str] = frozenset(("esriFieldTypeInteger", "esriFieldTypeBigInteger", "esriFieldTypeDouble"))
+
+def _esri_field_type_to_pd(field_type: str, dtype_backend: DtypeBackend = "numpy_nullable") -> str:
     """
     Matches common ESRI field type string identifiers to corresponding Pandas data type string identifiers.
     Intended to fail fast if an unplanned for ESRI field type is encountered. Additional mappings can be added on an as-needed basis. 
     """
-    field_type_map = {
-        "esriFieldTypeString": "string",
-        "esriFieldTypeInteger": "Int32",
-        "esriFieldTypeBigInteger": "Int64",
-        "esriFieldTypeDouble": "float64",
+    field_type_maps = {
+        "numpy_nullable": {
+            "esriFieldTypeString": "string",
+            "esriFieldTypeInteger": "Int32",
+            "esriFieldTypeBigInteger": "Int64",
+            "esriFieldTypeDouble": "float64",
+        },
+        "pyarrow": {
+            "esriFieldTypeString": "string[pyarrow]",
+            "esriFieldTypeInteger": "int32[pyarrow]",
+            "esriFieldTypeBigInteger": "int64[pyarrow]",
+            "esriFieldTypeDouble": "double[pyarrow]",
+        },
     }
+    if dtype_backend not in field_type_maps:
+        raise ValueError(f"Invalid argument: {dtype_backend}. Accepted values are 'numpy_nullable' or 'pyarrow'.")
+    field_type_map = field_type_maps[dtype_backend]
     if field_type not in field_type_map:
         raise ValueError(f"Preferred Pandas data type to match with ESRI field type '{field_type}' has not been defined")
     return field_type_map[field_type]
\ No newline at end of file
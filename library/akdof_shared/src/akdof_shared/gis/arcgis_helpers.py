@@ -158,4 +158,25 @@ def create_envelope_around_point(arcgis_point_geometry: dict, expansion_distance
         "xmax": x + expansion_distance,
         "ymax": y + expansion_distance,
     }
-    return envelope
\ No newline at end of file
+    return envelope
+
+def split_envelope(envelope: dict, rows: int, columns: int) -> list[dict]:
+    """
+    Split an ArcGIS json [envelope](https://developers.arcgis.com/rest/services-reference/enterprise/geometry-objects/#envelope) into a grid of `rows` by `columns` envelope tiles.
+    Neighboring tiles share their edges, and each tile keeps the `spatialReference` of the original envelope.
+    """
+    xmin, ymin, xmax, ymax = (float(envelope[coord]) for coord in ("xmin", "ymin", "xmax", "ymax"))
+    width, height = (xmax - xmin) / columns, (ymax - ymin) / rows
+    tiles = list()
+    for row in range(rows):
+        for column in range(columns):
+            tile = {
+                "xmin": xmin + column * width,
+                "ymin": ymin + row * height,
+                "xmax": xmax if column == columns - 1 else xmin + (column + 1) * width,
+                "ymax": ymax if row == rows - 1 else ymin + (row + 1) * height,
+            }
+            if "spatialReference" in envelope:
+                tile["spatialReference"] = envelope["spatialReference"]
+            tiles.append(tile)
+    return tiles
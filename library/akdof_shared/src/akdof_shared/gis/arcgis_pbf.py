@@ -0,0 +1,393 @@
+"""
+Decoder for ArcGIS REST API query responses requested with `f=pbf`.
+
+Responses follow the `esriPBuffer.FeatureCollectionPBuffer` message of Esri's FeatureCollection.proto.
+Protocol buffer messages are read directly from the wire format, so no generated code or `protobuf` dependency is required.
+Quantized geometry coordinates for a whole page are decoded as a single set of numpy arrays, then split back into features.
+"""
+
+import struct
+from typing import Any, Iterator
+
+import numpy as np
+
+from akdof_shared.gis.arcgis_quantization import quantization_decimals
+
+class PbfDecodeError(Exception): pass
+
+_GEOMETRY_TYPES: dict[int, str] = {
+    0: "esriGeometryPoint",
+    1: "esriGeometryMultipoint",
+    2: "esriGeometryPolyline",
+    3: "esriGeometryPolygon",
+    4: "esriGeometryMultiPatch",
+    127: "esriGeometryNull",
+}
+
+_FIELD_TYPES: dict[int, str] = {
+    0: "esriFieldTypeSmallInteger",
+    1: "esriFieldTypeInteger",
+    2: "esriFieldTypeSingle",
+    3: "esriFieldTypeDouble",
+    4: "esriFieldTypeString",
+    5: "esriFieldTypeDate",
+    6: "esriFieldTypeOID",
+    7: "esriFieldTypeGeometry",
+    8: "esriFieldTypeBlob",
+    9: "esriFieldTypeRaster",
+    10: "esriFieldTypeGUID",
+    11: "esriFieldTypeGlobalID",
+    12: "esriFieldTypeXML",
+    13: "esriFieldTypeBigInteger",
+    14: "esriFieldTypeDateOnly",
+    15: "esriFieldTypeTimeOnly",
+    16: "esriFieldTypeTimestampOffset",
+}
+
+def decode_feature_collection_pbf(content: bytes) -> dict:
+    """
+    Decode a `f=pbf` query response into the same structure as a `f=json` query response.
+
+    Parameters
+    ----------
+    content : bytes
+        Response body of a feature layer query using `f=pbf`
+
+    Returns
+    -------
+    dict
+        ArcGIS JSON. Feature queries have `features`, `fields`, `geometryType`, and `spatialReference` properties.
+        Count and object ID queries have `count`, or `objectIdFieldName` and `objectIds` properties.
+
+    Raises
+    ------
+    PbfDecodeError
+        `content` is not a valid FeatureCollectionPBuffer message.
+    """
+    try:
+        buf = memoryview(content)
+        query_result = None
+        for field_number, _, value in _iter_fields(buf):
+            if field_number == 2:
+                query_result = value
+        if query_result is None:
+            raise PbfDecodeError("FeatureCollectionPBuffer message has no queryResult")
+
+        for field_number, _, value in _iter_fields(query_result):
+            if field_number == 1:
+                return _decode_feature_result(value)
+            if field_number == 2:
+                return {"count": next((v for n, _, v in _iter_fields(value) if n == 1), 0)}
+            if field_number == 3:
+                return _decode_object_ids_result(value)
+    except (IndexError, struct.error, UnicodeDecodeError, ValueError) as e:
+        raise PbfDecodeError(f"Invalid FeatureCollectionPBuffer message: {e}") from e
+    raise PbfDecodeError("FeatureCollectionPBuffer queryResult has no featureResult, countResult, or idsResult")
+
+def _decode_feature_result(buf: memoryview) -> dict:
+    arcgis_json: dict[str, Any] = dict()
+    fields = list()
+    feature_messages = list()
+    geometry_type_code = 0
+    transform = {"origin": 0, "scale": (1.0, 1.0, 1.0, 1.0), "translate": (0.0, 0.0, 0.0, 0.0)}
+    has_z = has_m = False
+
+    for field_number, _, value in _iter_fields(buf):
+        if field_number == 1:
+            arcgis_json["objectIdFieldName"] = _string(value)
+        elif field_number == 2:
+            unique_id_field = {"name": "", "isSystemMaintained": False}
+            for n, _, v in _iter_fields(value):
+                if n == 1:
+                    unique_id_field["name"] = _string(v)
+                elif n == 2:
+                    unique_id_field["isSystemMaintained"] = bool(v)
+            arcgis_json["uniqueIdField"] = unique_id_field
+        elif field_number == 3:
+            arcgis_json["globalIdFieldName"] = _string(value)
+        elif field_number == 7:
+            geometry_type_code = value
+        elif field_number == 8:
+            arcgis_json["spatialReference"] = _decode_spatial_reference(value)
+        elif field_number == 9:
+            arcgis_json["exceededTransferLimit"] = bool(value)
+        elif field_number == 10:
+            has_z = bool(value)
+        elif field_number == 11:
+            has_m = bool(value)
+        elif field_number == 12:
+            transform = _decode_transform(value)
+        elif field_number == 13:
+            fields.append(_decode_field(value))
+        elif field_number == 15:
+            feature_messages.append(value)
+
+    geometry_type = _GEOMETRY_TYPES.get(geometry_type_code, "esriGeometryNull")
+    if geometry_type != "esriGeometryNull":
+        arcgis_json["geometryType"] = geometry_type
+    if has_z:
+        arcgis_json["hasZ"] = True
+    if has_m:
+        arcgis_json["hasM"] = True
+    arcgis_json["fields"] = fields
+    if not arcgis_json.get("exceededTransferLimit", False):
+        arcgis_json.pop("exceededTransferLimit", None)
+
+    field_names = [field["name"] for field in fields]
+    attributes = list()
+    geometry_lengths: list[list[int] | None] = list()
+    coords_chunks = list()
+    for message in feature_messages:
+        values = list()
+        lengths = None
+        for n, _, v in _iter_fields(message):
+            if n == 1:
+                values.append(_decode_value(v))
+            elif n == 2:
+                lengths, coords = _decode_geometry(v)
+                coords_chunks.append(coords)
+        attributes.append(dict(zip(field_names, values)))
+        geometry_lengths.append(lengths)
+
+    dims = 2 + has_z + has_m
+    geometries = _dequantize_geometries(geometry_lengths, b"".join(coords_chunks), dims, transform, has_z, has_m)
+    features = list()
+    for feature_attributes, lengths in zip(attributes, geometry_lengths):
+        feature = {"attributes": feature_attributes}
+        if lengths is not None:
+            feature["geometry"] = _esri_geometry(geometry_type, next(geometries))
+        features.append(feature)
+    arcgis_json["features"] = features
+
+    return arcgis_json
+
+def _decode_object_ids_result(buf: memoryview) -> dict:
+    arcgis_json: dict[str, Any] = {"objectIds": list()}
+    for n, wire_type, v in _iter_fields(buf):
+        if n == 1:
+            arcgis_json["objectIdFieldName"] = _string(v)
+        elif n == 3:
+            if wire_type == 2:
+                arcgis_json["objectIds"].extend(_decode_packed_varints(bytes(v)).tolist())
+            else:
+                arcgis_json["objectIds"].append(v)
+    return arcgis_json
+
+def _decode_spatial_reference(buf: memoryview) -> dict:
+    spatial_reference = dict()
+    for n, _, v in _iter_fields(buf):
+        if n == 1:
+            spatial_reference["wkid"] = v
+        elif n == 2:
+            spatial_reference["latestWkid"] = v
+        elif n == 3:
+            spatial_reference["vcsWkid"] = v
+        elif n == 4:
+            spatial_reference["latestVcsWkid"] = v
+        elif n == 5:
+            spatial_reference["wkt"] = _string(v)
+    return spatial_reference
+
+def _decode_transform(buf: memoryview) -> dict:
+    origin = 0
+    scale = [1.0, 1.0, 1.0, 1.0]
+    translate = [0.0, 0.0, 0.0, 0.0]
+    for n, _, v in _iter_fields(buf):
+        if n == 1:
+            origin = v
+        elif n in (2, 3):
+            target = scale if n == 2 else translate
+            # Scale and Translate messages list x, y, m, z in that order
+            for component, _, component_value in _iter_fields(v):
+                target[component - 1] = struct.unpack("<d", component_value)[0]
+    return {"origin": origin, "scale": tuple(scale), "translate": tuple(translate)}
+
+def _decode_field(buf: memoryview) -> dict:
+    field = {"name": "", "type": _FIELD_TYPES[0], "alias": ""}
+    for n, _, v in _iter_fields(buf):
+        if n == 1:
+            field["name"] = _string(v)
+        elif n == 2:
+            field["type"] = _FIELD_TYPES.get(v, f"esriFieldType{v}")
+        elif n == 3:
+            field["alias"] = _string(v)
+    return field
+
+def _decode_value(buf: memoryview) -> Any:
+    for n, _, v in _iter_fields(buf):
+        if n == 1:
+            return _string(v)
+        if n == 2:
+            return struct.unpack("<f", v)[0]
+        if n == 3:
+            return struct.unpack("<d", v)[0]
+        if n in (4, 8):
+            return _zigzag(v)
+        if n in (5, 7):
+            return v
+        if n == 6:
+            return v - (1 << 64) if v >= (1 << 63) else v
+        if n == 9:
+            return bool(v)
+    return None
+
+def _decode_geometry(buf: memoryview) -> tuple[list[int], bytes]:
+    """Returns the vertex count of each part, and the packed zigzag encoded coordinate deltas"""
+    lengths = list()
+    coords = list()
+    for n, wire_type, v in _iter_fields(buf):
+        if n == 2:
+            if wire_type == 2:
+                # part counts are short, where a python loop beats the overhead of numpy calls
+                pos = 0
+                while pos < len(v):
+                    length, pos = _read_varint(v, pos)
+                    lengths.append(length)
+            else:
+                lengths.append(v)
+        elif n == 3:
+            if wire_type == 2:
+                coords.append(bytes(v))
+            else:
+                coords.append(_encode_varint(v))
+    return lengths, b"".join(coords)
+
+def _dequantize_geometries(
+    geometry_lengths: list[list[int] | None],
+    coords: bytes,
+    dims: int,
+    transform: dict,
+    has_z: bool,
+    has_m: bool
+) -> Iterator[list[list[list[float]]]]:
+    """
+    Dequantize the coordinates of every geometry on a page at once, and yield the parts of each geometry in order.
+    Coordinates are deltas from the previous vertex of the same part, and the first vertex of each part is relative to the transform origin.
+    """
+    quantized = _zigzag_array(_decode_packed_varints(coords)).reshape(-1, dims)
+
+    part_lengths = list()
+    for lengths in geometry_lengths:
+        if lengths is None:
+            continue
+        # points do not list part lengths, and are a single part with a single vertex
+        part_lengths.extend(lengths or [1])
+    part_lengths_array = np.asarray(part_lengths, dtype=np.int64)
+    if part_lengths_array.sum() != len(quantized):
+        raise PbfDecodeError(f"Geometry part lengths sum to {part_lengths_array.sum()} vertices, but {len(quantized)} vertices were decoded")
+
+    cumulative = np.cumsum(quantized, axis=0)
+    part_starts = np.concatenate(([0], np.cumsum(part_lengths_array)[:-1]))
+    part_offsets = np.zeros((len(part_lengths_array), dims), dtype=np.int64)
+    nonzero_starts = part_starts > 0
+    part_offsets[nonzero_starts] = cumulative[part_starts[nonzero_starts] - 1]
+    absolute = cumulative - np.repeat(part_offsets, part_lengths_array, axis=0)
+
+    scale_x, scale_y, scale_m, scale_z = transform["scale"]
+    translate_x, translate_y, translate_m, translate_z = transform["translate"]
+    columns = [translate_x + absolute[:, 0] * scale_x]
+    # origin 0 is upperLeft, where quantized y values increase downwards
+    columns.append(translate_y - absolute[:, 1] * scale_y if transform["origin"] == 0 else translate_y + absolute[:, 1] * scale_y)
+    scales = [scale_x, scale_y]
+    if has_z:
+        columns.append(translate_z + absolute[:, 2] * scale_z)
+        scales.append(scale_z)
+    if has_m:
+        columns.append(translate_m + absolute[:, dims - 1] * scale_m)
+        scales.append(scale_m)
+    vertices = np.column_stack([np.round(column, quantization_decimals(s)) for column, s in zip(columns, scales)]).tolist()
+
+    part_index = 0
+    vertex_index = 0
+    for lengths in geometry_lengths:
+        if lengths is None:
+            continue
+        parts = list()
+        for _ in range(max(len(lengths), 1)):
+            part_length = part_lengths[part_index]
+            parts.append(vertices[vertex_index: vertex_index + part_length])
+            vertex_index += part_length
+            part_index += 1
+        yield parts
+
+def _esri_geometry(geometry_type: str, parts: list[list[list[float]]]) -> dict:
+    if geometry_type == "esriGeometryPoint":
+        vertex = parts[0][0]
+        geometry = {"x": vertex[0], "y": vertex[1]}
+        if len(vertex) > 2:
+            geometry["z"] = vertex[2]
+        return geometry
+    if geometry_type == "esriGeometryMultipoint":
+        return {"points": [vertex for part in parts for vertex in part]}
+    if geometry_type == "esriGeometryPolyline":
+        return {"paths": parts}
+    return {"rings": parts}
+
+def _decode_packed_varints(data: bytes) -> np.ndarray:
+    """Decode concatenated unsigned varints with numpy"""
+    buf = np.frombuffer(data, dtype=np.uint8)
+    if buf.size == 0:
+        return np.empty(0, dtype=np.uint64)
+    ends = np.flatnonzero(buf < 0x80)
+    if ends.size == 0 or ends[-1] != buf.size - 1:
+        raise PbfDecodeError("Packed varints are truncated")
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    shifts = (np.arange(buf.size) - np.repeat(starts, ends - starts + 1)) * 7
+    contributions = (buf & 0x7F).astype(np.uint64) << shifts.astype(np.uint64)
+    return np.bitwise_or.reduceat(contributions, starts)
+
+def _zigzag_array(values: np.ndarray) -> np.ndarray:
+    return (values >> np.uint64(1)).astype(np.int64) ^ -(values & np.uint64(1)).astype(np.int64)
+
+def _zigzag(value: int) -> int:
+    return (value >> 1) ^ -(value & 1)
+
+def _string(buf: memoryview) -> str:
+    return bytes(buf).decode("utf-8")
+
+def _read_varint(buf: memoryview, pos: int) -> tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+def _encode_varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+def _iter_fields(buf: memoryview) -> Iterator[tuple[int, int, Any]]:
+    """Yield ( field number, wire type, value ) for each field of a protocol buffer message"""
+    pos = 0
+    end = len(buf)
+    while pos < end:
+        key, pos = _read_varint(buf, pos)
+        field_number, wire_type = key >> 3, key & 7
+        if wire_type == 0:
+            value, pos = _read_varint(buf, pos)
+        elif wire_type == 1:
+            value = buf[pos: pos + 8]
+            pos += 8
+        elif wire_type == 2:
+            length, pos = _read_varint(buf, pos)
+            value = buf[pos: pos + length]
+            pos += length
+        elif wire_type == 5:
+            value = buf[pos: pos + 4]
+            pos += 4
+        else:
+            raise PbfDecodeError(f"Unsupported protocol buffer wire type {wire_type}")
+        if pos > end:
+            raise PbfDecodeError("Protocol buffer message is truncated")
+        yield field_number, wire_type, value
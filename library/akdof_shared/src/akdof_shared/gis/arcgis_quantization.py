@@ -0,0 +1,64 @@
+import math
+from typing import Literal
+
+def quantization_decimals(scale: float) -> int:
+    """
+    Decimal places used to round away floating point noise from coordinates snapped to a quantization grid with spacing `scale`.
+    Two places beyond the grid spacing are kept, since the grid origin is not necessarily aligned to the spacing.
+    """
+    if scale <= 0:
+        return 0
+    return max(int(math.ceil(-math.log10(scale) - 1e-9)), 0) + 2
+
+def dequantize_arcgis_json(arcgis_json: dict) -> dict:
+    """
+    Convert the geometry of a query response made with `quantizationParameters` back to coordinates of the output spatial reference.
+
+    Quantized responses have a `transform` property, and integer coordinates on the transform's grid.
+    The first vertex of each path or ring is relative to the transform's origin, and every following vertex is relative to the vertex before it.
+    Features are modified in place, and the `transform` property is removed.
+    Responses without a `transform` property are returned unchanged.
+
+    Parameters
+    ----------
+    arcgis_json : dict
+        ArcGIS JSON response from a feature layer query
+
+    Returns
+    -------
+    dict
+        `arcgis_json`, with dequantized geometry
+    """
+    transform = arcgis_json.pop("transform", None)
+    if transform is None:
+        return arcgis_json
+
+    scale_x, scale_y = transform["scale"][:2]
+    translate_x, translate_y = transform["translate"][:2]
+    origin: Literal["upperLeft", "lowerLeft"] = transform.get("originPosition", "upperLeft")
+    direction_y = -1 if origin == "upperLeft" else 1
+    decimals_x, decimals_y = quantization_decimals(scale_x), quantization_decimals(scale_y)
+
+    def _dequantize_part(part: list[list[int]]) -> list[list[float]]:
+        qx = qy = 0
+        vertices = list()
+        for vertex in part:
+            qx += vertex[0]
+            qy += vertex[1]
+            vertices.append([round(translate_x + qx * scale_x, decimals_x), round(translate_y + direction_y * qy * scale_y, decimals_y), *vertex[2:]])
+        return vertices
+
+    for feat in arcgis_json.get("features", list()):
+        geometry = feat.get("geometry")
+        if not geometry:
+            continue
+        if "x" in geometry:
+            geometry["x"] = round(translate_x + geometry["x"] * scale_x, decimals_x)
+            geometry["y"] = round(translate_y + direction_y * geometry["y"] * scale_y, decimals_y)
+        for key in ("rings", "paths"):
+            if key in geometry:
+                geometry[key] = [_dequantize_part(part) for part in geometry[key]]
+        if "points" in geometry:
+            geometry["points"] = _dequantize_part(geometry["points"])
+
+    return arcgis_json
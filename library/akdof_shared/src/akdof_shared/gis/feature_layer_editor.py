@@ -2,12 +2,17 @@ import asyncio
 import json
 from logging import Logger
 import logging
+import time
 
 import aiohttp
 
 from akdof_shared.gis.arcgis_api_validation import validate_arcgis_json
 from akdof_shared.gis.arcgis_helpers import get_feature_count_and_extent, get_object_ids
 from akdof_shared.io.async_requester import AsyncRequester, StatusCodePlanner
+from akdof_shared.io.request_metrics import track_request_metrics
+from akdof_shared.io.run_history import RunHistoryStore, RunRecord
+from akdof_shared.protocol.datetime_info import now_utc_iso
+from akdof_shared.protocol.file_logging_manager import FileLoggingManager
 
 class EditFailureResponse(Exception): pass
 class BatchEditException(Exception): pass
@@ -40,6 +45,8 @@ class FeatureLayerEditor:
         requester: AsyncRequester | None = None,
         deletes_batch_size: int = 5_000,
         adds_batch_size: int = 2_500,
+        run_history: RunHistoryStore | None = None,
+        alias: str | None = None,
     ):
         self.base_url = base_url
         self.token = token
@@ -49,6 +56,8 @@ class FeatureLayerEditor:
         self.requester = requester
         self.deletes_batch_size = deletes_batch_size
         self.adds_batch_size = adds_batch_size
+        self.run_history = run_history
+        self.alias = alias or base_url
 
         if self.feature_deletion_query is None and self.features_to_add is None:
             raise ValueError(f"`feature_deletion_query` and / or `features_to_add` must be provided for FeatureLayerEditor to do any work.")
@@ -72,6 +81,40 @@ class FeatureLayerEditor:
 
     async def apply_edits_with_validation(self) -> dict[str, str | int]:
 
+        if self.run_history is None:
+            return await self._apply_edits_with_validation()
+
+        started_utc, started = now_utc_iso(), time.perf_counter()
+        status, edit_metrics, details = "failed", None, dict()
+        with track_request_metrics() as request_metrics:
+            try:
+                edit_metrics = await self._apply_edits_with_validation()
+                status = "succeeded"
+                return edit_metrics
+            except asyncio.CancelledError:
+                status = "cancelled"
+                raise
+            except Exception as e:
+                details["exception"] = FileLoggingManager.format_exception(e)
+                raise
+            finally:
+                run = RunRecord.from_request_metrics(
+                    request_metrics,
+                    alias=self.alias,
+                    operation="edit",
+                    started_utc=started_utc,
+                    seconds=round(time.perf_counter() - started, 3),
+                    status=status,
+                    feature_count=len(self.features_to_add),
+                    details={**details, **(edit_metrics or dict())}
+                )
+                try:
+                    await asyncio.get_event_loop().run_in_executor(None, self.run_history.record, run)
+                except Exception as e:
+                    self.logger.warning(f"{self.alias}: Unable to record edit run history. {FileLoggingManager.format_exception(e)}")
+
+    async def _apply_edits_with_validation(self) -> dict[str, str | int]:
+
         initial_feature_count, _ = get_feature_count_and_extent(base_url=self.base_url, token=self.token)
         object_ids_to_delete = get_object_ids(base_url=self.base_url, where=self.feature_deletion_query, token=self.token)
         target_feature_count = initial_feature_count - len(object_ids_to_delete) + len(self.features_to_add)
@@ -132,6 +175,8 @@ class FeatureLayerEditor:
             request_method="post",
             read_method="json",
             status_code_plan=self.status_code_planner,
+            operation="edit",
+            label=f"adds={len(features_to_add)} deletes={len(object_ids_to_delete)}",
             data=apply_edits_data,
             timeout=aiohttp.ClientTimeout(total=120)
         )
@@ -1,24 +1,35 @@
 import asyncio
+from contextlib import asynccontextmanager
 from datetime import datetime as dt
 from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import ssl
 
 import json
-from typing import Literal, Iterable, Any
+from typing import Literal, Iterable, Any, Mapping
 import logging
+import math
+from statistics import median
+import time
+import uuid
 
-from pydantic import BaseModel, ConfigDict, Field, HttpUrl
+import aiohttp
+from pydantic import BaseModel, ConfigDict, Field, HttpUrl, PrivateAttr
 import geopandas as gpd
 
+from akdof_shared.gis.arcgis_api_validation import validate_arcgis_json
 from akdof_shared.gis.arcgis_helpers import (
+    NO_CACHE_HEADERS,
     get_feature_layer_resource_info,
-    get_feature_count_and_extent
+    get_feature_count_and_extent,
+    split_envelope
 )
 from akdof_shared.utils.drop_none_vals import drop_none_vals
 from akdof_shared.io.async_requester import AsyncArcGisRequester
 from akdof_shared.gis.spatial_json_conversion import arcgis_json_to_gdf
 from akdof_shared.io.file_cache_manager import FileCacheManager, CacheCompareError
+from akdof_shared.io.request_metrics import track_request_metrics
+from akdof_shared.io.run_history import RunHistoryStore, RunRecord
 from akdof_shared.protocol.datetime_info import now_utc_iso, iso_file_naming
 from akdof_shared.protocol.file_logging_manager import FileLoggingManager
 
@@ -36,6 +47,39 @@ class FeaturesGdf:
         self.spatial_query_parameters = spatial_query_parameters
         self.features_cached_dt = features_cached_dt
     
+class LayerRefreshPlan:
+    """
+    Results of the warm-up requests that precede a feature refresh, gathered concurrently by `InputFeatureLayer.probe()`.
+    Passing a plan to `InputFeatureLayer.refresh_features()` skips its own blocking warm-up requests.
+    """
+    def __init__(self, resource_info: dict, target_feature_count: int, target_extent: dict, object_ids: list[int] | None = None):
+        self.resource_info = resource_info
+        self.target_feature_count = target_feature_count
+        self.target_extent = target_extent
+        self.object_ids = object_ids
+
+class LayerRefreshResult:
+    """Outcome and timing of a single layer refresh run by `InputFeatureLayersConfig.schedule_refresh()`"""
+    def __init__(
+        self,
+        alias: str,
+        status: Literal["refreshed", "failed", "timed_out", "cancelled"],
+        estimated_seconds: float | None,
+        seconds: float | None,
+        exception: BaseException | None = None
+    ):
+        self.alias = alias
+        self.status = status
+        self.estimated_seconds = estimated_seconds
+        self.seconds = seconds
+        self.exception = exception
+
+REFRESH_METADATA_FILE_NAME = "latest_refresh.metadata"
+"""Sidecar file in a features cache directory with the duration and feature count of the latest refresh, outside the cache's `*.json` entries"""
+
+DEFAULT_SECONDS_PER_FEATURE = 1e-3
+"""Refresh cost estimate for layers without a previous refresh duration, when no other layer has one to derive a rate from"""
+
 class InputFeatureLayerCache(BaseModel):
     """Configuration for an `InputFeatureLayer` cache"""
     model_config = ConfigDict(arbitrary_types_allowed=True)
@@ -53,7 +97,8 @@ class InputFeatureLayer(BaseModel):
 
     See [request parameters](https://developers.arcgis.com/rest/services-reference/enterprise/query-feature-service-layer/#request-parameters)
     for additional information about class attributes that influence behavior of GET requests to the `url`/query? endpoint:
-    `token`, `output_epsg`, `sql_where_clause`, `spatial_query_parameters`, `outfields`.
+    `token`, `output_epsg`, `sql_where_clause`, `spatial_query_parameters`, `outfields`,
+    `max_allowable_offset`, `geometry_precision`, `quantization_parameters`.
     """
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
@@ -98,6 +143,66 @@ class InputFeatureLayer(BaseModel):
         default=None,
         description="Mapping of source field names to target field names for renaming"
     )
+    max_allowable_offset: float | None = Field(
+        default=None,
+        description="Generalize geometry on the server, using this tolerance in units of the output spatial reference"
+    )
+    geometry_precision: int | None = Field(
+        default=None,
+        description="Number of decimal places the server will round geometry coordinates to"
+    )
+    quantization_parameters: dict | None = Field(
+        default=None,
+        description="""
+            Quantize geometry on the server to a grid, for example {"mode": "view", "originPosition": "upperLeft", "tolerance": 1, "extent": {...}}.
+            Quantized responses are dequantized back to coordinates of the output spatial reference before they are cached.
+        """
+    )
+    prefer_pbf: bool = Field(
+        default=False,
+        description="""
+            Query features with `f=pbf` instead of `f=json` when the layer lists PBF in its supportedQueryFormats.
+            The format is recorded in cached query parameters, since coordinates of PBF responses are snapped to a quantization grid.
+        """
+    )
+    tile_grid: tuple[int, int] | None = Field(
+        default=None,
+        description="""
+            Split the extent of the features targeted by `refresh_features()` into a grid of ( rows , columns ) envelope tiles,
+            and paginate each tile concurrently instead of paginating the whole layer with ever deeper `resultOffset` values.
+            Features intersecting more than one tile are deduplicated by their object ID.
+            Ignored when `spatial_query_parameters` are set, since a query accepts a single spatial filter.
+        """
+    )
+    refresh_mode: Literal["full", "attributes_first"] = Field(
+        default="full",
+        description="""
+            How `refresh_features()` downloads features.
+            "full" paginates every feature with geometry.
+            "attributes_first" paginates attributes without geometry, along with `geometry_fingerprint_fields`, and only queries geometry for features
+            whose fingerprint changed since the latest cached features. Every other geometry is reused from the latest cache.
+            Falls back to a full refresh when there are no fingerprint fields, or no compatible cache to reuse geometry from.
+        """
+    )
+    geometry_fingerprint_fields: list[str] | None = Field(
+        default=None,
+        description="""
+            Fields whose values change whenever a feature's geometry changes, used by the "attributes_first" `refresh_mode`.
+            Defaults to the shape area and shape length fields listed in the `geometryProperties` of the layer's resource info, for example Shape__Area and Shape__Length.
+        """
+    )
+    max_geometry_reuse_runs: int | None = Field(
+        default=7,
+        description="""
+            Consecutive "attributes_first" refreshes that may reuse cached geometry before a refresh paginates full features again.
+            Fingerprints miss geometry that moves without changing shape, like a translated or realigned parcel, so a periodic full download corrects it.
+            None reuses cached geometry for as long as there is a compatible cache.
+        """
+    )
+    run_history: RunHistoryStore | None = Field(
+        default=None,
+        description="Store that records duration, feature count, pages, and bytes downloaded for every call to `refresh_features()`"
+    )
     processing_frequency: Literal["always", "annual"] = Field(
         default="always",
         description="How often an input feature layer will expose relevant data to the main process"
@@ -119,6 +224,9 @@ class InputFeatureLayer(BaseModel):
         description="Thread pool executor for concurrent file reads and writes"
     )
 
+    _probed_resource_info: dict | None = PrivateAttr(default=None)
+    _refresh_acquired: float | None = PrivateAttr(default=None)
+
     def model_post_init(self, __context):
 
         if self.logger is None:
@@ -128,16 +236,91 @@ class InputFeatureLayer(BaseModel):
 
         self.logger.debug(f"Post-init complete for {self.alias}")
 
-    async def refresh_features(self) -> Literal[True]:
+    async def probe(self, include_object_ids: bool = False) -> LayerRefreshPlan:
+        """
+        Concurrently request resource info, the target feature count and extent, and optionally the target object IDs.
+        Resource info is read from, and written to, the resource info cache the same way as when `refresh_features()` is called without a plan.
+        """
+        self._validate_required_resources("semaphore", "requester", "thread_executor")
+
+        async with self.semaphore:
+            resource_info, count_and_extent_response, object_ids_response = await asyncio.gather(
+                self._probe_resource_info(),
+                self._probe_query(returnCountOnly="true", returnExtentOnly="true", outSR=self.output_epsg),
+                self._probe_query(returnIdsOnly="true") if include_object_ids else asyncio.sleep(0),
+            )
+        self._probed_resource_info = resource_info
+
+        return LayerRefreshPlan(
+            resource_info=resource_info,
+            target_feature_count=count_and_extent_response["count"],
+            target_extent=count_and_extent_response["extent"],
+            object_ids=object_ids_response["objectIds"] if include_object_ids else None
+        )
+
+    async def refresh_features(self, plan: LayerRefreshPlan | None = None) -> Literal[True]:
+
+        self._refresh_acquired = None
+        if self.run_history is None:
+            await self._refresh_features(plan=plan, started=time.perf_counter())
+            return True
+
+        started_utc, started = now_utc_iso(), time.perf_counter()
+        status, feature_count, details = "failed", None, dict()
+        with track_request_metrics() as request_metrics:
+            try:
+                feature_count = await self._refresh_features(plan=plan, started=started)
+                status = "succeeded"
+            except asyncio.CancelledError:
+                status = "cancelled"
+                raise
+            except Exception as e:
+                details["exception"] = FileLoggingManager.format_exception(e)
+                raise
+            finally:
+                run = RunRecord.from_request_metrics(
+                    request_metrics,
+                    alias=self.alias,
+                    operation="refresh",
+                    started_utc=started_utc,
+                    seconds=round(self._refresh_seconds(started), 3),
+                    status=status,
+                    feature_count=feature_count,
+                    details={**details, "refresh_mode": self.refresh_mode, "query_format": "pbf" if self.prefer_pbf else "json"}
+                )
+                try:
+                    await asyncio.get_event_loop().run_in_executor(self.thread_executor, self.run_history.record, run)
+                except Exception as e:
+                    self.logger.warning(f"{self.alias}: Unable to record refresh run history. {FileLoggingManager.format_exception(e)}")
+        return True
+
+    async def _refresh_features(self, plan: LayerRefreshPlan | None, started: float) -> int:
 
         self._validate_required_resources("semaphore", "requester", "thread_executor")
+        if plan is not None:
+            self._probed_resource_info = plan.resource_info
         if not self._supports_pagination():
             raise PaginationNotSupported(f"{self.alias} does not support pagination! Consider implementing an alternate code path using objectId based queries.")
         
-        target_feature_count, target_extent = self._get_feature_count_and_extent()
+        if plan is None:
+            target_feature_count, target_extent = self._get_feature_count_and_extent()
+        else:
+            target_feature_count, target_extent = plan.target_feature_count, plan.target_extent
         complete_parameters, query_parameters, spatial_query_parameters = self._collect_params_with_metadata()
+        tiles = self._tile_envelopes(target_extent=target_extent)
         
-        arcgis_json = await self._get_features_by_pagination(params=complete_parameters)
+        fingerprint_fields = self._geometry_fingerprint_fields() if self.refresh_mode == "attributes_first" else None
+        if fingerprint_fields:
+            arcgis_json, geometry_fingerprints, reuse_runs = await self._get_features_attributes_first(
+                complete_parameters=complete_parameters,
+                query_parameters=query_parameters,
+                spatial_query_parameters=spatial_query_parameters,
+                fingerprint_fields=fingerprint_fields,
+                tiles=tiles
+            )
+        else:
+            arcgis_json = await self._get_features_by_pagination(params=complete_parameters, tiles=tiles)
+            geometry_fingerprints = None
         paginated_feature_count = len(arcgis_json["features"])
         if paginated_feature_count < target_feature_count:
             raise InvalidFeatureCount(f"{self.alias}: Returned {paginated_feature_count} features, when the target feature count was {target_feature_count}.")
@@ -150,19 +333,37 @@ class InputFeatureLayer(BaseModel):
             "target_extent": target_extent,
             "query_parameters": query_parameters,
             "spatial_query_parameters": spatial_query_parameters,
+            "refresh_seconds": round(self._refresh_seconds(started), 3),
             "arcgis_json": arcgis_json
         }
+        if geometry_fingerprints is not None:
+            # object IDs are kept in feature order, since the object ID field is dropped from attributes when it is not an outfield
+            cache["geometry_fingerprints"] = {
+                "fields": fingerprint_fields,
+                "values": geometry_fingerprints,
+                "object_ids": list(geometry_fingerprints),
+                "reuse_runs": reuse_runs
+            }
 
         file_path = self.cache.features.path / f"{iso_file_naming(now_utc_iso())}.json"
+        refresh_metadata = {key: cache[key] for key in ("target_feature_count", "refresh_seconds")}
         def _write_feature_cache(file_path: Path, content: dict):
             with open(file_path, "w") as file:
                 json.dump(content, file, indent=4)
+            with open(self.cache.features.path / REFRESH_METADATA_FILE_NAME, "w") as file:
+                json.dump(refresh_metadata, file)
         loop = asyncio.get_event_loop()
         await loop.run_in_executor(self.thread_executor, _write_feature_cache, file_path, cache)
 
-        return True
+        return paginated_feature_count
 
-    async def load_feature_history(self, cache_count: int | Literal["all"] = "all", apply_field_map: bool = False, validate_index: bool = False) -> list[FeaturesGdf]:
+    async def load_feature_history(
+        self,
+        cache_count: int | Literal["all"] = "all",
+        apply_field_map: bool = False,
+        validate_index: bool = False,
+        dtype_backend: Literal["numpy_nullable", "pyarrow"] | None = None
+    ) -> list[FeaturesGdf]:
 
         self._validate_required_resources("thread_executor")
 
@@ -184,7 +385,7 @@ class InputFeatureLayer(BaseModel):
 
         feature_history = list()
         for features_cached_dt, cache in feature_cache.items():
-            gdf = arcgis_json_to_gdf(arcgis_json=cache["arcgis_json"])
+            gdf = arcgis_json_to_gdf(arcgis_json=cache["arcgis_json"], dtype_backend=dtype_backend)
             if apply_field_map and self.field_map:
                 gdf = gdf.rename(columns=self.field_map, errors="raise")
             if validate_index:
@@ -202,8 +403,13 @@ class InputFeatureLayer(BaseModel):
         
         return feature_history
     
-    async def load_latest_features(self, apply_field_map: bool = False, validate_index: bool = False) -> FeaturesGdf | None:
-        feature_history = await self.load_feature_history(cache_count=1, apply_field_map=apply_field_map, validate_index=validate_index)
+    async def load_latest_features(
+        self,
+        apply_field_map: bool = False,
+        validate_index: bool = False,
+        dtype_backend: Literal["numpy_nullable", "pyarrow"] | None = None
+    ) -> FeaturesGdf | None:
+        feature_history = await self.load_feature_history(cache_count=1, apply_field_map=apply_field_map, validate_index=validate_index, dtype_backend=dtype_backend)
         return next(iter(feature_history, None))
         
     async def track_method_call(self, method_name: str, *args, **kwargs) -> dict[str, Any]:
@@ -231,23 +437,82 @@ class InputFeatureLayer(BaseModel):
 
     def _get_feature_layer_resource_info(self) -> dict:
 
-        file_path = self.cache.resource_info.latest_entry()
-        if file_path:
-            with open(file_path, "r") as file:
-                resource_info = json.load(file)
-        else:
+        if self._probed_resource_info is not None:
+            return self._probed_resource_info
+
+        resource_info = self._read_resource_info_cache()
+        if resource_info is None:
             resource_info = get_feature_layer_resource_info(base_url=str(self.url), token=self.token, verify=self.certificate_chain or True)
-            with open(self.cache.resource_info.path / f"{iso_file_naming(now_utc_iso())}.json", "w") as file:
-                json.dump(resource_info, file, indent=4)
+            self._write_resource_info_cache(resource_info)
 
-            try:
-                output_path = self.cache.resource_info.compare_latest_entries()
-                if output_path:
-                    self.logger.warning(f"{self.alias} resource info cache generated a new diff! {output_path}")
-            except (NotImplementedError, CacheCompareError) as e:
-                self.logger.warning(f"{self.alias}: {FileLoggingManager.format_exception(e)}")
+        return resource_info
+
+    def _read_resource_info_cache(self) -> dict | None:
+        file_path = self.cache.resource_info.latest_entry()
+        if file_path is None:
+            return None
+        with open(file_path, "r") as file:
+            return json.load(file)
+
+    def _write_resource_info_cache(self, resource_info: dict):
+
+        with open(self.cache.resource_info.path / f"{iso_file_naming(now_utc_iso())}.json", "w") as file:
+            json.dump(resource_info, file, indent=4)
+
+        try:
+            output_path = self.cache.resource_info.compare_latest_entries()
+            if output_path:
+                self.logger.warning(f"{self.alias} resource info cache generated a new diff! {output_path}")
+        except (NotImplementedError, CacheCompareError) as e:
+            self.logger.warning(f"{self.alias}: {FileLoggingManager.format_exception(e)}")
 
+    async def _probe_resource_info(self) -> dict:
+        loop = asyncio.get_event_loop()
+        resource_info = await loop.run_in_executor(self.thread_executor, self._read_resource_info_cache)
+        if resource_info is not None:
+            return resource_info
+        resource_info = await self.requester.send_request(
+            url=str(self.url),
+            request_method="get",
+            read_method="json",
+            operation="resource_info",
+            params=drop_none_vals({"f": "json", "nocache": uuid.uuid4().hex, "token": self.token}),
+            headers=NO_CACHE_HEADERS,
+            ssl=self._ssl_context() or True,
+            timeout=aiohttp.ClientTimeout(total=30)
+        )
+        validate_arcgis_json(resource_info)
+        await loop.run_in_executor(self.thread_executor, self._write_resource_info_cache, resource_info)
         return resource_info
+
+    async def _probe_query(self, **params) -> dict:
+        """Send a count, extent, or object ID query for the features targeted by `refresh_features()`"""
+        query_response = await self.requester.send_request(
+            url=f"{self.url}/query?",
+            request_method="get",
+            read_method="json",
+            operation="probe",
+            label=",".join(params),
+            params=drop_none_vals({
+                "f": "json",
+                "where": self.sql_where_clause or "1=1",
+                "nocache": uuid.uuid4().hex,
+                "token": self.token,
+                **params,
+                **(self.spatial_query_parameters or dict())
+            }),
+            headers=NO_CACHE_HEADERS,
+            ssl=self._ssl_context() or True,
+            timeout=aiohttp.ClientTimeout(total=30)
+        )
+        expected_keys = ("objectIds",) if params.get("returnIdsOnly") else ("count", "extent")
+        validate_arcgis_json(query_response, expected_keys=expected_keys, expected_keys_requirement="all")
+        return query_response
+
+    def _ssl_context(self) -> ssl.SSLContext | None:
+        if isinstance(self.certificate_chain, Path):
+            return ssl.create_default_context(cafile=self.certificate_chain)
+        return None
     
     def _max_record_count(self) -> int:
 
@@ -273,6 +538,22 @@ class InputFeatureLayer(BaseModel):
         supports_pagination = advanced_query_capabilities.get("supportsPagination", False)
         return supports_pagination
 
+    def _supports_pbf(self) -> bool:
+        resource_info = self._get_feature_layer_resource_info()
+        supported_query_formats = resource_info.get("supportedQueryFormats", "")
+        return "pbf" in [query_format.strip().lower() for query_format in supported_query_formats.split(",")]
+
+    def _geometry_fingerprint_fields(self) -> list[str] | None:
+        if self.geometry_fingerprint_fields:
+            return list(self.geometry_fingerprint_fields)
+        resource_info = self._get_feature_layer_resource_info()
+        geometry_properties = resource_info.get("geometryProperties", dict())
+        fingerprint_fields = [geometry_properties[key] for key in ("shapeAreaFieldName", "shapeLengthFieldName") if geometry_properties.get(key)]
+        if fingerprint_fields and resource_info.get("objectIdField"):
+            return fingerprint_fields
+        self.logger.warning(f"InputFeatureLayer {self.alias} does not report shape area or length fields and an object ID field. Defaulting to a full refresh.")
+        return None
+
     def _unique_id_field(self) -> dict[str, str] | None:
         resource_info = self._get_feature_layer_resource_info()
         unique_id_field = resource_info.get("uniqueIdField", dict())
@@ -297,11 +578,14 @@ class InputFeatureLayer(BaseModel):
             outfields = self.outfields
 
         query_parameters = drop_none_vals({
-            "f": "json",
+            "f": "pbf" if self.prefer_pbf and self._supports_pbf() else "json",
             "outfields": ",".join(outfields),
             "where": self.sql_where_clause or "1=1",
             "token": self.token,
             "outSR": self.output_epsg,
+            "maxAllowableOffset": self.max_allowable_offset,
+            "geometryPrecision": self.geometry_precision,
+            "quantizationParameters": json.dumps(self.quantization_parameters, sort_keys=True) if self.quantization_parameters else None,
         })
 
         if self.spatial_query_parameters:
@@ -315,15 +599,208 @@ class InputFeatureLayer(BaseModel):
 
         return (complete_parameters, query_parameters, spatial_query_parameters)
 
-    async def _get_features_by_pagination(self, params: dict) -> dict:
-
-        ssl_context = None
-        if isinstance(self.certificate_chain, Path):
-            ssl_context = ssl.create_default_context(cafile=self.certificate_chain)
+    @asynccontextmanager
+    async def _refresh_semaphore(self):
+        """Acquire the `semaphore` for a refresh, noting when the refresh first acquired it"""
         async with self.semaphore:
-            arcgis_json = await self.requester.paginate_json_features(base_url=self.url, params=params, max_record_count=self._max_record_count(), ssl=ssl_context or True)
+            if self._refresh_acquired is None:
+                self._refresh_acquired = time.perf_counter()
+            yield
+
+    def _refresh_seconds(self, started: float) -> float:
+        """Seconds since the refresh first acquired the `semaphore`, so time spent queued behind other layers is not counted as refresh time"""
+        return time.perf_counter() - (started if self._refresh_acquired is None else self._refresh_acquired)
+
+    def _tile_envelopes(self, target_extent: dict) -> list[dict] | None:
+
+        if self.tile_grid is None:
+            return None
+        if self.spatial_query_parameters:
+            self.logger.warning(f"{self.alias}: `tile_grid` is ignored, since `spatial_query_parameters` are set.")
+            return None
+        if not self._get_feature_layer_resource_info().get("objectIdField"):
+            self.logger.warning(f"InputFeatureLayer {self.alias} does not specify an object ID field to deduplicate tiled features with. Paginating without tiles.")
+            return None
+        try:
+            extent_coords = [float(target_extent[coord]) for coord in ("xmin", "ymin", "xmax", "ymax")]
+        except (KeyError, TypeError, ValueError):
+            extent_coords = None
+        if extent_coords is None or not all(math.isfinite(coord) for coord in extent_coords):
+            self.logger.warning(f"{self.alias}: Target extent {target_extent} cannot be split into tiles. Paginating without tiles.")
+            return None
+        rows, columns = self.tile_grid
+        return split_envelope(target_extent, rows=rows, columns=columns)
+
+    async def _get_features_by_pagination(self, params: dict, tiles: list[dict] | None = None) -> dict:
+
+        ssl_context = self._ssl_context()
+        paginate_features = self.requester.paginate_pbf_features if params.get("f") == "pbf" else self.requester.paginate_json_features
+
+        async def _paginate(params: dict) -> dict:
+            async with self._refresh_semaphore():
+                return await paginate_features(base_url=self.url, params=params, max_record_count=self._max_record_count(), ssl=ssl_context or True)
+
+        if not tiles:
+            return await _paginate(params)
+
+        # object IDs are needed to deduplicate tiles, even when they are not an outfield
+        object_id_field = self._get_feature_layer_resource_info()["objectIdField"]
+        outfields = params["outfields"].split(",")
+        added_object_id_field = "*" not in outfields and object_id_field not in outfields
+        if added_object_id_field:
+            params = {**params, "outfields": ",".join([*outfields, object_id_field])}
+
+        tile_responses = await asyncio.gather(*(_paginate(params | self._tile_query_parameters(tile)) for tile in tiles))
+        # features intersecting more than one tile are returned by each of them
+        features = {feat["attributes"][object_id_field]: feat for resp in tile_responses for feat in resp["features"]}
+
+        # features without geometry do not intersect any tile
+        ids_response = await self._probe_query(returnIdsOnly="true")
+        untiled_object_ids = sorted(set(ids_response["objectIds"] or list()) - set(features))
+        if untiled_object_ids:
+            async with self._refresh_semaphore():
+                untiled_response = await self.requester.query_features_by_object_ids(
+                    base_url=self.url, params=params, object_ids=untiled_object_ids, chunk_size=self._max_record_count(), ssl=ssl_context or True
+                )
+            features.update((feat["attributes"][object_id_field], feat) for feat in untiled_response["features"])
+            tile_responses.append(untiled_response)
+
+        arcgis_json = {"features": [features[object_id] for object_id in sorted(features)]}
+        if added_object_id_field:
+            for feat in arcgis_json["features"]:
+                feat["attributes"].pop(object_id_field, None)
+        spatial_references = [resp["spatialReference"] for resp in tile_responses if "spatialReference" in resp]
+        if spatial_references:
+            arcgis_json["spatialReference"] = spatial_references[0]
+        self.logger.debug(f"{self.alias}: Paginated {len(features)} unique features from {len(tiles)} tiles, including {len(untiled_object_ids)} queried by object ID.")
         return arcgis_json
+
+    def _tile_query_parameters(self, tile: dict) -> dict:
+        spatial_reference = tile.get("spatialReference", dict())
+        return drop_none_vals({
+            "geometry": json.dumps({coord: tile[coord] for coord in ("xmin", "ymin", "xmax", "ymax")}),
+            "geometryType": "esriGeometryEnvelope",
+            "spatialRel": "esriSpatialRelIntersects",
+            "inSR": spatial_reference.get("latestWkid") or spatial_reference.get("wkid") or self.output_epsg,
+        })
             
+    async def _get_features_attributes_first(
+        self,
+        complete_parameters: dict,
+        query_parameters: dict,
+        spatial_query_parameters: dict | None,
+        fingerprint_fields: list[str],
+        tiles: list[dict] | None = None
+    ) -> tuple[dict, dict[str, list], int]:
+        """
+        Paginate attributes and geometry fingerprints without geometry, then query geometry only for features whose fingerprint
+        differs from the latest compatible feature cache. Paginates full features when there is no compatible cache,
+        or when cached geometry has already been reused by `max_geometry_reuse_runs` consecutive refreshes.
+
+        Returns
+        -------
+        tuple[dict, dict[str, list], int]
+            ( ArcGIS JSON , fingerprint values keyed by object ID , consecutive refreshes that reused cached geometry )
+        """
+        object_id_field = self._get_feature_layer_resource_info()["objectIdField"]
+        outfields = complete_parameters["outfields"].split(",")
+        extra_fields = [] if "*" in outfields else [field for field in [object_id_field, *fingerprint_fields] if field not in outfields]
+        fingerprint_parameters = {**complete_parameters, "outfields": ",".join([*outfields, *extra_fields])}
+
+        def _fingerprint(feat: dict) -> list:
+            return [feat["attributes"].get(field) for field in fingerprint_fields]
+
+        latest_cache = await self._load_latest_feature_cache()
+        compatible = (
+            latest_cache is not None
+            and latest_cache.get("geometry_fingerprints", dict()).get("fields") == fingerprint_fields
+            and len(latest_cache["geometry_fingerprints"].get("object_ids", list())) == len(latest_cache["arcgis_json"]["features"])
+            and latest_cache["query_parameters"] == query_parameters
+            and json.dumps(latest_cache["spatial_query_parameters"], sort_keys=True) == json.dumps(spatial_query_parameters, sort_keys=True)
+        )
+        reuse_runs = latest_cache["geometry_fingerprints"].get("reuse_runs", 0) + 1 if compatible else 0
+
+        if not compatible:
+            self.logger.info(f"{self.alias}: No compatible feature cache to reuse geometry from. Paginating full features.")
+            arcgis_json = await self._get_features_by_pagination(params=fingerprint_parameters, tiles=tiles)
+        elif self.max_geometry_reuse_runs is not None and reuse_runs > self.max_geometry_reuse_runs:
+            self.logger.info(f"{self.alias}: Cached geometry was reused by the last {reuse_runs - 1} refreshes. Paginating full features.")
+            arcgis_json = await self._get_features_by_pagination(params=fingerprint_parameters, tiles=tiles)
+            reuse_runs = 0
+        else:
+            arcgis_json = await self._get_features_by_pagination(params={**fingerprint_parameters, "returnGeometry": "false"}, tiles=tiles)
+            cached_fingerprints = latest_cache["geometry_fingerprints"]["values"]
+            cached_geometries = {
+                object_id: feat.get("geometry")
+                for object_id, feat in zip(latest_cache["geometry_fingerprints"]["object_ids"], latest_cache["arcgis_json"]["features"])
+            }
+            changed_object_ids = [
+                feat["attributes"][object_id_field]
+                for feat in arcgis_json["features"]
+                if str(feat["attributes"][object_id_field]) not in cached_geometries
+                or cached_fingerprints.get(str(feat["attributes"][object_id_field])) != _fingerprint(feat)
+            ]
+            changed_geometries = await self._get_geometries_by_object_ids(
+                params={**complete_parameters, "outfields": object_id_field},
+                object_ids=changed_object_ids,
+                object_id_field=object_id_field
+            )
+            changed = {str(object_id) for object_id in changed_object_ids}
+            for feat in arcgis_json["features"]:
+                object_id = str(feat["attributes"][object_id_field])
+                geometry = changed_geometries.get(object_id) if object_id in changed else cached_geometries.get(object_id)
+                if geometry is not None:
+                    feat["geometry"] = geometry
+            arcgis_json["spatialReference"] = latest_cache["arcgis_json"]["spatialReference"]
+            self.logger.info(f"{self.alias}: Reused {len(arcgis_json['features']) - len(changed_object_ids)} cached geometries, queried {len(changed_object_ids)} changed geometries.")
+
+        geometry_fingerprints = {str(feat["attributes"][object_id_field]): _fingerprint(feat) for feat in arcgis_json["features"]}
+        for feat in arcgis_json["features"]:
+            for field in extra_fields:
+                feat["attributes"].pop(field, None)
+
+        return arcgis_json, geometry_fingerprints, reuse_runs
+
+    async def _get_geometries_by_object_ids(self, params: dict, object_ids: list[int], object_id_field: str) -> dict[str, dict | None]:
+
+        if not object_ids:
+            return dict()
+        ssl_context = self._ssl_context()
+        async with self._refresh_semaphore():
+            arcgis_json = await self.requester.query_features_by_object_ids(base_url=self.url, params=params, object_ids=object_ids, chunk_size=self._max_record_count(), ssl=ssl_context or True)
+        return {str(feat["attributes"][object_id_field]): feat.get("geometry") for feat in arcgis_json["features"]}
+
+    async def _load_latest_feature_cache(self) -> dict | None:
+
+        file_path = self.cache.features.latest_entry()
+        if file_path is None:
+            return None
+        def _read_feature_cache(file_path: Path) -> dict:
+            with open(file_path, "r") as file:
+                return json.load(file)
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self.thread_executor, _read_feature_cache, file_path)
+
+    async def _load_latest_refresh_metadata(self) -> dict | None:
+        """
+        Duration and feature count of the latest successful refresh, from the `run_history` store when there is one.
+        Otherwise reads the `REFRESH_METADATA_FILE_NAME` sidecar written next to the latest feature cache.
+        """
+        loop = asyncio.get_event_loop()
+        if self.run_history is not None:
+            latest_run = await loop.run_in_executor(self.thread_executor, self.run_history.latest, self.alias, "refresh")
+            if latest_run is not None:
+                return {"refresh_seconds": latest_run.seconds, "target_feature_count": latest_run.feature_count}
+
+        file_path = self.cache.features.path / REFRESH_METADATA_FILE_NAME
+        def _read_refresh_metadata(file_path: Path) -> dict | None:
+            try:
+                with open(file_path, "r") as file:
+                    return json.load(file)
+            except (FileNotFoundError, json.JSONDecodeError):
+                return None
+        return await loop.run_in_executor(self.thread_executor, _read_refresh_metadata, file_path)
+
     def _validate_gdf_index(self, gdf: gpd.GeoDataFrame) -> bool:
         unique_id_field_name = self._unique_id_field_name()
         if not (unique_id_field_name is not None and gdf.index.name is not None and unique_id_field_name == gdf.index.name):
@@ -339,6 +816,7 @@ class InputFeatureLayersConfig:
 
     def __init__(self, input_layers: Iterable[InputFeatureLayer]):
         self.input_layers = list(input_layers)
+        self._refresh_tasks: dict[str, asyncio.Task] = dict()
 
         seen = set()
         aliases = [fl.alias for fl in self.input_layers]
@@ -375,6 +853,137 @@ class InputFeatureLayersConfig:
                 elif error_action == "silently_continue":
                     continue
     
+    async def probe(self, include_object_ids: bool = False, return_exceptions: bool = False) -> dict[str, LayerRefreshPlan | Exception]:
+        """
+        Probe all input layers concurrently, see `InputFeatureLayer.probe()`.
+
+        Parameters
+        ----------
+        include_object_ids : bool, optional
+            Also request the object IDs of the features each layer targets, by default False
+        return_exceptions : bool, optional
+            Return exceptions raised while probing a layer in place of its plan, instead of raising the first one, by default False
+
+        Returns
+        -------
+        dict[str, LayerRefreshPlan | Exception]
+            Refresh plans keyed by layer alias
+        """
+        results = await asyncio.gather(
+            *(layer.track_method_call("probe", include_object_ids=include_object_ids) for layer in self.input_layers),
+            return_exceptions=return_exceptions
+        )
+        return {
+            layer.alias: result if isinstance(result, Exception) else result[layer.alias]
+            for layer, result in zip(self.input_layers, results)
+        }
+
+    async def schedule_refresh(
+        self,
+        plans: Mapping[str, LayerRefreshPlan | Exception] | None = None,
+        deadline_seconds: float | Mapping[str, float] | None = None,
+        max_concurrency: int | None = None
+    ) -> dict[str, LayerRefreshResult]:
+        """
+        Refresh features of all input layers, starting the most expensive layers first to keep the total wall time short.
+
+        The cost of a layer is estimated from the duration and feature count of its latest feature cache, scaled to the feature count in its plan.
+        Layers without a previous duration are estimated from their feature count, and layers without a feature count are started first.
+        A running refresh can be cancelled with `cancel_refresh()`.
+
+        Parameters
+        ----------
+        plans : Mapping[str, LayerRefreshPlan | Exception] | None, optional
+            Output of `probe()`. Layers whose plan is an exception are reported as failed without being refreshed, by default None
+        deadline_seconds : float | Mapping[str, float] | None, optional
+            Time limit for every layer's refresh, or time limits keyed by alias, by default None
+        max_concurrency : int | None, optional
+            Maximum number of layers refreshed at the same time, by default all layers.
+            The most expensive layers only get a head start when this is lower than the number of layers.
+
+        Returns
+        -------
+        dict[str, LayerRefreshResult]
+            Results keyed by alias
+        """
+        plans = plans or dict()
+        results: dict[str, LayerRefreshResult] = dict()
+        for alias, plan in plans.items():
+            if isinstance(plan, Exception):
+                results[alias] = LayerRefreshResult(alias=alias, status="failed", estimated_seconds=None, seconds=None, exception=plan)
+
+        layers = [layer for layer in self.input_layers if layer.alias not in results]
+        estimates = await self._estimate_refresh_seconds(layers=layers, plans=plans)
+        pending = sorted(layers, key=lambda layer: estimates[layer.alias], reverse=True)
+
+        async def _worker():
+            while pending:
+                layer = pending.pop(0)
+                deadline = deadline_seconds.get(layer.alias) if isinstance(deadline_seconds, Mapping) else deadline_seconds
+                results[layer.alias] = await self._run_refresh(layer=layer, plan=plans.get(layer.alias), deadline_seconds=deadline, estimated_seconds=estimates[layer.alias])
+
+        await asyncio.gather(*(_worker() for _ in range(min(max_concurrency or len(pending), len(pending)))))
+        return results
+
+    def cancel_refresh(self, alias: str) -> bool:
+        """Cancel a layer refresh started by `schedule_refresh()`, returning False if the layer is not being refreshed"""
+        task = self._refresh_tasks.get(alias)
+        if task is None or task.done():
+            return False
+        return task.cancel()
+
+    async def _run_refresh(self, layer: InputFeatureLayer, plan: LayerRefreshPlan | None, deadline_seconds: float | None, estimated_seconds: float) -> LayerRefreshResult:
+
+        task = asyncio.ensure_future(layer.track_method_call("refresh_features", plan=plan))
+        self._refresh_tasks[layer.alias] = task
+        started = time.perf_counter()
+        exception = None
+        try:
+            await asyncio.wait_for(task, timeout=deadline_seconds)
+            status = "refreshed"
+        except asyncio.TimeoutError as e:
+            status, exception = "timed_out", e
+        except asyncio.CancelledError as e:
+            # only a cancel_refresh() call is reported, cancelling the scheduler itself propagates
+            if asyncio.current_task().cancelling():
+                raise
+            status, exception = "cancelled", e
+        except Exception as e:
+            status, exception = "failed", e
+        finally:
+            self._refresh_tasks.pop(layer.alias, None)
+
+        seconds = time.perf_counter() - started
+        estimate = f"{estimated_seconds:.1f}" if math.isfinite(estimated_seconds) else "unknown"
+        layer.logger.info(f"{layer.alias}: Refresh {status} after {seconds:.1f} seconds, estimated {estimate} seconds.")
+        return LayerRefreshResult(alias=layer.alias, status=status, estimated_seconds=estimated_seconds, seconds=seconds, exception=exception)
+
+    async def _estimate_refresh_seconds(self, layers: list[InputFeatureLayer], plans: Mapping[str, LayerRefreshPlan | Exception]) -> dict[str, float]:
+
+        metadata = await asyncio.gather(*(layer._load_latest_refresh_metadata() for layer in layers), return_exceptions=True)
+        metadata = {layer.alias: m if isinstance(m, dict) else dict() for layer, m in zip(layers, metadata)}
+
+        seconds_per_feature = [
+            m["refresh_seconds"] / m["target_feature_count"]
+            for m in metadata.values()
+            if m.get("refresh_seconds") and m.get("target_feature_count")
+        ]
+        seconds_per_feature = median(seconds_per_feature) if seconds_per_feature else DEFAULT_SECONDS_PER_FEATURE
+
+        estimates = dict()
+        for layer in layers:
+            previous = metadata[layer.alias]
+            plan = plans.get(layer.alias)
+            feature_count = plan.target_feature_count if isinstance(plan, LayerRefreshPlan) else previous.get("target_feature_count")
+            if previous.get("refresh_seconds") is not None:
+                scale = feature_count / previous["target_feature_count"] if feature_count and previous.get("target_feature_count") else 1
+                estimates[layer.alias] = previous["refresh_seconds"] * scale
+            elif feature_count is not None:
+                estimates[layer.alias] = feature_count * seconds_per_feature
+            else:
+                estimates[layer.alias] = math.inf
+        return estimates
+
     def shutdown_thread_executors(self):
         unique_thread_executors = {layer.thread_executor for layer in self.input_layers if isinstance(layer.thread_executor, ThreadPoolExecutor)}
         for thread_executor in unique_thread_executors:
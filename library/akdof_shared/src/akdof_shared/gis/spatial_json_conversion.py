@@ -6,8 +6,12 @@ import geomet.esri
 import geopandas as gpd
 import pandas as pd
 
-def arcgis_json_to_gdf(arcgis_json: dict) -> gpd.GeoDataFrame:
-    """Loads ArcGIS json features into a GeoDataFrame"""
+def arcgis_json_to_gdf(arcgis_json: dict, dtype_backend: Literal["numpy_nullable", "pyarrow"] | None = None) -> gpd.GeoDataFrame:
+    """
+    Loads ArcGIS json features into a GeoDataFrame.
+    If `dtype_backend` is provided, attribute columns are converted to the best possible nullable Pandas data types for that backend.
+    The "pyarrow" backend requires the optional `pyarrow` dependency.
+    """
 
     spatial_reference = arcgis_json.get("spatialReference", dict())
     wkid = spatial_reference.get("wkid", None)
@@ -25,6 +29,11 @@ def arcgis_json_to_gdf(arcgis_json: dict) -> gpd.GeoDataFrame:
     if is_system_maintained and unique_id_field_name and unique_id_field_name in gdf.columns:
         gdf = gdf.set_index(keys=unique_id_field_name, drop=True, verify_integrity=True)
 
+    if dtype_backend is not None:
+        for c in gdf.columns:
+            if c != gdf.geometry.name:
+                gdf[c] = gdf[c].convert_dtypes(dtype_backend=dtype_backend)
+
     return gdf
 
 # consider replacing object_id_column_name: str | None with switch convert_index_to_unique_id: bool
@@ -1,14 +1,26 @@
 import asyncio
+from contextlib import nullcontext
+from dataclasses import dataclass
 import json
 import logging
 import ssl
+import time
 from typing import Literal, Mapping, TypedDict
 import random
 
 import aiohttp
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 from akdof_shared.protocol.file_logging_manager import FileLoggingManager
 from akdof_shared.gis.arcgis_api_validation import validate_arcgis_json
+from akdof_shared.gis.arcgis_pbf import decode_feature_collection_pbf
+from akdof_shared.gis.arcgis_quantization import dequantize_arcgis_json
+from akdof_shared.io.host_rate_limiter import HostRateLimiter, parse_retry_after
+from akdof_shared.io.request_metrics import RequestMetricsHook, RequestRecord, host_from_url, scoped_request_metrics
+from akdof_shared.io.retry_policy import CircuitBreaker, CircuitOpen, RetryBudget
 from akdof_shared.utils.with_retry import with_retry_async
 
 class StatusCodeInstructions(TypedDict, total=False):
@@ -19,9 +31,13 @@ class StatusCodeInstructions(TypedDict, total=False):
     Attributes:
         sleep_seconds: How long to wait before retrying (AsyncRequester will default this to 1)
         attempt_increment: How much to increment the retry counter (AsyncRequester will default this to 1)
+        respect_retry_after: Wait at least as long as a `Retry-After` response header requests (AsyncRequester will default this to True)
+        max_sleep_seconds: Give up instead of retrying when the planned wait would be longer than this (AsyncRequester will default this to no limit)
     """
     sleep_seconds: int | float
     attempt_increment: int | float
+    respect_retry_after: bool
+    max_sleep_seconds: int | float
 
 StatusCodePlanner = dict[int | str, StatusCodeInstructions]
 """
@@ -36,9 +52,9 @@ Attributes:
 
 DEFAULT_STATUS_CODE_PLANNER: StatusCodePlanner = {
    408: {"sleep_seconds": 2, "attempt_increment": 1},
-   429: {"sleep_seconds": 10, "attempt_increment": 0.5},
+   429: {"sleep_seconds": 10, "attempt_increment": 0.5, "max_sleep_seconds": 120},
    502: {"sleep_seconds": 5, "attempt_increment": 0.8},
-   503: {"sleep_seconds": 8, "attempt_increment": 0.8},
+   503: {"sleep_seconds": 8, "attempt_increment": 0.8, "max_sleep_seconds": 120},
    504: {"sleep_seconds": 6, "attempt_increment": 1},
    "5": {"sleep_seconds": 3, "attempt_increment": 1},
 }
@@ -46,18 +62,134 @@ DEFAULT_STATUS_CODE_PLANNER: StatusCodePlanner = {
 Default retry strategy for common HTTP errors that should be retried:
 
 - 408 Request Timeout: Server didn't receive complete request in time
-- 429 Too Many Requests: Rate limiting - client sending requests too quickly  
+- 429 Too Many Requests: Rate limiting - client sending requests too quickly, gives up if `Retry-After` asks for more than 2 minutes
 - 502 Bad Gateway: Upstream server returned invalid response
-- 503 Service Unavailable: Server temporarily overloaded or down for maintenance
+- 503 Service Unavailable: Server temporarily overloaded or down for maintenance, gives up if `Retry-After` asks for more than 2 minutes
 - 504 Gateway Timeout: Upstream server didn't respond in time
 - "5" (5xx pattern): Any other server error (500-599 range)
 """
 
+@dataclass(frozen=True)
+class ConnectorConfig:
+    """
+    Connection pool settings for the `aiohttp.TCPConnector` used by `AsyncRequester` sessions.
+    The defaults match those of `aiohttp.TCPConnector`, so tuned pools are configured explicitly where they are used.
+
+    Attributes
+    ----------
+    limit : int
+        Maximum number of open connections, by default 100
+    limit_per_host : int
+        Maximum number of open connections per host, or 0 for no limit, by default 0
+    keepalive_timeout : float
+        Seconds an idle connection is kept open for reuse, which avoids repeating TCP and TLS handshakes, by default 15
+    ttl_dns_cache : int | None
+        Seconds resolved addresses are cached, or None to disable the DNS cache, by default 10
+    use_aiodns : bool
+        Resolve hosts with `aiodns` instead of aiohttp's default resolver, by default False.
+        Falls back to the default resolver if `aiodns` is unavailable for the running event loop.
+    accept_encoding : str | None
+        Value of the `Accept-Encoding` header sent with every request, by default None,
+        which leaves aiohttp to advertise every encoding it can decode.
+    """
+    limit: int = 100
+    limit_per_host: int = 0
+    keepalive_timeout: float = 15
+    ttl_dns_cache: int | None = 10
+    use_aiodns: bool = False
+    accept_encoding: str | None = None
+
+    def create_connector(self) -> aiohttp.TCPConnector:
+        """Create a connector, which must be done inside a running event loop"""
+        resolver = None
+        if self.use_aiodns:
+            try:
+                resolver = aiohttp.AsyncResolver()
+            except (ImportError, RuntimeError):
+                resolver = None
+        return aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            use_dns_cache=self.ttl_dns_cache is not None,
+            ttl_dns_cache=self.ttl_dns_cache,
+            resolver=resolver,
+        )
+
+DEFAULT_CONNECTOR_CONFIG = ConnectorConfig()
+
+class SharedConnector:
+    """
+    Connection pool shared by multiple `AsyncRequester` instances, so that keep-alive connections
+    (and the TLS handshakes behind them) are reused across requesters and across closed and reopened sessions.
+
+    The connector is created lazily inside the running event loop, and is not closed when a requester closes its session.
+    Call `close()` once every requester using it is done.
+
+    Attributes
+    ----------
+    config : ConnectorConfig
+        Connection pool settings, by default `DEFAULT_CONNECTOR_CONFIG`
+    """
+
+    def __init__(self, config: ConnectorConfig = DEFAULT_CONNECTOR_CONFIG):
+        self.config = config
+        self._connector = None
+
+    @property
+    def connector(self) -> aiohttp.TCPConnector:
+        if self._connector is None or self._connector.closed:
+            self._connector = self.config.create_connector()
+        return self._connector
+
+    async def close(self):
+        if self._connector is not None and not self._connector.closed:
+            await self._connector.close()
+
 class AsyncRequester:
-    """Base class for sending asynchronous requests"""
+    """
+    Base class for sending asynchronous requests
+
+    Attributes
+    ----------
+    timeout : int
+        Total timeout in seconds for the client session, by default 900
+    logger : logging.Logger | None
+        Logger for debug level messages about failed attempts, by default None
+    metrics_hook : RequestMetricsHook | None
+        Called with a `RequestRecord` after every `send_request()` call, by default None.
+        A `RequestMetrics` instance can be used to aggregate records per host and logical operation.
+    rate_limiter : HostRateLimiter | None
+        Per-host token bucket and concurrency limiter applied to every request attempt, by default None.
+        Can be shared between requesters so that limits apply across all of them.
+    circuit_breaker : CircuitBreaker | None
+        Per-host circuit breaker that fails requests fast with `CircuitOpen` once a host exceeds its error budget, by default None.
+    retry_budget : RetryBudget | None
+        Retry budget shared by concurrent requests, by default None. Errors are raised instead of retried once the budget is spent.
+    connector_config : ConnectorConfig
+        Connection pool settings for sessions that do not use a `shared_connector`, by default `DEFAULT_CONNECTOR_CONFIG`
+    shared_connector : SharedConnector | None
+        Connection pool shared with other requesters, by default None. Takes precedence over `connector_config`.
+    """
 
-    def __init__(self, timeout: int = 900, logger: logging.Logger | None = None):
+    def __init__(
+        self,
+        timeout: int = 900,
+        logger: logging.Logger | None = None,
+        metrics_hook: RequestMetricsHook | None = None,
+        rate_limiter: HostRateLimiter | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        retry_budget: RetryBudget | None = None,
+        connector_config: ConnectorConfig = DEFAULT_CONNECTOR_CONFIG,
+        shared_connector: SharedConnector | None = None
+    ):
         self.timeout = timeout
+        self.metrics_hook = metrics_hook
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = circuit_breaker
+        self.retry_budget = retry_budget
+        self.connector_config = connector_config
+        self.shared_connector = shared_connector
         self.logger = logger or logging.getLogger("null")
         if not self.logger.handlers:
             self.logger.addHandler(logging.NullHandler())
@@ -101,10 +233,12 @@ class AsyncRequester:
         self,
         url: str,
         request_method: Literal["get", "post"],
-        read_method: Literal["text", "json", "bytes"],
+        read_method: Literal["text", "json", "json_stream", "bytes"],
         status_code_plan: StatusCodePlanner | None = DEFAULT_STATUS_CODE_PLANNER,
         return_headers: bool = False,
         retry_max_attempts: int = 3,
+        operation: str | None = None,
+        label: str | None = None,
         **kwargs,
     ) -> str | dict | bytes | tuple[str | dict | bytes, Mapping[str, str]]:
         """
@@ -115,9 +249,15 @@ class AsyncRequester:
         ----------
         url : str
         request_method : Literal["get", "post"]
-        read_method : Literal["text", "json", "bytes"]
+        read_method : Literal["text", "json", "json_stream", "bytes"]
+            "json_stream" decodes a JSON object incrementally while the body is received, one "features" item at a time, if the optional `ijson` dependency is installed
         status_code_plan : dict[int | str, StatusCodeInstructions] | None, optional
         return_headers : bool, optional
+        retry_max_attempts : int, optional
+        operation : str | None, optional
+            Logical operation reported to the `metrics_hook`, by default the last segment of the URL path
+        label : str | None, optional
+            Context reported to the `metrics_hook`, such as a page offset or edit batch, by default None
 
         Returns
         -------
@@ -131,18 +271,81 @@ class AsyncRequester:
             Planned for error status code(s) persisted across all retry attempts, or an unplanned for error status code was encountered.
         aiohttp.ContentTypeError
             Invalid content type persisted across all retry attempts.
+        CircuitOpen
+            The `circuit_breaker` is open for the host of the URL.
         """
         self._ensure_session()
         if status_code_plan is None:
             status_code_plan = dict()
 
+        if self.retry_budget is not None:
+            self.retry_budget.record_request()
+        started = time.perf_counter()
+        tracking = {"status": None, "ttfb_seconds": None, "response_bytes": 0, "attempts": 0, "sleep_seconds": 0.0}
+        try:
+            return await self._send_request_attempts(
+                url=url,
+                request_method=request_method,
+                read_method=read_method,
+                status_code_plan=status_code_plan,
+                return_headers=return_headers,
+                retry_max_attempts=retry_max_attempts,
+                tracking=tracking,
+                **kwargs
+            )
+        finally:
+            if self.metrics_hook is not None or scoped_request_metrics():
+                self._report_metrics(
+                    RequestRecord(
+                        url=str(url),
+                        host=host_from_url(url),
+                        operation=operation or str(url).rstrip("?").rstrip("/").rsplit("/", 1)[-1],
+                        method=request_method,
+                        status=tracking["status"],
+                        latency_seconds=time.perf_counter() - started,
+                        ttfb_seconds=tracking["ttfb_seconds"],
+                        response_bytes=tracking["response_bytes"],
+                        retries=max(tracking["attempts"] - 1, 0),
+                        sleep_seconds=tracking["sleep_seconds"],
+                        label=label,
+                    )
+                )
+
+    async def _send_request_attempts(
+        self,
+        url: str,
+        request_method: Literal["get", "post"],
+        read_method: Literal["text", "json", "json_stream", "bytes"],
+        status_code_plan: StatusCodePlanner,
+        return_headers: bool,
+        retry_max_attempts: int,
+        tracking: dict,
+        **kwargs,
+    ) -> str | dict | bytes | tuple[str | dict | bytes, Mapping[str, str]]:
+        """Retry loop for `send_request()`. Records status, timing, size, and sleep information for the `metrics_hook` in `tracking`."""
         attempt_counter = 0
         while attempt_counter < retry_max_attempts:
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.before_attempt(url)
+            tracking["attempts"] += 1
+            attempt_started = time.perf_counter()
             try:
-                async with self.dispatchers[request_method](url, **kwargs) as response:
-                    response.raise_for_status()
-                    content = await self.dispatchers[read_method](response)
-                    return (content, response.headers) if return_headers else content
+                async with self._rate_limited(url):
+                    async with self.dispatchers[request_method](url, **kwargs) as response:
+                        tracking["ttfb_seconds"] = time.perf_counter() - attempt_started
+                        tracking["status"] = response.status
+                        response.raise_for_status()
+                        content = await self.dispatchers[read_method](response)
+                        tracking["response_bytes"] = response.content.total_bytes
+                if self.rate_limiter is not None:
+                    self.rate_limiter.recover(url)
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.record_success(url)
+                return (content, response.headers) if return_headers else content
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.record_failure(url)
+                raise
             except aiohttp.ContentTypeError as e:
                 attempt_counter += 1
                 if attempt_counter >= retry_max_attempts:
@@ -159,15 +362,25 @@ class AsyncRequester:
                 if isinstance(content, str) and '"error"' in content and '"code":504' in content:
                     e.status = 504
                     e.message = content
+                    if self.circuit_breaker is not None:
+                        self.circuit_breaker.record_failure(url)
                     raise
 
-                await asyncio.sleep(
-                    self._randomize_and_backoff_sleep(
-                        base_sleep=5,
-                        attempt_counter=attempt_counter
-                    )
+                if not self._retry_allowed(url):
+                    raise
+                tracking["sleep_seconds"] += await self._backoff_sleep(
+                    base_sleep=5,
+                    attempt_counter=attempt_counter
                 )
             except aiohttp.ClientResponseError as e:  
+                retry_after = parse_retry_after((e.headers or dict()).get("Retry-After"))
+                if self.rate_limiter is not None and e.status == 429:
+                    self.rate_limiter.throttle(url, retry_after=retry_after)
+                if self.circuit_breaker is not None:
+                    if e.status in (408, 429) or e.status >= 500:
+                        self.circuit_breaker.record_failure(url)
+                    else:
+                        self.circuit_breaker.record_success(url)
                 caught = False
                 for status_code, instructions in status_code_plan.items():
                     if isinstance(status_code, int) and e.status == status_code:
@@ -182,12 +395,19 @@ class AsyncRequester:
                             raise
                         self.logger.debug(f"{url} EXCEPTION: {FileLoggingManager.format_exception(e)}")
                         self.logger.debug(f"{url} RESPONSE HEADERS: {dict(response.headers)}")
-                        await asyncio.sleep(
-                            self._randomize_and_backoff_sleep(
-                                base_sleep=instructions.get("sleep_seconds", 2),
-                                attempt_counter=attempt_counter
-                            )
+                        planned_sleep = self._randomize_and_backoff_sleep(
+                            base_sleep=instructions.get("sleep_seconds", 2),
+                            attempt_counter=attempt_counter
                         )
+                        if retry_after is not None and instructions.get("respect_retry_after", True):
+                            planned_sleep = max(planned_sleep, retry_after)
+                        if planned_sleep > instructions.get("max_sleep_seconds", float("inf")):
+                            self.logger.debug(f"{url} NOT RETRYING: planned sleep of {planned_sleep:.1f} seconds exceeds {instructions['max_sleep_seconds']} seconds")
+                            raise
+                        if not self._retry_allowed(url):
+                            raise
+                        await asyncio.sleep(planned_sleep)
+                        tracking["sleep_seconds"] += planned_sleep
                         break
                 if not caught:
                     raise
@@ -195,12 +415,24 @@ class AsyncRequester:
     def _ensure_session(self):
         """Lazily initialize session and dispatchers if not already created"""
         if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+            if self.shared_connector is not None:
+                connector_config = self.shared_connector.config
+                connector, connector_owner = self.shared_connector.connector, False
+            else:
+                connector_config = self.connector_config
+                connector, connector_owner = connector_config.create_connector(), True
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                connector=connector,
+                connector_owner=connector_owner,
+                headers={"Accept-Encoding": connector_config.accept_encoding} if connector_config.accept_encoding is not None else None,
+            )
             self._dispatchers = {
                 "get": self._session.get,
                 "post": self._session.post,
                 "text": self._read_text,
                 "json": self._read_json,
+                "json_stream": self._read_json_stream,
                 "bytes": self._read_bytes,
             }
                  
@@ -210,6 +442,61 @@ class AsyncRequester:
     async def _read_json(self, response: aiohttp.ClientResponse):
         return await response.json()
 
+    async def _read_json_stream(self, response: aiohttp.ClientResponse):
+        """
+        Decode a JSON object incrementally as chunks of the (decompressed) body arrive, without buffering the whole body first.
+        Items of a top-level "features" array are built one at a time from the parser events, and the response object is assembled from them.
+        """
+        if ijson is None:
+            return await response.json()
+        if "json" not in response.content_type:
+            raise aiohttp.ContentTypeError(
+                response.request_info,
+                response.history,
+                status=response.status,
+                message=f"Attempt to decode JSON with unexpected mimetype: {response.content_type}",
+                headers=response.headers,
+            )
+        events = ijson.sendable_list()
+        parser = ijson.parse_coro(events, use_float=True)
+        response_json, features = dict(), list()
+        key, builder, depth = None, None, 0
+
+        def _build(prefix: str, event: str, value):
+            nonlocal key, builder, depth
+            if builder is None:
+                if prefix == "" and event == "map_key":
+                    key = value
+                    if key == "features":
+                        response_json[key] = features
+                    else:
+                        builder = ijson.ObjectBuilder()
+                    return
+                if prefix != "features.item":
+                    return # the top-level object and the "features" array itself
+                builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+            if event in ("start_map", "start_array"):
+                depth += 1
+            elif event in ("end_map", "end_array"):
+                depth -= 1
+            if depth == 0:
+                if key == "features":
+                    features.append(builder.value)
+                else:
+                    response_json[key] = builder.value
+                builder = None
+
+        async for chunk in response.content.iter_chunked(2**16):
+            parser.send(chunk)
+            for prefix, event, value in events:
+                _build(prefix, event, value)
+            del events[:]
+        parser.close()
+        for prefix, event, value in events:
+            _build(prefix, event, value)
+        return response_json
+
     async def _read_bytes(self, response: aiohttp.ClientResponse):
         return await response.read()
 
@@ -223,6 +510,38 @@ class AsyncRequester:
         else:
             return "bytes"
 
+    def _rate_limited(self, url: str):
+        """Context manager applying the `rate_limiter` to a single request attempt, or doing nothing if there is no `rate_limiter`"""
+        if self.rate_limiter is None:
+            return nullcontext()
+        return self.rate_limiter.limit(url)
+
+    def _retry_allowed(self, url: str) -> bool:
+        """Check the `circuit_breaker` and withdraw from the `retry_budget` before a retry attempt"""
+        if self.circuit_breaker is not None and self.circuit_breaker.is_open(url):
+            self.logger.debug(f"{url} NOT RETRYING: circuit is open for {host_from_url(url)}")
+            return False
+        if self.retry_budget is not None and not self.retry_budget.try_withdraw():
+            self.logger.debug(f"{url} NOT RETRYING: retry budget is spent")
+            return False
+        return True
+
+    async def _backoff_sleep(self, base_sleep: int | float, attempt_counter: int | float) -> int | float:
+        """Sleep for a randomized backoff duration and return the number of seconds slept"""
+        sleep_seconds = self._randomize_and_backoff_sleep(base_sleep=base_sleep, attempt_counter=attempt_counter)
+        await asyncio.sleep(sleep_seconds)
+        return sleep_seconds
+
+    def _report_metrics(self, record: RequestRecord):
+        """Pass a `RequestRecord` to the `metrics_hook` and any `track_request_metrics()` scopes. Failures of the hook are logged and never interrupt the request."""
+        for hook in (self.metrics_hook, *scoped_request_metrics()):
+            if hook is None:
+                continue
+            try:
+                hook(record)
+            except Exception as e:
+                self.logger.debug(f"{record.url} METRICS HOOK EXCEPTION: {FileLoggingManager.format_exception(e)}")
+
     def _randomize_and_backoff_sleep(self, base_sleep: int | float, attempt_counter: int | float) -> int | float:
         """Backoff sleep times based on attempt count, and add an element of randomization to avoid a 'stampeding herd' situation"""
         backoff_sleep = base_sleep * max(attempt_counter, 1)
@@ -232,40 +551,128 @@ class AsyncRequester:
     
 
 class AsyncArcGisRequester(AsyncRequester):
-    
+    """
+    `AsyncRequester` with helpers for ArcGIS REST API feature layers
+
+    Attributes
+    ----------
+    stream_feature_pages : bool
+        Decode each page of features incrementally as compressed bytes arrive, instead of buffering the page body before parsing it, by default False.
+        Lowers peak memory per page. Requires the optional `ijson` dependency, and falls back to buffered decoding without it.
+    """
+
+    def __init__(self, *args, stream_feature_pages: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stream_feature_pages = stream_feature_pages
+
     async def paginate_json_features(self, base_url: str, params: dict, max_record_count: int, ssl: ssl.SSLContext | bool = True) -> dict:
+        return await self._paginate_features(base_url=base_url, params=params, max_record_count=max_record_count, ssl=ssl, query_format="json")
 
-        async def _paginate(current_paginating_params: dict) -> dict:
-            feature_response = await self.send_request(
-                url=f"{base_url}/query?",
-                request_method="get",
-                read_method="json",
-                params=current_paginating_params,
+    async def paginate_pbf_features(self, base_url: str, params: dict, max_record_count: int, ssl: ssl.SSLContext | bool = True) -> dict:
+        """
+        Paginate features with `f=pbf` requests, which are several times smaller than `f=json` responses.
+        Pages are decoded into the same ArcGIS JSON structure that `paginate_json_features()` returns.
+        Only use with layers that list "PBF" in the `supportedQueryFormats` of their resource info.
+        """
+        return await self._paginate_features(base_url=base_url, params={**params, "f": "pbf"}, max_record_count=max_record_count, ssl=ssl, query_format="pbf")
+
+    async def query_features_by_object_ids(
+        self,
+        base_url: str,
+        params: dict,
+        object_ids: list[int],
+        chunk_size: int,
+        ssl: ssl.SSLContext | bool = True
+    ) -> dict:
+        """
+        Query features by object ID, sending chunks of `chunk_size` object IDs as concurrent POST requests.
+        Uses `f=pbf` when `params` requests it, and returns the same ArcGIS JSON structure as `paginate_json_features()`.
+        """
+        query_format = "pbf" if params.get("f") == "pbf" else "json"
+
+        async def _query_chunk(chunk: list[int]) -> dict:
+            return await with_retry_async(
+                self._query_feature_page,
+                url=f"{base_url}/query",
+                request_method="post",
+                params={**params, "objectIds": ",".join(str(oid) for oid in chunk)},
+                label=f"objectIds={len(chunk)}",
                 ssl=ssl,
-                timeout=aiohttp.ClientTimeout(total=45)
+                query_format=query_format,
+                retry_logger=self.logger,
+                retry_condition=lambda e: self._page_retry_allowed(base_url, e)
             )
-            validate_arcgis_json(feature_response, expected_keys=("features", "spatialReference"), expected_keys_requirement="all")
-            return feature_response
+
+        chunks = [object_ids[i: i + chunk_size] for i in range(0, len(object_ids), chunk_size)]
+        feature_responses = await asyncio.gather(*(_query_chunk(chunk) for chunk in chunks))
+        return self._merge_feature_responses(feature_responses)
+
+    async def _paginate_features(self, base_url: str, params: dict, max_record_count: int, ssl: ssl.SSLContext | bool, query_format: Literal["json", "pbf"]) -> dict:
 
         paginating = True
         all_feature_responses = list()
         paginating_params = {**params, "resultRecordCount": max_record_count, "resultOffset": 0}
         while paginating:
             feature_response = await with_retry_async(
-                _paginate,
-                current_paginating_params=paginating_params,
-                retry_logger=self.logger
+                self._query_feature_page,
+                url=f"{base_url}/query?",
+                request_method="get",
+                params=dict(paginating_params),
+                label=f"resultOffset={paginating_params['resultOffset']}",
+                ssl=ssl,
+                query_format=query_format,
+                retry_logger=self.logger,
+                retry_condition=lambda e: self._page_retry_allowed(base_url, e)
             )
             all_feature_responses.append(feature_response)
             paginating_params["resultOffset"] += max_record_count
             paginating = feature_response.get("exceededTransferLimit", False)
 
-        assert len({json.dumps(resp["spatialReference"], sort_keys=True) for resp in all_feature_responses}) == 1, "paginated feature responses contain more than one unique spatial reference!"
-        spatial_reference = all_feature_responses[0]["spatialReference"]
+        return self._merge_feature_responses(all_feature_responses)
+
+    def _page_retry_allowed(self, url: str, e: Exception) -> bool:
+        """Page level retries are never sent to an open circuit, and are withdrawn from the `retry_budget` like `send_request()` retries"""
+        if isinstance(e, CircuitOpen):
+            return False
+        return self._retry_allowed(url)
+
+    async def _query_feature_page(
+        self,
+        url: str,
+        request_method: Literal["get", "post"],
+        params: dict,
+        label: str,
+        ssl: ssl.SSLContext | bool,
+        query_format: Literal["json", "pbf"]
+    ) -> dict:
+        request_kwargs = dict(
+            url=url,
+            request_method=request_method,
+            operation="pagination" if request_method == "get" else "query",
+            label=label,
+            ssl=ssl,
+            timeout=aiohttp.ClientTimeout(total=45)
+        )
+        request_kwargs["params" if request_method == "get" else "data"] = params
+        if query_format == "pbf":
+            content, headers = await self.send_request(read_method="bytes", return_headers=True, **request_kwargs)
+            # errors are returned as json, even when requesting f=pbf
+            feature_response = json.loads(content) if "json" in headers.get("Content-Type", "") else decode_feature_collection_pbf(content)
+        else:
+            feature_response = await self.send_request(read_method="json_stream" if self.stream_feature_pages else "json", **request_kwargs)
+        # responses to queries using returnGeometry=false do not include a spatial reference
+        returns_geometry = str(params.get("returnGeometry", "true")).lower() != "false"
+        validate_arcgis_json(feature_response, expected_keys=("features", "spatialReference") if returns_geometry else ("features",), expected_keys_requirement="all")
+        # json pages requested with quantizationParameters have a transform, pbf pages were already dequantized while decoding
+        return dequantize_arcgis_json(feature_response)
+
+    def _merge_feature_responses(self, feature_responses: list[dict]) -> dict:
+
+        spatial_references = {json.dumps(resp["spatialReference"], sort_keys=True) for resp in feature_responses if "spatialReference" in resp}
+        assert len(spatial_references) <= 1, "paginated feature responses contain more than one unique spatial reference!"
 
-        arcgis_json = {
-            "features": [feat for resp in all_feature_responses for feat in resp["features"]],
-            "spatialReference": spatial_reference,
-        }
+        arcgis_json = {"features": [feat for resp in feature_responses for feat in resp["features"]]}
+        if spatial_references:
+            arcgis_json["spatialReference"] = json.loads(spatial_references.pop())
 
         return arcgis_json
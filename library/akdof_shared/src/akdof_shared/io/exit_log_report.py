@@ -0,0 +1,141 @@
+from datetime import datetime as dt
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from akdof_shared.io.run_history import RunHistoryStore
+from akdof_shared.protocol.datetime_info import enforce_utc
+from akdof_shared.protocol.file_logging_manager import ExitStatus
+
+_EXIT_LOG_COLUMNS = ["exit_datetime", "project", "script", "exit_code"]
+
+def load_exit_log(exit_log: Path, since: dt | None = None) -> pd.DataFrame:
+    """
+    Load an exit log written by `Write-ExitLog`, such as `admin/exit_log/exit_log.csv`.
+
+    Parameters
+    ----------
+    exit_log : Path
+        Header-less CSV of `timestamp,project,script,exit_code` lines
+    since : dt | None, optional
+        Only keep runs that exited at or after this datetime, by default None
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns `exit_datetime` (UTC), `project`, `script`, and `exit_code`, sorted by `exit_datetime`
+    """
+    exit_log_df = pd.read_csv(exit_log, header=None, names=_EXIT_LOG_COLUMNS, skip_blank_lines=True)
+    exit_log_df["exit_datetime"] = pd.to_datetime(exit_log_df["exit_datetime"], utc=True, format="ISO8601")
+    exit_log_df["exit_code"] = exit_log_df["exit_code"].astype(int)
+    if since is not None:
+        exit_log_df = exit_log_df[exit_log_df["exit_datetime"] >= enforce_utc(since)]
+    return exit_log_df.sort_values("exit_datetime").reset_index(drop=True)
+
+def attach_run_durations(
+    exit_log_df: pd.DataFrame,
+    run_history: RunHistoryStore,
+    tolerance: timedelta = timedelta(minutes=10),
+) -> pd.DataFrame:
+    """
+    Match exit log rows to the "main" runs recorded in `run_history` by a `MainExitManager`, adding a `seconds` column.
+
+    A run is matched to the first exit logged for its project at or after the run ended, within `tolerance`.
+    Rows without a matching run get a `seconds` value of NaN.
+    """
+    runs = run_history.runs(operation="main")
+    if not runs:
+        return exit_log_df.assign(seconds=np.nan)
+
+    runs_df = pd.DataFrame({
+        "project": [run.alias for run in runs],
+        "seconds": [run.seconds for run in runs],
+        "run_end_datetime": [
+            pd.Timestamp(run.started_utc).tz_convert("UTC") + pd.Timedelta(seconds=run.seconds) for run in runs
+        ],
+    }).sort_values("run_end_datetime")
+
+    merged = pd.merge_asof(
+        exit_log_df.sort_values("exit_datetime"),
+        runs_df,
+        left_on="exit_datetime",
+        right_on="run_end_datetime",
+        by="project",
+        direction="backward",
+        tolerance=pd.Timedelta(tolerance),
+    )
+    return merged.drop(columns="run_end_datetime")
+
+def exit_log_report(
+    exit_log_df: pd.DataFrame,
+    recent_runs: int = 7,
+    slowdown_ratio: float = 1.25,
+) -> pd.DataFrame:
+    """
+    Summarize reliability and run time per project and script.
+
+    Parameters
+    ----------
+    exit_log_df : pd.DataFrame
+        Output of `load_exit_log()`, optionally with a `seconds` column from `attach_run_durations()`
+    recent_runs : int, optional
+        Number of most recent runs compared against all earlier runs when flagging slowdowns, by default 7
+    slowdown_ratio : float, optional
+        Ratio of recent to earlier median run time at which a project is flagged as slowing down, by default 1.25
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per project and script, with columns
+        `runs`, `last_exit_datetime`, `last_exit_code`, `ok_rate`, `warning_rate`, `failure_rate`,
+        `recent_failure_rate`, `seconds_p50`, `seconds_p90`, `seconds_p95`, `seconds_max`,
+        `seconds_per_day_trend`, `recent_seconds_p50`, `earlier_seconds_p50`, and `slowdown`.
+        Failures are exits with any code other than `ExitStatus.OK` or `ExitStatus.WARNING`.
+    """
+    if "seconds" not in exit_log_df:
+        exit_log_df = exit_log_df.assign(seconds=np.nan)
+
+    rows = list()
+    for (project, script), group in exit_log_df.sort_values("exit_datetime").groupby(["project", "script"], sort=True):
+        exit_codes = group["exit_code"]
+        failures = ~exit_codes.isin((ExitStatus.OK, ExitStatus.WARNING))
+
+        timed = group.dropna(subset="seconds")
+        seconds = timed["seconds"]
+        recent_seconds, earlier_seconds = seconds.iloc[-recent_runs:], seconds.iloc[:-recent_runs]
+        recent_p50 = recent_seconds.median() if len(recent_seconds) else np.nan
+        earlier_p50 = earlier_seconds.median() if len(earlier_seconds) else np.nan
+
+        rows.append({
+            "project": project,
+            "script": script,
+            "runs": len(group),
+            "last_exit_datetime": group["exit_datetime"].iloc[-1],
+            "last_exit_code": int(exit_codes.iloc[-1]),
+            "ok_rate": float((exit_codes == ExitStatus.OK).mean()),
+            "warning_rate": float((exit_codes == ExitStatus.WARNING).mean()),
+            "failure_rate": float(failures.mean()),
+            "recent_failure_rate": float(failures.iloc[-recent_runs:].mean()),
+            "seconds_p50": seconds.quantile(0.5) if len(seconds) else np.nan,
+            "seconds_p90": seconds.quantile(0.9) if len(seconds) else np.nan,
+            "seconds_p95": seconds.quantile(0.95) if len(seconds) else np.nan,
+            "seconds_max": seconds.max() if len(seconds) else np.nan,
+            "seconds_per_day_trend": _seconds_per_day_trend(timed),
+            "recent_seconds_p50": recent_p50,
+            "earlier_seconds_p50": earlier_p50,
+            "slowdown": bool(len(earlier_seconds) >= 2 and len(recent_seconds) >= 2 and recent_p50 >= slowdown_ratio * earlier_p50),
+        })
+
+    return pd.DataFrame(rows)
+
+def _seconds_per_day_trend(timed: pd.DataFrame) -> float:
+    """Least squares slope of run time against exit time, in seconds of run time per day"""
+    if len(timed) < 2:
+        return np.nan
+    days = (timed["exit_datetime"] - timed["exit_datetime"].iloc[0]).dt.total_seconds().to_numpy() / 86_400
+    if np.ptp(days) == 0:
+        return np.nan
+    slope, _ = np.polyfit(days, timed["seconds"].to_numpy(dtype=float), 1)
+    return float(slope)
@@ -0,0 +1,152 @@
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime as dt, timezone as tz
+from email.utils import parsedate_to_datetime
+from fnmatch import fnmatch
+import time
+from typing import AsyncIterator, Mapping
+
+from akdof_shared.io.request_metrics import host_from_url
+
+@dataclass(frozen=True)
+class HostLimits:
+    """
+    Token bucket and concurrency limits for requests sent to a single host (or group of hosts).
+
+    Attributes
+    ----------
+    requests_per_second : float
+        Steady state rate at which tokens are added to the bucket
+    burst : int
+        Maximum number of tokens the bucket can hold
+    max_concurrency : int
+        Maximum number of requests in flight at the same time
+    min_requests_per_second : float
+        Lower bound for the rate after repeated 429 responses, by default 0.2
+    """
+    requests_per_second: float
+    burst: int
+    max_concurrency: int
+    min_requests_per_second: float = 0.2
+
+DEFAULT_HOST_LIMITS = HostLimits(requests_per_second=5, burst=5, max_concurrency=4)
+"""Conservative limits suitable for small county or borough servers"""
+
+class _HostBucket:
+    """Token bucket with a concurrency semaphore, and a rate that tightens on 429 responses and recovers on successes"""
+
+    def __init__(self, limits: HostLimits):
+        self.limits = limits
+        self.rate = float(limits.requests_per_second)
+        self.tokens = float(limits.burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.semaphore = asyncio.Semaphore(limits.max_concurrency)
+        self.lock = asyncio.Lock()
+
+    async def take_token(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+                self.tokens = min(float(self.limits.burst), self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def throttle(self, retry_after: float | None):
+        now = time.monotonic()
+        self.rate = max(self.limits.min_requests_per_second, self.rate / 2)
+        self.tokens = 0.0
+        self.updated = now
+        if retry_after:
+            self.blocked_until = max(self.blocked_until, now + retry_after)
+
+    def recover(self):
+        self.rate = min(float(self.limits.requests_per_second), self.rate + self.limits.requests_per_second * 0.1)
+
+class HostRateLimiter:
+    """
+    Per-host token bucket and concurrency limiter for `AsyncRequester`.
+
+    Every attempt made by `AsyncRequester.send_request()` waits for a concurrency slot and a token from the bucket of its host.
+    A 429 response halves the host's rate, empties its bucket, and blocks the host for the duration of any `Retry-After` header.
+    Each successful response then restores 10% of the configured rate, until the configured rate is reached again.
+
+    Attributes
+    ----------
+    default_limits : HostLimits
+        Limits for hosts that do not match a `host_limits` pattern, by default `DEFAULT_HOST_LIMITS`
+    host_limits : Mapping[str, HostLimits] | None
+        Limits keyed by `fnmatch` style host patterns, for example "services*.arcgis.com", by default None.
+        First matching pattern wins, and all hosts matching the same pattern share a single bucket.
+    """
+
+    def __init__(self, default_limits: HostLimits = DEFAULT_HOST_LIMITS, host_limits: Mapping[str, HostLimits] | None = None):
+        self.default_limits = default_limits
+        self.host_limits = dict(host_limits or dict())
+        self._buckets: dict[str, _HostBucket] = dict()
+
+    @asynccontextmanager
+    async def limit(self, url: str) -> AsyncIterator[None]:
+        """Hold a concurrency slot and consume a token for the host of `url` while the context is active"""
+        bucket = self._bucket(url)
+        async with bucket.semaphore:
+            await bucket.take_token()
+            yield
+
+    def throttle(self, url: str, retry_after: float | None = None):
+        """Tighten the limits for the host of `url` after a 429 response"""
+        self._bucket(url).throttle(retry_after)
+
+    def recover(self, url: str):
+        """Loosen previously tightened limits for the host of `url` after a successful response"""
+        self._bucket(url).recover()
+
+    def current_rate(self, url: str) -> float:
+        """Current requests per second for the host of `url`"""
+        return self._bucket(url).rate
+
+    def _bucket(self, url: str) -> _HostBucket:
+        host = host_from_url(url).split(":")[0].lower()
+        key, limits = host, self.default_limits
+        for pattern, pattern_limits in self.host_limits.items():
+            if fnmatch(host, pattern.lower()):
+                key, limits = pattern, pattern_limits
+                break
+        if key not in self._buckets:
+            self._buckets[key] = _HostBucket(limits)
+        return self._buckets[key]
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Parse a `Retry-After` header value.
+
+    Parameters
+    ----------
+    value : str | None
+        Delay in seconds, or an HTTP date
+
+    Returns
+    -------
+    float | None
+        Seconds to wait, or None if the value is missing or cannot be parsed
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_dt = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_dt.tzinfo is None:
+        retry_dt = retry_dt.replace(tzinfo=tz.utc)
+    return max((retry_dt - dt.now(tz.utc)).total_seconds(), 0.0)
@@ -0,0 +1,163 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import heapq
+import logging
+from typing import Iterator, Protocol
+from urllib.parse import urlsplit
+
+@dataclass(frozen=True)
+class RequestRecord:
+    """
+    Timing and size information for a single `AsyncRequester.send_request()` call, including all of its retry attempts.
+
+    Attributes
+    ----------
+    url : str
+    host : str
+    operation : str
+        Logical operation the request belongs to, for example "pagination" or "edit"
+    method : str
+        HTTP request method
+    status : int | None
+        Status code of the final attempt, or None if no response was received
+    latency_seconds : float
+        Wall time of the call, including retry attempts and backoff sleeps
+    ttfb_seconds : float | None
+        Time from sending the final attempt until response headers were received
+    response_bytes : int
+        Size of the final response body
+    retries : int
+        Number of attempts made after the first
+    sleep_seconds : float
+        Time spent in backoff sleeps between attempts
+    label : str | None
+        Caller supplied context, for example the page offset or edit batch
+    """
+    url: str
+    host: str
+    operation: str
+    method: str
+    status: int | None
+    latency_seconds: float
+    ttfb_seconds: float | None
+    response_bytes: int
+    retries: int
+    sleep_seconds: float
+    label: str | None = None
+
+class RequestMetricsHook(Protocol):
+    def __call__(self, record: RequestRecord) -> None:
+        """Observe a completed `AsyncRequester.send_request()` call. Called whether the call succeeded or raised."""
+        ...
+
+@dataclass
+class RequestMetricsAggregate:
+    """Running totals for all requests sharing a host and logical operation"""
+    requests: int = 0
+    errors: int = 0
+    latency_seconds: float = 0.0
+    max_latency_seconds: float = 0.0
+    ttfb_seconds: float = 0.0
+    response_bytes: int = 0
+    retries: int = 0
+    sleep_seconds: float = 0.0
+    status_codes: dict[int | None, int] = field(default_factory=dict)
+
+    def add(self, record: RequestRecord):
+        self.requests += 1
+        self.errors += int(record.status is None or record.status >= 400)
+        self.latency_seconds += record.latency_seconds
+        self.max_latency_seconds = max(self.max_latency_seconds, record.latency_seconds)
+        self.ttfb_seconds += record.ttfb_seconds or 0.0
+        self.response_bytes += record.response_bytes
+        self.retries += record.retries
+        self.sleep_seconds += record.sleep_seconds
+        self.status_codes[record.status] = self.status_codes.get(record.status, 0) + 1
+
+    def summary(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "mean_latency_seconds": round(self.latency_seconds / self.requests, 3) if self.requests else None,
+            "max_latency_seconds": round(self.max_latency_seconds, 3),
+            "mean_ttfb_seconds": round(self.ttfb_seconds / self.requests, 3) if self.requests else None,
+            "response_megabytes": round(self.response_bytes / 1024**2, 3),
+            "retries": self.retries,
+            "sleep_seconds": round(self.sleep_seconds, 3),
+            "status_codes": {str(status): count for status, count in self.status_codes.items()},
+        }
+
+class RequestMetrics:
+    """
+    A `RequestMetricsHook` that aggregates `RequestRecord` objects per host and per logical operation,
+    and keeps the slowest individual requests for identifying which layer, page, or edit batch is slow.
+
+    Attributes
+    ----------
+    slowest_count : int
+        Number of slowest individual requests to keep, by default 10.
+    """
+
+    def __init__(self, slowest_count: int = 10):
+        self.slowest_count = slowest_count
+        self.aggregates: dict[tuple[str, str], RequestMetricsAggregate] = dict()
+        self._slowest: list[tuple[float, int, RequestRecord]] = list()
+        self._counter = 0
+
+    def __call__(self, record: RequestRecord) -> None:
+        key = (record.host, record.operation)
+        if key not in self.aggregates:
+            self.aggregates[key] = RequestMetricsAggregate()
+        self.aggregates[key].add(record)
+
+        self._counter += 1
+        entry = (record.latency_seconds, self._counter, record)
+        if len(self._slowest) < self.slowest_count:
+            heapq.heappush(self._slowest, entry)
+        else:
+            heapq.heappushpop(self._slowest, entry)
+
+    @property
+    def slowest(self) -> list[RequestRecord]:
+        """Slowest individual requests, in descending order of latency"""
+        return [record for _, _, record in sorted(self._slowest, reverse=True)]
+
+    def summary(self) -> dict[str, dict]:
+        """Aggregated metrics keyed by `"{host} {operation}"`"""
+        return {f"{host} {operation}": aggregate.summary() for (host, operation), aggregate in sorted(self.aggregates.items())}
+
+    def log_summary(self, logger: logging.Logger, level: int = logging.INFO):
+        """Write one log record per host and operation, followed by the slowest individual requests"""
+        for key, summary in self.summary().items():
+            logger.log(level, f"REQUEST METRICS {key}: {summary}")
+        for record in self.slowest:
+            logger.log(
+                level,
+                f"SLOW REQUEST {record.operation} {record.method.upper()} {record.url} ({record.label}): {record.latency_seconds:.3f}s, "
+                f"status {record.status}, {record.response_bytes} bytes, {record.retries} retries, {record.sleep_seconds:.3f}s sleeping"
+            )
+
+_SCOPED_METRICS: ContextVar[tuple[RequestMetrics, ...]] = ContextVar("scoped_request_metrics", default=tuple())
+
+@contextmanager
+def track_request_metrics(slowest_count: int = 0) -> Iterator[RequestMetrics]:
+    """
+    Collect `RequestRecord` objects for every `AsyncRequester.send_request()` call made within the context, independent of any `metrics_hook`.
+    Tasks created within the context inherit it, so concurrent requests made on behalf of a single layer or edit are attributed to it.
+    Scopes can be nested, and every active scope receives each record.
+    """
+    metrics = RequestMetrics(slowest_count=slowest_count)
+    token = _SCOPED_METRICS.set((*_SCOPED_METRICS.get(), metrics))
+    try:
+        yield metrics
+    finally:
+        _SCOPED_METRICS.reset(token)
+
+def scoped_request_metrics() -> tuple[RequestMetrics, ...]:
+    """Metrics collectors of all `track_request_metrics()` scopes active in the current context"""
+    return _SCOPED_METRICS.get()
+
+def host_from_url(url: str) -> str:
+    """Network location of a URL, used to group requests by host"""
+    return urlsplit(str(url)).netloc
@@ -0,0 +1,111 @@
+from collections import deque
+import time
+
+from akdof_shared.io.request_metrics import host_from_url
+
+class CircuitOpen(Exception):
+    """Raised by `AsyncRequester.send_request()` instead of sending a request to a host whose circuit is open"""
+
+class _HostCircuit:
+    def __init__(self):
+        self.failures: deque[float] = deque()
+        self.open_until = 0.0
+        self.probe_started: float | None = None
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker for `AsyncRequester`.
+
+    A host's circuit opens once it has produced `failure_threshold` failures (connection errors, timeouts, 408, 429, or 5xx responses) within `window_seconds`.
+    While open, requests to the host fail fast with `CircuitOpen` and pending retries are abandoned.
+    After `cooldown_seconds` a single probe request is let through: success closes the circuit, failure opens it for another cooldown.
+
+    Attributes
+    ----------
+    failure_threshold : int
+        Failures within `window_seconds` that open the circuit, by default 8
+    window_seconds : float
+        Sliding window for counting failures, by default 60
+    cooldown_seconds : float
+        How long the circuit stays open before a probe request is allowed, by default 60
+    """
+
+    def __init__(self, failure_threshold: int = 8, window_seconds: float = 60, cooldown_seconds: float = 60):
+        self.failure_threshold = failure_threshold
+        self.window_seconds = window_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self._circuits: dict[str, _HostCircuit] = dict()
+
+    def before_attempt(self, url: str):
+        """
+        Raises
+        ------
+        CircuitOpen
+            The circuit for the host of `url` is open, or half open with a probe request already in flight.
+        """
+        circuit = self._circuit(url)
+        now = time.monotonic()
+        if now < circuit.open_until:
+            raise CircuitOpen(f"{host_from_url(url)} circuit is open for another {circuit.open_until - now:.1f} seconds")
+        if circuit.open_until:
+            # half open, a probe that never reported back is replaced after another cooldown
+            if circuit.probe_started is not None and now - circuit.probe_started < self.cooldown_seconds:
+                raise CircuitOpen(f"{host_from_url(url)} circuit is half open and waiting on a probe request")
+            circuit.probe_started = now
+
+    def record_success(self, url: str):
+        circuit = self._circuit(url)
+        if circuit.open_until:
+            circuit.failures.clear()
+            circuit.open_until = 0.0
+            circuit.probe_started = None
+
+    def record_failure(self, url: str):
+        circuit = self._circuit(url)
+        now = time.monotonic()
+        circuit.failures.append(now)
+        while circuit.failures and now - circuit.failures[0] > self.window_seconds:
+            circuit.failures.popleft()
+        if circuit.probe_started is not None or len(circuit.failures) >= self.failure_threshold:
+            circuit.open_until = now + self.cooldown_seconds
+            circuit.probe_started = None
+
+    def is_open(self, url: str) -> bool:
+        return time.monotonic() < self._circuit(url).open_until
+
+    def _circuit(self, url: str) -> _HostCircuit:
+        host = host_from_url(url).lower()
+        if host not in self._circuits:
+            self._circuits[host] = _HostCircuit()
+        return self._circuits[host]
+
+class RetryBudget:
+    """
+    Retry budget shared by concurrent `AsyncRequester.send_request()` calls.
+
+    Each call deposits `ratio` retry tokens, and each retry withdraws one. When the budget is empty the error that
+    would have been retried is raised instead, so retries cannot grow beyond roughly `ratio` times the request volume during an outage.
+
+    Attributes
+    ----------
+    ratio : float
+        Retry tokens deposited per call, by default 0.2
+    minimum : float
+        Initial balance, which allows a few retries before any requests have been made, by default 10
+    capacity : float
+        Maximum balance, by default 50
+    """
+
+    def __init__(self, ratio: float = 0.2, minimum: float = 10, capacity: float = 50):
+        self.ratio = ratio
+        self.capacity = capacity
+        self.balance = float(minimum)
+
+    def record_request(self):
+        self.balance = min(self.capacity, self.balance + self.ratio)
+
+    def try_withdraw(self) -> bool:
+        if self.balance < 1:
+            return False
+        self.balance -= 1
+        return True
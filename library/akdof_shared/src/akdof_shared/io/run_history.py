@@ -0,0 +1,202 @@
+from contextlib import closing
+from dataclasses import asdict, dataclass, field
+from datetime import datetime as dt
+import json
+from pathlib import Path
+import sqlite3
+from typing import Literal
+
+from akdof_shared.io.request_metrics import RequestMetrics
+
+RunStatus = Literal["succeeded", "failed", "cancelled"]
+
+@dataclass(frozen=True)
+class RunRecord:
+    """
+    Metrics for a single refresh of an input feature layer, or a single edit of a target feature layer.
+
+    Attributes
+    ----------
+    alias : str
+        Readable identifier of the layer, for example an `InputFeatureLayer.alias`
+    operation : str
+        "refresh" or "edit"
+    started_utc : str
+        ISO 8601 UTC datetime the run started
+    seconds : float
+        Wall time of the run
+    status : RunStatus
+    feature_count : int | None
+        Features refreshed or added, None if the run did not get that far
+    requests : int
+        `AsyncRequester.send_request()` calls made during the run, including their retries
+    pages : int
+        Pagination requests made during the run
+    response_bytes : int
+    retries : int
+    errors : int
+        Requests that ended without a response or with an error status code
+    details : dict
+        Additional JSON serializable context, for example edit counts or an error message
+    """
+    alias: str
+    operation: str
+    started_utc: str
+    seconds: float
+    status: RunStatus
+    feature_count: int | None = None
+    requests: int = 0
+    pages: int = 0
+    response_bytes: int = 0
+    retries: int = 0
+    errors: int = 0
+    details: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_request_metrics(cls, request_metrics: RequestMetrics, **kwargs) -> "RunRecord":
+        """Create a record with request totals taken from a `RequestMetrics` collector, such as one yielded by `track_request_metrics()`"""
+        aggregates = request_metrics.aggregates
+        return cls(
+            requests=sum(a.requests for a in aggregates.values()),
+            pages=sum(a.requests for (_, operation), a in aggregates.items() if operation == "pagination"),
+            response_bytes=sum(a.response_bytes for a in aggregates.values()),
+            retries=sum(a.retries for a in aggregates.values()),
+            errors=sum(a.errors for a in aggregates.values()),
+            **kwargs,
+        )
+
+_COLUMNS = ("alias", "operation", "started_utc", "seconds", "status", "feature_count", "requests", "pages", "response_bytes", "retries", "errors", "details")
+
+class RunHistoryStore:
+    """
+    Local SQLite store of `RunRecord` objects, keyed by alias, operation, and start time.
+
+    Every call opens its own short lived connection, so a store can be shared across threads and processes.
+    Writes are small and infrequent, and should be sent to a thread executor when called from async code.
+
+    Attributes
+    ----------
+    path : Path
+        SQLite database file, created along with its parent directories if it does not exist
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as connection, connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    alias TEXT NOT NULL,
+                    operation TEXT NOT NULL,
+                    started_utc TEXT NOT NULL,
+                    seconds REAL NOT NULL,
+                    status TEXT NOT NULL,
+                    feature_count INTEGER,
+                    requests INTEGER NOT NULL,
+                    pages INTEGER NOT NULL,
+                    response_bytes INTEGER NOT NULL,
+                    retries INTEGER NOT NULL,
+                    errors INTEGER NOT NULL,
+                    details TEXT NOT NULL
+                )
+                """
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS runs_alias_operation_started ON runs (alias, operation, started_utc)")
+
+    def record(self, run: RunRecord):
+        values = {**asdict(run), "details": json.dumps(run.details, default=str)}
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                f"INSERT INTO runs ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' for _ in _COLUMNS)})",
+                tuple(values[column] for column in _COLUMNS)
+            )
+
+    def runs(
+        self,
+        alias: str | None = None,
+        operation: str | None = None,
+        status: RunStatus | None = None,
+        since: dt | str | None = None,
+        limit: int | None = None
+    ) -> list[RunRecord]:
+        """
+        Query runs, most recent first.
+
+        Parameters
+        ----------
+        alias : str | None, optional
+        operation : str | None, optional
+        status : RunStatus | None, optional
+        since : dt | str | None, optional
+            Only return runs started at or after this UTC datetime, by default None
+        limit : int | None, optional
+            Maximum number of runs to return, by default None
+
+        Returns
+        -------
+        list[RunRecord]
+        """
+        where, params = self._filters(alias=alias, operation=operation, status=status, since=since)
+        query = f"SELECT {', '.join(_COLUMNS)} FROM runs{where} ORDER BY started_utc DESC, id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with closing(self._connect()) as connection:
+            rows = connection.execute(query, params).fetchall()
+        return [RunRecord(**{**dict(row), "details": json.loads(row["details"])}) for row in rows]
+
+    def latest(self, alias: str, operation: str, status: RunStatus | None = "succeeded") -> RunRecord | None:
+        """Most recent run of an operation for an alias, by default only considering successful runs"""
+        return next(iter(self.runs(alias=alias, operation=operation, status=status, limit=1)), None)
+
+    def summary(self, operation: str | None = None, since: dt | str | None = None) -> dict[str, dict]:
+        """
+        Aggregate runs per alias and operation, for spotting slow or degrading sources.
+
+        Returns
+        -------
+        dict[str, dict]
+            Aggregates keyed by `"{alias} {operation}"`
+        """
+        where, params = self._filters(operation=operation, since=since)
+        query = f"""
+            SELECT
+                alias,
+                operation,
+                COUNT(*) AS runs,
+                SUM(status = 'succeeded') AS succeeded,
+                AVG(seconds) AS mean_seconds,
+                MAX(seconds) AS max_seconds,
+                AVG(feature_count) AS mean_feature_count,
+                AVG(pages) AS mean_pages,
+                AVG(response_bytes) AS mean_response_bytes,
+                SUM(retries) AS retries,
+                MAX(started_utc) AS latest_started_utc
+            FROM runs{where}
+            GROUP BY alias, operation
+            ORDER BY alias, operation
+        """
+        with closing(self._connect()) as connection:
+            rows = connection.execute(query, params).fetchall()
+        return {f"{row['alias']} {row['operation']}": {key: row[key] for key in row.keys() if key not in ("alias", "operation")} for row in rows}
+
+    def _filters(self, **filters) -> tuple[str, list]:
+        clauses, params = list(), list()
+        for column, value in filters.items():
+            if value is None:
+                continue
+            if column == "since":
+                clauses.append("started_utc >= ?")
+                params.append(value.isoformat() if isinstance(value, dt) else value)
+            else:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        return (f" WHERE {' AND '.join(clauses)}" if clauses else "", params)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        return connection
@@ -1,12 +1,18 @@
 from datetime import datetime as dt
 from datetime import timezone as tz
 from enum import IntEnum
+import atexit
+import gzip
+import json
 import logging
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+import queue
 import re
+import shutil
 import time
 import traceback
-from typing import Iterable, Literal, NamedTuple
+from typing import Iterable, Iterator, Literal, NamedTuple
 
 import pandas as pd
 
@@ -37,6 +43,43 @@ class ExitStatus(IntEnum):
     ERROR = 40
     CRITICAL = 50
 
+LogFormat = Literal["pipe", "jsonl"]
+"""
+Log file formats written by `FileLoggingManager`.
+
+"pipe" writes `.log` files with a pipe delimited header and one pipe delimited line per record.
+"jsonl" writes `.jsonl` files with one JSON object per record, having `created` (epoch seconds), `asctime`, `levelno`, `levelname`, `module`, `lineno`, and `message` keys.
+"""
+
+_LOG_FILE_SUFFIXES: dict[str, str] = {"pipe": ".log", "jsonl": ".jsonl"}
+
+def read_json_lines_log(log_file: Path, start_offset: int = 0, since: dt | None = None) -> Iterator[dict]:
+    """
+    Read records from a "jsonl" format log file, without loading the whole file.
+
+    Parameters
+    ----------
+    log_file : Path
+    start_offset : int, optional
+        Byte offset to start reading from, for example the size of the file when a run started, by default 0
+    since : dt | None, optional
+        Only yield records created at or after this datetime, by default None
+
+    Yields
+    ------
+    dict
+        Log record, as written by the "jsonl" log format
+    """
+    since_timestamp = enforce_utc(since).timestamp() if since else None
+    with open(log_file, "rb") as file:
+        file.seek(start_offset)
+        for line in file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if since_timestamp is None or record["created"] >= since_timestamp:
+                yield record
+
 class WarningFilterAttributes(NamedTuple):
     """
     Attributes used when identifying warning level log records to filter out.
@@ -98,8 +141,23 @@ class FileLoggingManager:
         "current_configured" considers every log file that the FileLoggingManager instance configured during its lifetime.
         "full_directory" non-recursively considers every log file inside of `log_directory`.
         By default "current_configured".
+        With "current_configured", status and email checks use records kept in memory by each configured logger, and only read log files
+        when a logger was configured after the checked start datetime.
     log_file_max_lines : int = 2_000
         Maximum number of lines a log file can have before it will be archived by a `check_log_files_to_archive()` call, by default 2,000.
+        Ignored when `log_file_max_bytes` is set.
+    log_file_max_bytes : int | None = None
+        Maximum size of a log file before it will be archived by a `check_log_files_to_archive()` call, by default None.
+        Checked with a single `stat()` call per file, rather than reading every line.
+    compress_archives : bool = False
+        Write archived log files as gzip files (`<name>_<timestamp>.log.gz`, or `<name>_<timestamp>.jsonl.gz` for the "jsonl" `log_format`), by default False.
+    log_format : LogFormat = "pipe"
+        Format of log files written by the instance, by default "pipe".
+        "jsonl" files are read from the offset each file had when it was configured, instead of being parsed in full, when checking for status and emails.
+    queue_logging : bool = False
+        Route every configured logger through a `QueueHandler`, with file writes made by a single background `QueueListener` thread, by default False.
+        Keeps blocking disk writes off of the calling thread, such as an event loop thread logging at DEBUG level.
+        `flush_all_handlers()` waits for queued records to be written, and `close_all_handlers()` stops the listener after writing them.
     """
     _default_header: str = "asctime|levelname|module|lineno|message\n"
 
@@ -123,6 +181,86 @@ class FileLoggingManager:
             record.args = None
             return super().format(record)
 
+    class _JsonLinesFormatter(logging.Formatter):
+        """Formats log records as single line JSON objects, with an epoch timestamp and numeric level alongside the usual fields."""
+
+        def format(self, record: logging.LogRecord):
+            message = record.getMessage()
+            if record.exc_info:
+                message = f"{message}\n{self.formatException(record.exc_info)}"
+            return json.dumps({
+                "created": record.created,
+                "asctime": iso_from_datetime(dt.fromtimestamp(timestamp=record.created, tz=tz.utc)),
+                "levelno": record.levelno,
+                "levelname": record.levelname,
+                "module": record.module,
+                "lineno": record.lineno,
+                "message": message,
+            })
+
+
+    class _ExitLogAggregator(logging.Handler):
+        """
+        Keeps the records of a configured logger that matter at exit in memory, so exit status and notification emails don't require re-reading log files.
+        Only records at or above `minimum_level` are kept, as `(created, levelno, levelname, email_line)` tuples.
+        """
+
+        def __init__(self, level: int, minimum_level: int, log_format: LogFormat):
+            super().__init__(level=level)
+            self.minimum_level = minimum_level
+            self.log_format = log_format
+            self.since = time.time()
+            self.records: list[tuple[float, int, str, str]] = list()
+
+        def emit(self, record: logging.LogRecord):
+            if record.levelno < self.minimum_level:
+                return
+            try:
+                message = record.getMessage()
+                if self.log_format == "pipe":
+                    message = message.replace("|", "<replaced_pipe>").replace("\n", "<br>")
+                elif record.exc_info:
+                    message = f"{message}\n{logging.Formatter().formatException(record.exc_info)}"
+                asctime = iso_from_datetime(dt.fromtimestamp(timestamp=record.created, tz=tz.utc))
+                self.records.append((
+                    record.created,
+                    record.levelno,
+                    record.levelname,
+                    f"{asctime} | {record.levelname} | {record.module} | {record.lineno} | {message}",
+                ))
+            except Exception:
+                self.handleError(record)
+
+        def covers(self, start_datetime: dt) -> bool:
+            return self.since <= enforce_utc(start_datetime).timestamp()
+
+        def records_since(self, start_datetime: dt) -> list[tuple[float, int, str, str]]:
+            start_timestamp = enforce_utc(start_datetime).timestamp()
+            return [record for record in self.records if record[0] >= start_timestamp]
+
+    class _FileQueueHandler(QueueHandler):
+        """Enqueues records tagged with the log file they belong to, for the `_QueueRoutingHandler` of the instance's `QueueListener`"""
+
+        def __init__(self, log_queue: queue.Queue, log_file: Path):
+            super().__init__(log_queue)
+            self.log_file = log_file
+
+        def prepare(self, record: logging.LogRecord):
+            record = super().prepare(record)
+            record.log_file = self.log_file
+            return record
+
+    class _QueueRoutingHandler(logging.Handler):
+        """Hands records dequeued by the instance's `QueueListener` to the file handler of the log file they were tagged with"""
+
+        def __init__(self, routes: dict[Path, logging.Handler]):
+            super().__init__()
+            self.routes = routes
+
+        def emit(self, record: logging.LogRecord):
+            handler = self.routes.get(getattr(record, "log_file", None))
+            if handler is not None:
+                handler.handle(record)
 
     class _LogManifest(dict[Path, pd.DataFrame]):
         """Internal data structure used by public methods `check_log_files_for_status()`, `write_log_check_email_bodies()`, and `check_log_files_to_archive()`"""
@@ -149,6 +287,10 @@ class FileLoggingManager:
         root_logger_suppressed_warnings: Iterable[WarningFilterAttributes] | None = None,
         log_files_to_check: Literal["current_configured", "full_directory"] = "current_configured",
         log_file_max_lines: int = 2_000,
+        log_file_max_bytes: int | None = None,
+        compress_archives: bool = False,
+        log_format: LogFormat = "pipe",
+        queue_logging: bool = False,
     ):
         self.log_directory = log_directory
         self.logging_level = logging_level
@@ -156,9 +298,18 @@ class FileLoggingManager:
         self.root_logger_suppressed_warnings = root_logger_suppressed_warnings
         self.log_files_to_check = log_files_to_check
         self.log_file_max_lines = log_file_max_lines
+        self.log_file_max_bytes = log_file_max_bytes
+        self.compress_archives = compress_archives
+        self.log_format = log_format
+        self.queue_logging = queue_logging
 
         self._archive_directory = self.log_directory / "_archive_"
         self._configured_loggers: dict[Path, logging.Logger] = dict()
+        self._start_offsets: dict[Path, int] = dict()
+        self._exit_log_aggregators: dict[Path, FileLoggingManager._ExitLogAggregator] = dict()
+        self._log_queue: queue.Queue = queue.Queue()
+        self._queue_routes: dict[Path, logging.Handler] = dict()
+        self._queue_listener: QueueListener | None = None
 
         self.log_directory.mkdir(parents=True, exist_ok=True)
         self._archive_directory.mkdir(parents=True, exist_ok=True)
@@ -172,21 +323,14 @@ class FileLoggingManager:
         warning_filter: LogWarningFilter | None = None,
     ) -> logging.Logger:
         """Configure and return a file logger, which the calling `FileLoggingManager` instance will then manage"""
-        log_file = (self.log_directory / f"{Path(file_name).stem}.log").resolve()
+        log_file = (self.log_directory / f"{Path(file_name).stem}{_LOG_FILE_SUFFIXES[self.log_format]}").resolve()
         if log_file in self._configured_loggers:
             raise ConfiguredLoggersConflict(
                 f"Logger with name '{self._configured_loggers[log_file].name}' is already logging to {log_file}"
             )
         logger = logging.getLogger(name=logger_name)
 
-        level_dict = {
-            "DEBUG": logging.DEBUG,
-            "INFO": logging.INFO,
-            "WARNING": logging.WARNING,
-            "ERROR": logging.ERROR,
-            "CRITICAL": logging.CRITICAL,
-        }
-        level = level_dict[self.logging_level]
+        level = logging.getLevelName(self.logging_level)
 
         logger.setLevel(level=level)
         logger.propagate = False
@@ -195,44 +339,77 @@ class FileLoggingManager:
 
         handler = logging.FileHandler(filename=log_file, errors="backslashreplace")
         handler.setLevel(level=level)
-        handler.setFormatter(fmt=self._DefaultFormatter(self._default_format))
+        if self.log_format == "jsonl":
+            handler.setFormatter(fmt=self._JsonLinesFormatter())
+        else:
+            handler.setFormatter(fmt=self._DefaultFormatter(self._default_format))
+
+        aggregator = self._ExitLogAggregator(
+            level=level,
+            minimum_level=min(logging.WARNING, logging.getLevelName(self.log_email_notification_level)),
+            log_format=self.log_format,
+        )
+
+        if self.queue_logging:
+            self._queue_routes[log_file] = handler
+            self._start_queue_listener()
+            queue_handler = self._FileQueueHandler(log_queue=self._log_queue, log_file=log_file)
+            queue_handler.setLevel(level=level)
 
         logger.handlers.clear()
-        logger.addHandler(hdlr=handler)
+        logger.addHandler(hdlr=queue_handler if self.queue_logging else handler)
+        logger.addHandler(hdlr=aggregator)
 
-        with open(log_file, "r") as file:
-            lines = sum(1 for _ in file)
-        if lines == 0:
+        if self.log_format == "pipe" and log_file.stat().st_size == 0:
             with open(log_file, "w") as file:
                 file.write(self._default_header)
 
         self._configured_loggers[log_file] = logger
+        self._start_offsets[log_file] = log_file.stat().st_size
+        self._exit_log_aggregators[log_file] = aggregator
 
         return logger
 
     def flush_all_handlers(self):
-        """Flush handlers for every logger in the configured loggers cache"""
+        """Flush handlers for every logger in the configured loggers cache, after waiting for queued records to be written when using `queue_logging`"""
+        if self._queue_listener is not None:
+            self._log_queue.join()
+        for handler in self._queue_routes.values():
+            handler.flush()
         for logger in self._configured_loggers.values():
             for handler in logger.handlers:
                 handler.flush()
 
     def close_all_handlers(self):
-        """Remove and close handlers for every logger in the configured loggers cache"""
+        """
+        Remove and close handlers for every logger in the configured loggers cache.
+        When using `queue_logging`, the `QueueListener` is stopped after writing every queued record.
+        """
         for logger in self._configured_loggers.values():
-            for handler in logger.handlers:
+            for handler in list(logger.handlers):
                 logger.removeHandler(handler)
                 handler.close()
+        self._stop_queue_listener()
+        for handler in self._queue_routes.values():
+            handler.close()
 
     def check_log_files_for_status(self, start_datetime: dt) -> ExitStatus:
         """
         Determine program `ExitStatus` based on maximum severity logging level that occurred since `start_datetime`
         across all `log_files_to_check` for the `FileLoggingManager` instance
         """
-        log_manifest = self._load_log_manifest(datetime_filter=start_datetime)
-
         level_severity = {"CRITICAL": ExitStatus.CRITICAL, "ERROR": ExitStatus.ERROR, "WARNING": ExitStatus.WARNING}
 
         severity_codes = {ExitStatus.OK}
+        aggregators = self._exit_log_aggregators_covering(start_datetime)
+        if aggregators is not None:
+            for aggregator in aggregators.values():
+                for _, _, levelname, _ in aggregator.records_since(start_datetime):
+                    if levelname in level_severity:
+                        severity_codes.add(level_severity[levelname])
+            return max(severity_codes)
+
+        log_manifest = self._load_log_manifest(datetime_filter=start_datetime)
         for log_df in log_manifest.values():
             for level in level_severity:
                 if level in log_df["levelname"].values:
@@ -247,8 +424,6 @@ class FileLoggingManager:
         that occurred since `start_datetime`, and associates line lists with source log files.
         Information intended to be sent in the body of automated email notifications.
         """
-        log_manifest = self._load_log_manifest(datetime_filter=start_datetime)
-
         level_dict = {
             "DEBUG": ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"),
             "INFO": ("INFO", "WARNING", "ERROR", "CRITICAL"),
@@ -258,6 +433,16 @@ class FileLoggingManager:
         }
 
         log_check_emails = dict()
+        aggregators = self._exit_log_aggregators_covering(start_datetime)
+        if aggregators is not None:
+            for log_file, aggregator in aggregators.items():
+                records = [record for record in aggregator.records_since(start_datetime) if record[2] in level_dict[self.log_email_notification_level]]
+                if records:
+                    # newest first, matching the order of emails written from log files
+                    log_check_emails[log_file] = [email_line for *_, email_line in sorted(records, key=lambda record: record[0], reverse=True)]
+            return log_check_emails
+
+        log_manifest = self._load_log_manifest(datetime_filter=start_datetime)
         for log_file, log_df in log_manifest.items():
             log_df = log_df[log_df["levelname"].isin(level_dict[self.log_email_notification_level])]
             if len(log_df) < 1:
@@ -271,10 +456,22 @@ class FileLoggingManager:
 
     def check_log_files_to_archive(self):
         """Checks the length of all `log_files_to_check` for the `FileLoggingManager` instance and archives files accordingly"""
-        log_manifest = self._load_log_manifest()
-        for log_file, log_df in log_manifest.items():
-            if len(log_df) >= self.log_file_max_lines:
-                log_file.rename(self._archive_directory / f"{log_file.stem}_{iso_file_naming(now_utc_iso())}.log")
+        header_lines = 1 if self.log_format == "pipe" else 0
+        for log_file in self._log_files_to_check():
+            if self.log_file_max_bytes is not None:
+                archive = log_file.stat().st_size >= self.log_file_max_bytes
+            else:
+                archive = self._count_lines(log_file) - header_lines >= self.log_file_max_lines
+            if not archive:
+                continue
+
+            archive_file = self._archive_directory / f"{log_file.stem}_{iso_file_naming(now_utc_iso())}{log_file.suffix}"
+            if self.compress_archives:
+                with open(log_file, "rb") as source, gzip.open(archive_file.with_name(f"{archive_file.name}.gz"), "wb") as target:
+                    shutil.copyfileobj(source, target)
+                log_file.unlink()
+            else:
+                log_file.rename(archive_file)
 
     @staticmethod
     def format_exception(
@@ -307,24 +504,70 @@ class FileLoggingManager:
             warning_filter=LogWarningFilter(self.root_logger_suppressed_warnings) if self.root_logger_suppressed_warnings else None
         )
 
-    def _load_log_manifest(self, datetime_filter: dt | None = None) -> _LogManifest:
-        """Loads all `log_files_to_check` for the `FileLoggingManager` instance into DataFrames and produces the `_LogManifest`"""
+    def _start_queue_listener(self):
+        if self._queue_listener is not None:
+            return
+        self._queue_listener = QueueListener(self._log_queue, self._QueueRoutingHandler(self._queue_routes), respect_handler_level=True)
+        self._queue_listener.start()
+        atexit.register(self._stop_queue_listener)
+
+    def _stop_queue_listener(self):
+        if self._queue_listener is None:
+            return
+        self._queue_listener.stop()
+        self._queue_listener = None
+        atexit.unregister(self._stop_queue_listener)
+
+    def _exit_log_aggregators_covering(self, start_datetime: dt) -> dict[Path, _ExitLogAggregator] | None:
+        """
+        In memory records for every log file to check, if they were kept since `start_datetime`.
+        Returns None when log files have to be read instead, such as when checking the full log directory, or when a logger was configured after `start_datetime`.
+        """
+        if self.log_files_to_check != "current_configured":
+            return None
+        aggregators = dict()
+        for log_file in self._configured_loggers:
+            aggregator = self._exit_log_aggregators.get(log_file)
+            if aggregator is None or not aggregator.covers(start_datetime):
+                return None
+            aggregators[log_file.resolve()] = aggregator
+        return aggregators
+
+    def _log_files_to_check(self) -> list[Path]:
 
         if self.log_files_to_check == "current_configured":
             log_files_to_check = [log_file.resolve() for log_file in self._configured_loggers]
         elif self.log_files_to_check == "full_directory":
-            log_files_to_check = [log_file.resolve() for log_file in (self.log_directory).glob("*.log")]
+            log_files_to_check = [log_file.resolve() for log_file in (self.log_directory).glob(f"*{_LOG_FILE_SUFFIXES[self.log_format]}")]
         else:
             raise ValueError(f"Value passed to instance attribute `log_files_to_check` violates accepted string literal arguments")
 
-        raw_dict = dict()
         for log_file in log_files_to_check:
             if not log_file.exists():
                 raise FileNotFoundError(f"{log_file} not found.")
+
+        return log_files_to_check
+
+    def _load_log_manifest(self, datetime_filter: dt | None = None) -> _LogManifest:
+        """Loads all `log_files_to_check` for the `FileLoggingManager` instance into DataFrames and produces the `_LogManifest`"""
+
+        raw_dict = dict()
+        for log_file in self._log_files_to_check():
             try:
-                log_df = pd.read_csv(log_file, delimiter="|")
+                if self.log_format == "jsonl":
+                    # only records written since the file was configured can be newer than a run started by this instance
+                    start_offset = self._start_offsets.get(log_file, 0) if datetime_filter else 0
+                    records = list(read_json_lines_log(log_file, start_offset=start_offset, since=datetime_filter))
+                    log_df = pd.DataFrame.from_records(records, columns=["created", "asctime", "levelno", "levelname", "module", "lineno", "message"])
+                else:
+                    log_df = pd.read_csv(log_file, delimiter="|")
             except Exception as e:
                 raise InvalidLogFileFormat(f"Failed to load log file at {log_file} into Pandas DataFrame") from e
             raw_dict[log_file] = log_df
         
-        return self._LogManifest(raw_dict=raw_dict, datetime_filter=datetime_filter)
\ No newline at end of file
+        return self._LogManifest(raw_dict=raw_dict, datetime_filter=datetime_filter)
+
+    @staticmethod
+    def _count_lines(log_file: Path) -> int:
+        with open(log_file, "rb") as file:
+            return sum(chunk.count(b"\n") for chunk in iter(lambda: file.read(1024 * 1024), b""))
\ No newline at end of file
@@ -5,18 +5,38 @@ import inspect
 from logging import Logger
 from pathlib import Path
 import sys
-from typing import Callable, Iterable, Any, NamedTuple
+import threading
+import time
+from typing import Awaitable, Callable, Iterable, Any, NamedTuple
 
-from akdof_shared.protocol.file_logging_manager import FileLoggingManager
-from akdof_shared.protocol.datetime_info import now_utc_iso
+from akdof_shared.io.run_history import RunHistoryStore, RunRecord
+from akdof_shared.protocol.file_logging_manager import ExitStatus, FileLoggingManager
+from akdof_shared.protocol.datetime_info import iso_from_datetime, now_utc_iso
 from akdof_shared.utils.gmail_sender import GmailSender
 
 class EarlyExitSignal(Exception): pass
 """Signals an intentional non-error eary exit from the `MainExitManager` or `AsyncMainExitManager` context"""
 
+class _CleanupDeadlineExpired(Exception):
+    """Raised when a cleanup call outlives its `CleanupCallable.timeout`, kept apart from a `TimeoutError` raised by the call itself"""
+
+async def _wait_for_cleanup(awaitable: Awaitable, timeout: float | None) -> Any:
+    """Like `asyncio.wait_for()`, but raises `_CleanupDeadlineExpired` rather than `TimeoutError` when `timeout` expires"""
+    task = asyncio.ensure_future(awaitable)
+    done, _ = await asyncio.wait({task}, timeout=timeout)
+    if not done:
+        task.cancel()
+        raise _CleanupDeadlineExpired
+    return task.result()
+
 class CleanupCallable(NamedTuple):
     func: Callable
     kwargs: dict[str, Any] = dict()
+    timeout: float | None = None
+    """
+    Seconds to wait on the call before logging an error and moving on, by default None (no timeout).
+    Regular functions given a timeout are called in a daemon thread, which is abandoned if it is still running.
+    """
 
 class _MainExitBase(ABC):
     def __init__(
@@ -25,13 +45,15 @@ class _MainExitBase(ABC):
         file_logging_manager: FileLoggingManager,
         main_logger: Logger,
         gmail_sender: GmailSender,
-        cleanup_callables: Iterable[CleanupCallable] | None = None
+        cleanup_callables: Iterable[CleanupCallable] | None = None,
+        run_history: RunHistoryStore | None = None,
     ):
         self.project_directory = project_directory
         self.file_logging_manager = file_logging_manager
         self.main_logger = main_logger
         self.gmail_sender = gmail_sender
         self.cleanup_callables = cleanup_callables or tuple()
+        self.run_history = run_history
 
         self.exit_status = None
         self._start_datetime = dt.now(tz.utc)
@@ -46,11 +68,18 @@ class _MainExitBase(ABC):
     def _send_email_notifications(self):
         try:
             log_check_emails = self.file_logging_manager.write_log_check_emails(self._start_datetime)
-            for log_file, log_messages in log_check_emails.items():
-                self.gmail_sender.plain_text(
-                    subject=f"LOGGING NOTIFICATION: {self.project_directory.stem}, {log_file.stem}",
-                    body="\n\n".join(log_messages)
-                )
+            if not log_check_emails:
+                return
+            with self.gmail_sender.session() as session:
+                for log_file, log_messages in log_check_emails.items():
+                    try:
+                        session.plain_text(
+                            subject=f"LOGGING NOTIFICATION: {self.project_directory.stem}, {log_file.stem}",
+                            body="\n\n".join(log_messages)
+                        )
+                    except Exception as e:
+                        self._write_stderr(e)
+                        session.close()
         except Exception as e:
             self._write_stderr(e)
 
@@ -60,6 +89,23 @@ class _MainExitBase(ABC):
         except Exception as e:
             self._write_stderr(e)
 
+    def _record_run(self):
+        """Record the duration and exit status of the main process as a "main" operation for the project, read back by `akdof_shared.io.exit_log_report`"""
+        if self.run_history is None:
+            return
+        try:
+            exit_status = self.exit_status or ExitStatus.CRITICAL
+            self.run_history.record(RunRecord(
+                alias=self.project_directory.stem,
+                operation="main",
+                started_utc=iso_from_datetime(self._start_datetime),
+                seconds=(dt.now(tz.utc) - self._start_datetime).total_seconds(),
+                status="succeeded" if exit_status in (ExitStatus.OK, ExitStatus.WARNING) else "failed",
+                details={"exit_status": int(exit_status)},
+            ))
+        except Exception as e:
+            self._write_stderr(e)
+
     def _archive_logs(self):
         try:
             self.file_logging_manager.check_log_files_to_archive()
@@ -85,20 +131,55 @@ class MainExitManager(_MainExitBase):
         self._shutdown_logging()
         self._send_email_notifications()
         self._set_exit_status()
+        self._record_run()
         self._archive_logs()
         return True
 
     def _make_cleanup_calls(self):
-        for func, kwargs in self.cleanup_callables:
+        for func, kwargs, timeout in self.cleanup_callables:
             try:
                 if inspect.iscoroutinefunction(func):
-                    asyncio.run(func(**kwargs))
+                    asyncio.run(_wait_for_cleanup(func(**kwargs), timeout))
+                elif timeout is not None:
+                    self._call_in_daemon_thread(func, kwargs, timeout)
                 else:
                     func(**kwargs)
+            except _CleanupDeadlineExpired:
+                self.main_logger.error(f"MainExitManager for {self.project_directory.stem} timed out after {timeout} seconds calling {func}")
             except Exception as e:
                 self.main_logger.error(f"MainExitManager for {self.project_directory.stem} failed calling {func}: {self.file_logging_manager.format_exception(e)}")
 
+    @staticmethod
+    def _call_in_daemon_thread(func: Callable, kwargs: dict[str, Any], timeout: float):
+        """Call a regular function in a daemon thread, raising `_CleanupDeadlineExpired` and abandoning the thread if it is still running after `timeout` seconds"""
+        exceptions = list()
+
+        def _target():
+            try:
+                func(**kwargs)
+            except BaseException as e:
+                exceptions.append(e)
+
+        thread = threading.Thread(target=_target, name=f"cleanup-{getattr(func, '__name__', 'callable')}", daemon=True)
+        thread.start()
+        thread.join(timeout)
+        if thread.is_alive():
+            raise _CleanupDeadlineExpired
+        if exceptions:
+            raise exceptions[0]
+
 class AsyncMainExitManager(_MainExitBase):
+    """
+    Async variant of `MainExitManager`.
+
+    Cleanup callables run concurrently, coroutine functions as tasks and regular functions in daemon threads,
+    so a hung call only delays exit until its own `CleanupCallable.timeout`, or until `cleanup_timeout_seconds` for all calls.
+    Calls that do not finish in time are logged as errors, and threads still running are abandoned.
+    """
+
+    def __init__(self, *args, cleanup_timeout_seconds: float | None = 120, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cleanup_timeout_seconds = cleanup_timeout_seconds
 
     async def __aenter__(self):
         return self
@@ -110,15 +191,64 @@ class AsyncMainExitManager(_MainExitBase):
         self._shutdown_logging()
         self._send_email_notifications()
         self._set_exit_status()
+        self._record_run()
         self._archive_logs()
         return True
 
     async def _make_cleanup_calls(self):
-        for func, kwargs in self.cleanup_callables:
+        if not self.cleanup_callables:
+            return
+        start = time.perf_counter()
+        tasks = {asyncio.create_task(self._make_cleanup_call(cleanup_callable)): cleanup_callable for cleanup_callable in self.cleanup_callables}
+        _, pending = await asyncio.wait(tasks, timeout=self.cleanup_timeout_seconds)
+        for task in pending:
+            task.cancel()
+            self.main_logger.error(
+                f"MainExitManager for {self.project_directory.stem} abandoned calling {tasks[task].func} after the {self.cleanup_timeout_seconds} second cleanup deadline"
+            )
+        self.main_logger.debug(f"MainExitManager for {self.project_directory.stem} made {len(tasks)} cleanup calls in {time.perf_counter() - start:.3f} seconds")
+
+    async def _make_cleanup_call(self, cleanup_callable: CleanupCallable):
+        func, kwargs, timeout = cleanup_callable
+        start = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(func):
+                await _wait_for_cleanup(func(**kwargs), timeout)
+            else:
+                await _wait_for_cleanup(self._call_in_daemon_thread(func, kwargs), timeout)
+        except _CleanupDeadlineExpired:
+            self.main_logger.error(f"MainExitManager for {self.project_directory.stem} timed out after {timeout} seconds calling {func}")
+        except Exception as e:
+            self.main_logger.error(f"MainExitManager for {self.project_directory.stem} failed calling {func}: {self.file_logging_manager.format_exception(e)}")
+        else:
+            self.main_logger.debug(f"MainExitManager for {self.project_directory.stem} called {func} in {time.perf_counter() - start:.3f} seconds")
+
+    @staticmethod
+    def _call_in_daemon_thread(func: Callable, kwargs: dict[str, Any]) -> asyncio.Future:
+        """
+        Call a regular function in a daemon thread, rather than the default executor,
+        since `asyncio.run()` waits on default executor threads at shutdown, which would keep a hung call from being abandoned.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def _set_result(result: Any = None, exception: BaseException | None = None):
+            if future.done():
+                return
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(result)
+
+        def _target():
             try:
-                if inspect.iscoroutinefunction(func):
-                    await func(**kwargs)
-                else:
-                    func(**kwargs)
-            except Exception as e:
-                self.main_logger.error(f"MainExitManager for {self.project_directory.stem} failed calling {func}: {self.file_logging_manager.format_exception(e)}")
\ No newline at end of file
+                result, exception = func(**kwargs), None
+            except BaseException as e:
+                result, exception = None, e
+            try:
+                loop.call_soon_threadsafe(_set_result, result, exception)
+            except RuntimeError:
+                pass # the event loop closed before the call finished
+
+        threading.Thread(target=_target, name=f"cleanup-{getattr(func, '__name__', 'callable')}", daemon=True).start()
+        return future
\ No newline at end of file
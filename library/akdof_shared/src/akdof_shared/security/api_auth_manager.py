@@ -1,13 +1,18 @@
 from abc import ABC, abstractmethod
+import asyncio
 from dataclasses import dataclass
 from datetime import datetime as dt, timezone as tz, timedelta
 from pathlib import Path
+import ssl
+import threading
 import time
 
+import aiohttp
 import keyring
 import requests
 
-from akdof_shared.gis.arcgis_api_validation import validate_arcgis_rest_api_json_response
+from akdof_shared.gis.arcgis_api_validation import validate_arcgis_json, validate_arcgis_rest_api_json_response
+from akdof_shared.io.async_requester import AsyncRequester
 from akdof_shared.protocol.datetime_info import iso_from_timestamp, datetime_from_iso, valid_iso_datetime
 
 from akdof_shared.security.cryptfile_keyring_manager import ProjectSecret, CryptfileKeyringManager, PasswordNotFound
@@ -57,6 +62,12 @@ class ApiAuthManager(ABC):
         Must already be stored with the configured `cryptfile_keyring_manager`
     ssl_cert_chain : Path | None
         Certificate chain to use for SSL verification, by default None
+    requester : AsyncRequester | None
+        Requester used by `checkout_token_async()` to generate tokens, by default None (a short lived requester is used per token)
+    refresh_threshold_minutes : float
+        Remaining token lifespan below which `checkout_token_async()` starts generating a replacement token in the background, by default 10
+
+    Checked out tokens are kept in memory, so the cryptfile keyring is only read when the in memory token would not last long enough.
     """    
     auth_url = ""
 
@@ -64,11 +75,20 @@ class ApiAuthManager(ABC):
         self,
         cryptfile_keyring_manager: CryptfileKeyringManager,
         project_secret: ProjectSecret,
-        ssl_cert_chain: Path | None = None
+        ssl_cert_chain: Path | None = None,
+        requester: AsyncRequester | None = None,
+        refresh_threshold_minutes: float = 10,
     ):
         self.cryptfile_keyring_manager = cryptfile_keyring_manager
         self.project_secret = project_secret
         self.ssl_cert_chain = ssl_cert_chain
+        self.requester = requester
+        self.refresh_threshold_minutes = refresh_threshold_minutes
+
+        self._cached_token: TimedToken | None = None
+        self._lock = threading.Lock()
+        self._async_lock = asyncio.Lock()
+        self._refresh_task: asyncio.Task | None = None
 
         self.cryptfile_keyring_manager._lazy_set_cryptfile_keyring()
 
@@ -86,24 +106,136 @@ class ApiAuthManager(ABC):
         str
             Token
         """
-        previous_token = keyring.get_password(self.project_secret.service_name, "__TimedToken__")
+        minimum_lifespan = timedelta(seconds=abs(minutes_needed) * 60)
+        cached_token = self._cached_token
+        if cached_token is not None and cached_token.lifespan >= minimum_lifespan:
+            return cached_token.token
 
-        if previous_token is None:
-            timed_token = self._generate_token()
-            keyring.set_password(self.project_secret.service_name, "__TimedToken__", f"{timed_token}")
-        else:
-            token, expiration_time = previous_token.split("||")
-            timed_token = TimedToken(token, expiration_time)
-            if timed_token.lifespan < timedelta(seconds=abs(minutes_needed) * 60):
+        with self._lock:
+            timed_token = self._read_stored_token()
+            if timed_token is None or timed_token.lifespan < minimum_lifespan:
                 timed_token = self._generate_token()
-                keyring.set_password(self.project_secret.service_name, "__TimedToken__", f"{timed_token}")
+                self._store_token(timed_token)
+            self._cached_token = timed_token
 
         return timed_token.token
 
+    async def checkout_token_async(self, minutes_needed: int) -> str:
+        """
+        Check out an existing token, or if necessary generate a new token, without blocking the event loop.
+
+        Keyring access runs in a thread, and tokens are generated with `_generate_token_async()`.
+        When the checked out token has less than `refresh_threshold_minutes` of lifespan beyond `minutes_needed`,
+        a replacement is generated in the background so a later checkout does not have to wait on it.
+
+        Parameters
+        ----------
+        minutes_needed : int
+            How long token will be needed for. Underestimating may result in token expiring during use.
+
+        Returns
+        -------
+        str
+            Token
+        """
+        minimum_lifespan = timedelta(seconds=abs(minutes_needed) * 60)
+        timed_token = self._cached_token
+        if timed_token is None or timed_token.lifespan < minimum_lifespan:
+            if self._refresh_task is not None and not self._refresh_task.done():
+                try:
+                    await asyncio.shield(self._refresh_task)
+                except Exception:
+                    pass # generated again below
+            timed_token = self._cached_token
+        if timed_token is None or timed_token.lifespan < minimum_lifespan:
+            async with self._async_lock:
+                # another checkout may have replaced the token while this one waited on the lock
+                timed_token = self._cached_token
+                if timed_token is None or timed_token.lifespan < minimum_lifespan:
+                    timed_token = await asyncio.to_thread(self._read_stored_token)
+                    if timed_token is None or timed_token.lifespan < minimum_lifespan:
+                        timed_token = await self._generate_token_async()
+                        await asyncio.to_thread(self._store_token, timed_token)
+                    self._cached_token = timed_token
+
+        refresh_lifespan = minimum_lifespan + timedelta(minutes=self.refresh_threshold_minutes)
+        if timed_token.lifespan < refresh_lifespan:
+            self._start_background_refresh(refresh_lifespan)
+
+        return timed_token.token
+
+    async def close(self):
+        """Cancel a background token refresh started by `checkout_token_async()`, if one is still running"""
+        if self._refresh_task is not None and not self._refresh_task.done():
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._refresh_task = None
+
+    def _start_background_refresh(self, refresh_lifespan: timedelta):
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        self._refresh_task = asyncio.create_task(self._refresh_token_async(refresh_lifespan))
+        # a failed background refresh is retried by the next checkout that needs a new token
+        self._refresh_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+    async def _refresh_token_async(self, refresh_lifespan: timedelta):
+        async with self._async_lock:
+            # a checkout may already have replaced the token while this refresh waited on the lock
+            if self._cached_token is not None and self._cached_token.lifespan >= refresh_lifespan:
+                return
+            timed_token = await self._generate_token_async()
+            await asyncio.to_thread(self._store_token, timed_token)
+            self._cached_token = timed_token
+
+    def _read_stored_token(self) -> TimedToken | None:
+        previous_token = keyring.get_password(self.project_secret.service_name, "__TimedToken__")
+        if previous_token is None:
+            return None
+        token, expiration_time = previous_token.split("||")
+        return TimedToken(token, expiration_time)
+
+    def _store_token(self, timed_token: TimedToken):
+        keyring.set_password(self.project_secret.service_name, "__TimedToken__", f"{timed_token}")
+
+    def _get_project_secret_password(self) -> str:
+        service_name, username = self.project_secret.service_name, self.project_secret.username
+        password = keyring.get_password(service_name, username)
+        if password is None:
+            raise PasswordNotFound(f"No cryptfile keyring password found for {service_name, username}")
+        return password
+
+    def _ssl_context(self) -> ssl.SSLContext | bool:
+        if self.ssl_cert_chain:
+            return ssl.create_default_context(cafile=self.ssl_cert_chain)
+        return True
+
+    async def _post_json_async(self, data: dict) -> dict:
+        """POST form data to `auth_url` with the configured `requester`, or a short lived one"""
+        kwargs = dict(
+            url=self.auth_url,
+            request_method="post",
+            read_method="json",
+            operation="generate_token",
+            data=data,
+            ssl=self._ssl_context(),
+            timeout=aiohttp.ClientTimeout(total=30),
+        )
+        if self.requester is not None:
+            return await self.requester.send_request(**kwargs)
+        async with AsyncRequester(timeout=30) as requester:
+            return await requester.send_request(**kwargs)
+
     @abstractmethod
     def _generate_token(self) -> TimedToken:
         raise NotImplementedError("`ApiAuthManager` subclasses must define their own _generate_token() method.")
 
+    async def _generate_token_async(self) -> TimedToken:
+        """Generate a token without blocking the event loop. Falls back to `_generate_token()` in a thread, for subclasses without an async implementation."""
+        return await asyncio.to_thread(self._generate_token)
+
 class ArcGisApiAuthManager(ApiAuthManager):
     """
     Manages ArcGIS REST API authentication
@@ -118,25 +250,33 @@ class ArcGisApiAuthManager(ApiAuthManager):
 
     def _generate_token(self) -> TimedToken:
 
-        service_name, username = self.project_secret.service_name, self.project_secret.username
-        password = keyring.get_password(service_name, username)
-        if password is None:
-            raise PasswordNotFound(f"No cryptfile keyring password found for {service_name, username}")
-
         response = requests.post(
             url=self.auth_url,
-            data={
-                "username": username,
-                "password": password,
-                "referer": service_name,
-                "client": "referer",
-                "f": "json",
-            },
+            data=self._generate_token_data(self._get_project_secret_password()),
             verify=self.ssl_cert_chain or True,
             timeout=30
         )
         json_response = validate_arcgis_rest_api_json_response(response=response, expected_keys=("token","expires"), expected_keys_requirement="all")
+        return self._timed_token_from_json(json_response)
+
+    async def _generate_token_async(self) -> TimedToken:
 
+        password = await asyncio.to_thread(self._get_project_secret_password)
+        json_response = await self._post_json_async(data=self._generate_token_data(password))
+        validate_arcgis_json(json_response=json_response, expected_keys=("token","expires"), expected_keys_requirement="all")
+        return self._timed_token_from_json(json_response)
+
+    def _generate_token_data(self, password: str) -> dict:
+        return {
+            "username": self.project_secret.username,
+            "password": password,
+            "referer": self.project_secret.service_name,
+            "client": "referer",
+            "f": "json",
+        }
+
+    @staticmethod
+    def _timed_token_from_json(json_response: dict) -> TimedToken:
         return TimedToken(
             token=json_response["token"],
             expiration_time=iso_from_timestamp(epoch=json_response["expires"], epoch_units="milliseconds")
@@ -155,27 +295,33 @@ class SentinelApiAuthManager(ApiAuthManager):
     auth_url = "https://services.sentinel-hub.com/auth/realms/main/protocol/openid-connect/token"
 
     def _generate_token(self) -> TimedToken:
-   
-        service_name, username = self.project_secret.service_name, self.project_secret.username
-        client_id_and_secret = keyring.get_password(service_name, username)
-        if client_id_and_secret is None:
-            raise PasswordNotFound(f"No cryptfile keyring password found for {service_name, username}")
-        client_id, client_secret = client_id_and_secret.split("||")
 
         response = requests.post(
             url=self.auth_url,
-            data={
-                "grant_type": "client_credentials",
-                "client_id": client_id,
-                "client_secret": client_secret,
-            },
+            data=self._generate_token_data(self._get_project_secret_password()),
             verify=self.ssl_cert_chain or True,
             timeout=30
         )
         response.raise_for_status()
-        data = response.json()
+        return self._timed_token_from_json(response.json())
+
+    async def _generate_token_async(self) -> TimedToken:
+
+        client_id_and_secret = await asyncio.to_thread(self._get_project_secret_password)
+        return self._timed_token_from_json(await self._post_json_async(data=self._generate_token_data(client_id_and_secret)))
+
+    @staticmethod
+    def _generate_token_data(client_id_and_secret: str) -> dict:
+        client_id, client_secret = client_id_and_secret.split("||")
+        return {
+            "grant_type": "client_credentials",
+            "client_id": client_id,
+            "client_secret": client_secret,
+        }
 
+    @staticmethod
+    def _timed_token_from_json(json_response: dict) -> TimedToken:
         return TimedToken(
-            token=data["access_token"],
-            expiration_time=iso_from_timestamp(epoch=(time.time() + data["expires_in"]))
+            token=json_response["access_token"],
+            expiration_time=iso_from_timestamp(epoch=(time.time() + json_response["expires_in"]))
         )
\ No newline at end of file
@@ -1,5 +1,12 @@
+import base64
+from contextlib import contextmanager
+import json
+import os
 from pathlib import Path
-from typing import Iterable, NamedTuple
+import tempfile
+import threading
+import time
+from typing import Iterable, Iterator, NamedTuple
 
 import keyring
 import keyring.backend
@@ -7,6 +14,96 @@ from keyrings.cryptfile.cryptfile import CryptFileKeyring
 
 class PasswordNotFound(Exception): pass
 
+DERIVED_KEYS_FILE_ENV_VAR = "AKDOF_CRYPTFILE_DERIVED_KEYS_FILE"
+"""Environment variable used by `CryptfileKeyringManager.derived_keys_handoff()` to give a child process the path of its handoff file"""
+
+_KdfCacheKey = tuple[bytes, int, int, int]
+"""(salt, time_cost, memory_cost, parallelism)"""
+
+_DERIVED_KEY_CACHES: dict[Path, dict[_KdfCacheKey, bytes]] = dict()
+"""Argon2 derived keys per cryptfile, shared by every `CryptfileKeyringManager` in the process"""
+
+_RECEIVED_DERIVED_KEYS: dict[Path, dict[_KdfCacheKey, bytes]] = dict()
+"""Derived keys read by `receive_derived_keys()`, per cryptfile, until a `CryptfileKeyringManager` seeds its cache with them"""
+
+_DERIVED_KEY_CACHES_LOCK = threading.Lock()
+
+def receive_derived_keys():
+    """
+    Read derived keys handed off by a parent process with `CryptfileKeyringManager.derived_keys_handoff()`.
+
+    The handoff file is deleted and its path removed from the environment, so processes started afterwards inherit neither.
+    Call this at the top of a child process entry point, before importing modules that may start processes of their own.
+    `CryptfileKeyringManager` calls it again when it first sets the cryptfile keyring, which is a no-op once the handoff was read.
+    """
+    file_path = os.environ.pop(DERIVED_KEYS_FILE_ENV_VAR, None)
+    if not file_path:
+        return
+    try:
+        with open(file_path, "r") as file:
+            payload = json.load(file)
+        if payload["expires"] < time.time():
+            return
+        derived_keys = {
+            (base64.b64decode(salt), time_cost, memory_cost, parallelism): base64.b64decode(key)
+            for salt, time_cost, memory_cost, parallelism, key in payload["keys"]
+        }
+        with _DERIVED_KEY_CACHES_LOCK:
+            _RECEIVED_DERIVED_KEYS[Path(payload["cryptfile_path"])] = derived_keys
+    except (OSError, ValueError, KeyError, TypeError):
+        # a missing or malformed handoff only costs the key derivation it would have saved
+        return
+    finally:
+        Path(file_path).unlink(missing_ok=True)
+
+class _CachedKdfCryptFileKeyring(CryptFileKeyring):
+    """
+    `CryptFileKeyring` that keeps the Argon2 derived key of each entry in memory, keyed by the entry's salt and the KDF settings.
+    Every entry is encrypted with its own salt, so `CryptFileKeyring` otherwise repeats the deliberately expensive KDF on every password read or write,
+    including the password reference check when the keyring is unlocked.
+    """
+
+    def __init__(self, derived_keys: dict[_KdfCacheKey, bytes]):
+        super().__init__()
+        self.derived_keys = derived_keys
+        self._recording = threading.local()
+
+    @contextmanager
+    def record_cache_keys(self) -> Iterator[set[_KdfCacheKey]]:
+        """Collect the cache keys of entries the calling thread reads or writes within the context"""
+        self._recording.cache_keys = cache_keys = set()
+        try:
+            yield cache_keys
+        finally:
+            self._recording.cache_keys = None
+
+    def _create_cipher(self, password, salt, nonce=None):
+        from argon2.low_level import hash_secret_raw, Type
+        from Crypto.Cipher import AES
+
+        aesmode = self._get_mode(self.aesmode)
+        if aesmode is None:
+            raise ValueError(f"invalid AES mode: {self.aesmode}")
+
+        cache_key = (bytes(salt), self.time_cost, self.memory_cost, self.parallelism)
+        recorded_cache_keys = getattr(self._recording, "cache_keys", None)
+        if recorded_cache_keys is not None:
+            recorded_cache_keys.add(cache_key)
+        key = self.derived_keys.get(cache_key)
+        if key is None:
+            key = hash_secret_raw(
+                secret=password.encode(self.password_encoding),
+                salt=salt,
+                time_cost=self.time_cost,
+                memory_cost=self.memory_cost,
+                parallelism=self.parallelism,
+                hash_len=16,
+                type=Type.ID,
+            )
+            self.derived_keys[cache_key] = key
+
+        return AES.new(key, aesmode, nonce)
+
 class ProjectSecret(NamedTuple):
     """
     A unit of sensitive information that a project depends on
@@ -26,7 +123,12 @@ class ProjectSecret(NamedTuple):
     password: str = ""
 
 class CryptfileKeyringManager:
-    """Implements `keyring` and `keyrings.cryptfile` libraries to manage creation, deletion, and access of sensitive information"""
+    """
+    Implements `keyring` and `keyrings.cryptfile` libraries to manage creation, deletion, and access of sensitive information
+
+    Keys derived from the master password are cached in memory for the life of the process, so each cryptfile entry only pays for key derivation once.
+    A parent process can pass the keys of the entries a child process needs with `derived_keys_handoff()`, which the child reads with `receive_derived_keys()`.
+    """
 
     def __init__(
         self,
@@ -41,6 +143,7 @@ class CryptfileKeyringManager:
         self.cryptfile_path = cryptfile_path
 
         self.has_cryptfile_keyring_set = False
+        self._cryptfile_keyring: _CachedKdfCryptFileKeyring | None = None
 
     def store_cryptfile_keyring_master_password(self, master_password: str):
         """One-time use method for setting the cryptfile keyring master password."""
@@ -58,12 +161,60 @@ class CryptfileKeyringManager:
             raise PasswordNotFound(
                 f"No password found for `{self.master_password_service_name, self.master_password_username}` in backend `{self.master_password_keyring_backend}`"
             )
-        kr = CryptFileKeyring()
-        kr.keyring_key = master_password
+        kr = _CachedKdfCryptFileKeyring(derived_keys=self._derived_keys())
         kr.file_path = self.cryptfile_path
+        kr.keyring_key = master_password
         keyring.set_keyring(kr)
+        self._cryptfile_keyring = kr
         self.has_cryptfile_keyring_set = True
 
+    @contextmanager
+    def derived_keys_handoff(self, project_secrets: Iterable[ProjectSecret] | ProjectSecret, lifetime_seconds: float = 600) -> Iterator[dict[str, str]]:
+        """
+        Context manager handing the derived keys of `project_secrets` off to a child process started within the context,
+        for example `subprocess.run(..., env={**os.environ, **handoff_env})`.
+
+        The keys are written to a temporary file that only the current user can read, which the child deletes with `receive_derived_keys()`,
+        and which is deleted on leaving the context if the child never read it. The yielded environment variable only holds the file path.
+        Only keys for `project_secrets` and the keyring's password reference are included, never the master password,
+        and the child ignores them after `lifetime_seconds` or if its manager uses a different cryptfile.
+
+        Parameters
+        ----------
+        project_secrets : Iterable[ProjectSecret] | ProjectSecret
+            Entries the child process reads. Keys of entries that do not exist yet are left out.
+        lifetime_seconds : float, optional
+            Seconds the handoff stays valid, by default 600
+
+        Yields
+        ------
+        dict[str, str]
+            Environment variables to pass to the child process
+        """
+        self._lazy_set_cryptfile_keyring()
+        project_secrets = (project_secrets,) if isinstance(project_secrets, ProjectSecret) else project_secrets
+        kr = self._cryptfile_keyring
+        with kr.record_cache_keys() as cache_keys:
+            for service_name, username, _ in (ProjectSecret("keyring-setting", "password reference"), *project_secrets):
+                kr.get_password(service_name, username)
+        derived_keys = self._derived_keys()
+        payload = {
+            "cryptfile_path": str(self._resolved_cryptfile_path()),
+            "expires": time.time() + lifetime_seconds,
+            "keys": [
+                [base64.b64encode(cache_key[0]).decode(), *cache_key[1:], base64.b64encode(derived_keys[cache_key]).decode()]
+                for cache_key in cache_keys if cache_key in derived_keys
+            ],
+        }
+
+        file_descriptor, file_path = tempfile.mkstemp(prefix="akdof_cryptfile_", suffix=".json")
+        try:
+            with os.fdopen(file_descriptor, "w") as file:
+                json.dump(payload, file)
+            yield {DERIVED_KEYS_FILE_ENV_VAR: file_path}
+        finally:
+            Path(file_path).unlink(missing_ok=True)
+
     def store_secrets(self, project_secrets: Iterable[ProjectSecret] | ProjectSecret):
         """Store secrets using the cryptfile keyring"""
         self._lazy_set_cryptfile_keyring()
@@ -89,6 +240,18 @@ class CryptfileKeyringManager:
             raise PasswordNotFound(f"No cryptfile keyring password found for {service_name, username}")
         return ProjectSecret(service_name, username, password)
     
+    def _resolved_cryptfile_path(self) -> Path:
+        return Path(self.cryptfile_path).resolve()
+
+    def _derived_keys(self) -> dict[_KdfCacheKey, bytes]:
+        """Derived key cache for the cryptfile, seeded from a parent process handoff the first time it is created"""
+        receive_derived_keys()
+        cryptfile_path = self._resolved_cryptfile_path()
+        with _DERIVED_KEY_CACHES_LOCK:
+            if cryptfile_path not in _DERIVED_KEY_CACHES:
+                _DERIVED_KEY_CACHES[cryptfile_path] = _RECEIVED_DERIVED_KEYS.pop(cryptfile_path, dict())
+            return _DERIVED_KEY_CACHES[cryptfile_path]
+
     def _lazy_set_cryptfile_keyring(self):
         """Set the cryptfile keyring if it has not already been set for the calling `CryptfileKeyringManager` instance"""
         if not self.has_cryptfile_keyring_set:
@@ -1,25 +1,123 @@
+from contextlib import contextmanager
 from email.mime.text import MIMEText
+from pathlib import Path
+import re
 import smtplib
-from typing import Iterable
+import time
+from typing import Iterable, Iterator
 
 class GmailSender:
-    """Send emails from a Gmail account that gets authenticated using an app password"""
+    """
+    Send emails from a Gmail account that gets authenticated using an app password
 
-    def __init__(self, sender_address: str, sender_app_password: str, recipient_address: str | Iterable[str]):
+    Attributes
+    ----------
+    sender_address : str
+    sender_app_password : str
+    recipient_address : str | Iterable[str]
+    timeout : float, optional
+        Seconds to wait on the SMTP connection before giving up, by default 30
+    smtp_host : str, optional
+        By default "smtp.gmail.com"
+    smtp_port : int, optional
+        By default 465
+    use_ssl : bool, optional
+        Connect with `SMTP_SSL` and log in, by default True.
+        Set to False for a local SMTP sink, which gets neither TLS nor a login.
+    sink_directory : Path | None, optional
+        Write messages to `.eml` files in this directory instead of sending them, by default None
+    """
+
+    def __init__(
+        self,
+        sender_address: str,
+        sender_app_password: str,
+        recipient_address: str | Iterable[str],
+        timeout: float = 30,
+        smtp_host: str = "smtp.gmail.com",
+        smtp_port: int = 465,
+        use_ssl: bool = True,
+        sink_directory: Path | None = None,
+    ):
         self.sender_address = sender_address
         self.sender_app_password = sender_app_password
         self.recipient_address = recipient_address
-    
+        self.timeout = timeout
+        self.smtp_host = smtp_host
+        self.smtp_port = smtp_port
+        self.use_ssl = use_ssl
+        self.sink_directory = sink_directory
+
     def plain_text(self, subject: str, body: str):
         """Send a plain text email body"""
+        with self.session() as session:
+            session.plain_text(subject=subject, body=body)
+
+    @contextmanager
+    def session(self) -> Iterator["GmailSession"]:
+        """
+        Context manager yielding a `GmailSession`, which sends every message on a single SMTP connection.
+        The connection is only opened once the first message is sent, so an unused session costs nothing.
+        """
+        session = GmailSession(self)
+        try:
+            yield session
+        finally:
+            session.close()
 
-        recipient_address = (self.recipient_address,) if isinstance(self.recipient_address, str) else self.recipient_address
+class GmailSession:
+    """Sends messages for a `GmailSender` over one lazily opened SMTP connection, created by `GmailSender.session()`"""
+
+    def __init__(self, gmail_sender: GmailSender):
+        self.gmail_sender = gmail_sender
+        self._smtp_server: smtplib.SMTP | None = None
+        self._sink_count = 0
+
+    def plain_text(self, subject: str, body: str):
+        """Send a plain text email body"""
+        sender = self.gmail_sender
+        recipient_address = (sender.recipient_address,) if isinstance(sender.recipient_address, str) else tuple(sender.recipient_address)
 
         msg = MIMEText(body)
         msg["Subject"] = subject
-        msg["From"] = self.sender_address
+        msg["From"] = sender.sender_address
         msg["To"] = ", ".join(recipient_address)
 
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as smtp_server:
-            smtp_server.login(self.sender_address, self.sender_app_password)
-            smtp_server.sendmail(self.sender_address, recipient_address, msg.as_string())
+        if sender.sink_directory is not None:
+            self._write_to_sink(subject=subject, message=msg.as_string())
+            return
+
+        self._connect().sendmail(sender.sender_address, recipient_address, msg.as_string())
+
+    def close(self):
+        if self._smtp_server is None:
+            return
+        try:
+            self._smtp_server.quit()
+        except (smtplib.SMTPException, OSError):
+            self._smtp_server.close()
+        finally:
+            self._smtp_server = None
+
+    def _connect(self) -> smtplib.SMTP:
+        if self._smtp_server is not None:
+            return self._smtp_server
+        sender = self.gmail_sender
+        if sender.use_ssl:
+            smtp_server = smtplib.SMTP_SSL(sender.smtp_host, sender.smtp_port, timeout=sender.timeout)
+            try:
+                smtp_server.login(sender.sender_address, sender.sender_app_password)
+            except Exception:
+                smtp_server.close()
+                raise
+        else:
+            smtp_server = smtplib.SMTP(sender.smtp_host, sender.smtp_port, timeout=sender.timeout)
+        self._smtp_server = smtp_server
+        return smtp_server
+
+    def _write_to_sink(self, subject: str, message: str):
+        sink_directory = Path(self.gmail_sender.sink_directory)
+        sink_directory.mkdir(parents=True, exist_ok=True)
+        self._sink_count += 1
+        file_name = f"{time.time_ns()}_{self._sink_count}_{re.sub(r'[^A-Za-z0-9_-]+', '_', subject)[:80]}.eml"
+        (sink_directory / file_name).write_text(message)
@@ -13,6 +13,7 @@ def with_retry(
     retry_delay: float = 1.0,
     retry_backoff: float = 2.0,
     retry_logger: Logger | None = None,
+    retry_condition: Callable[[Exception], bool] | None = None,
     **kwargs,
 ) -> Any:
     """
@@ -32,6 +33,8 @@ def with_retry(
         Multiplier applied to `retry_delay` after every unsuccesful `func` call, by default 2.0
     retry_logger : Logger | None, optional
         For logging debug level messages upon each failed `func` call, by default None
+    retry_condition : Callable[[Exception], bool] | None, optional
+        Called with each caught `retry_exceptions` exception before retrying, which is raised instead when this returns False, by default None
 
     Returns
     -------
@@ -45,6 +48,8 @@ def with_retry(
         except retry_exceptions as e:
             if attempt == retry_max_attempts - 1:
                 raise
+            if retry_condition is not None and not retry_condition(e):
+                raise
             if retry_logger:
                 retry_logger.debug(
                     f"{func.__name__} attempt {attempt + 1} failed with {FLM.format_exception(e)}. Retrying in {current_delay}s..."
@@ -60,6 +65,7 @@ async def with_retry_async(
     retry_delay: float = 1.0,
     retry_backoff: float = 2.0,
     retry_logger: Logger | None = None,
+    retry_condition: Callable[[Exception], bool] | None = None,
     **kwargs,
 ) -> Any:
     """
@@ -79,6 +85,8 @@ async def with_retry_async(
         Multiplier applied to `retry_delay` after every unsuccesful `func` call, by default 2.0
     retry_logger : Logger | None, optional
         For logging debug level messages upon each failed `func` call, by default None
+    retry_condition : Callable[[Exception], bool] | None, optional
+        Called with each caught `retry_exceptions` exception before retrying, which is raised instead when this returns False, by default None
 
     Returns
     -------
@@ -92,6 +100,8 @@ async def with_retry_async(
         except retry_exceptions as e:
             if attempt == retry_max_attempts - 1:
                 raise
+            if retry_condition is not None and not retry_condition(e):
+                raise
             if retry_logger:
                 retry_logger.debug(
                     f"{func.__name__} attempt {attempt + 1} failed with {FLM.format_exception(e)}. Retrying in {current_delay}s..."
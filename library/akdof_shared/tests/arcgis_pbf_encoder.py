@@ -0,0 +1,152 @@
+"""
+Minimal encoder for `esriPBuffer.FeatureCollectionPBuffer` messages, so offline tests can exercise `f=pbf` queries.
+Only the subset of the message used by feature queries is written.
+"""
+
+import struct
+from typing import Any, Literal
+
+_GEOMETRY_TYPE_CODES: dict[str, int] = {
+    "esriGeometryPoint": 0,
+    "esriGeometryMultipoint": 1,
+    "esriGeometryPolyline": 2,
+    "esriGeometryPolygon": 3,
+}
+
+_FIELD_TYPE_CODES: dict[str, int] = {
+    "esriFieldTypeSmallInteger": 0,
+    "esriFieldTypeInteger": 1,
+    "esriFieldTypeSingle": 2,
+    "esriFieldTypeDouble": 3,
+    "esriFieldTypeString": 4,
+    "esriFieldTypeDate": 5,
+    "esriFieldTypeOID": 6,
+    "esriFieldTypeGUID": 10,
+    "esriFieldTypeGlobalID": 11,
+}
+
+def encode_feature_collection_pbf(
+    arcgis_json: dict,
+    scale: float = 1e-4,
+    origin: Literal["upperLeft", "lowerLeft"] = "upperLeft",
+) -> bytes:
+    """
+    Encode an ArcGIS JSON feature set the way a feature layer query using `f=pbf` would return it.
+
+    Parameters
+    ----------
+    arcgis_json : dict
+        ArcGIS JSON with `features`, `fields`, `geometryType`, and `spatialReference` properties
+    scale : float, optional
+        Quantization grid spacing in spatial reference units, by default 1e-4
+    origin : Literal["upperLeft", "lowerLeft"], optional
+        Corner of the extent that quantized coordinates are relative to, by default "upperLeft"
+
+    Returns
+    -------
+    bytes
+    """
+    fields = arcgis_json["fields"]
+    geometry_type = arcgis_json["geometryType"]
+    vertices = [vertex for feat in arcgis_json["features"] for part in _parts(geometry_type, feat.get("geometry")) for vertex in part]
+    translate_x = min((v[0] for v in vertices), default=0.0)
+    translate_y = (max if origin == "upperLeft" else min)((v[1] for v in vertices), default=0.0)
+
+    feature_result = b"".join([
+        _string(1, arcgis_json.get("objectIdFieldName", "OBJECTID")),
+        _message(2, _string(1, "OBJECTID") + _varint_field(2, 1)),
+        _varint_field(7, _GEOMETRY_TYPE_CODES[geometry_type]),
+        _message(8, _spatial_reference(arcgis_json["spatialReference"])),
+        _varint_field(9, int(bool(arcgis_json.get("exceededTransferLimit", False)))),
+        _message(12, b"".join([
+            _varint_field(1, 0 if origin == "upperLeft" else 1),
+            _message(2, _double(1, scale) + _double(2, scale)),
+            _message(3, _double(1, translate_x) + _double(2, translate_y)),
+        ])),
+        *(_message(13, _string(1, field["name"]) + _varint_field(2, _FIELD_TYPE_CODES[field["type"]]) + _string(3, field.get("alias", field["name"]))) for field in fields),
+        *(_message(15, _feature(feat, fields, geometry_type, scale, origin, translate_x, translate_y)) for feat in arcgis_json["features"]),
+    ])
+    return _string(1, "3.0") + _message(2, _message(1, feature_result))
+
+def _feature(feat: dict, fields: list[dict], geometry_type: str, scale: float, origin: str, translate_x: float, translate_y: float) -> bytes:
+    attributes = b"".join(_message(1, _value(feat["attributes"].get(field["name"]))) for field in fields)
+    geometry = feat.get("geometry")
+    if geometry is None:
+        return attributes
+
+    lengths = list()
+    coords = list()
+    for part in _parts(geometry_type, geometry):
+        lengths.append(len(part))
+        previous_x = previous_y = 0
+        for x, y, *_ in part:
+            qx = round((x - translate_x) / scale)
+            qy = round((translate_y - y) / scale) if origin == "upperLeft" else round((y - translate_y) / scale)
+            coords.extend((qx - previous_x, qy - previous_y))
+            previous_x, previous_y = qx, qy
+
+    geometry_message = b""
+    if geometry_type != "esriGeometryPoint":
+        geometry_message += _packed(2, [_varint(length) for length in lengths])
+    geometry_message += _packed(3, [_varint(_zigzag(c)) for c in coords])
+    return attributes + _message(2, geometry_message)
+
+def _parts(geometry_type: str, geometry: dict | None) -> list[list[list[float]]]:
+    if not geometry:
+        return list()
+    if geometry_type == "esriGeometryPoint":
+        return [[[geometry["x"], geometry["y"]]]]
+    if geometry_type == "esriGeometryMultipoint":
+        return [geometry["points"]]
+    return geometry.get("rings") or geometry.get("paths")
+
+def _value(value: Any) -> bytes:
+    if value is None:
+        return b""
+    if isinstance(value, bool):
+        return _varint_field(9, int(value))
+    if isinstance(value, int):
+        return _varint_field(4 if -(2**31) <= value < 2**31 else 8, _zigzag(value))
+    if isinstance(value, float):
+        return _double(3, value)
+    return _string(1, str(value))
+
+def _spatial_reference(spatial_reference: dict) -> bytes:
+    message = b""
+    if "wkid" in spatial_reference:
+        message += _varint_field(1, spatial_reference["wkid"])
+    if "latestWkid" in spatial_reference:
+        message += _varint_field(2, spatial_reference["latestWkid"])
+    return message
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 63)
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+def _key(field_number: int, wire_type: int) -> bytes:
+    return _varint((field_number << 3) | wire_type)
+
+def _varint_field(field_number: int, value: int) -> bytes:
+    return _key(field_number, 0) + _varint(value)
+
+def _double(field_number: int, value: float) -> bytes:
+    return _key(field_number, 1) + struct.pack("<d", value)
+
+def _message(field_number: int, payload: bytes) -> bytes:
+    return _key(field_number, 2) + _varint(len(payload)) + payload
+
+def _string(field_number: int, value: str) -> bytes:
+    return _message(field_number, value.encode("utf-8"))
+
+def _packed(field_number: int, varints: list[bytes]) -> bytes:
+    return _message(field_number, b"".join(varints))
@@ -0,0 +1,482 @@
+"""
+Local, aiohttp-based stand-in for a single-layer ArcGIS Online hosted feature service.
+
+Used for offline end-to-end tests and throughput benchmarks of the request and edit engines.
+The service runs its own event loop in a background thread, so both the synchronous `requests` helpers in
+`akdof_shared.gis.arcgis_helpers` and the asynchronous `AsyncRequester` family can be pointed at it.
+
+Implemented endpoints (relative to `MockFeatureService.url`):
+    - `""` layer resource info
+    - `/query` count, extent, object ids, and paginated features (`exceededTransferLimit`) as `f=json` or `f=pbf`, with simple where clauses, `objectIds`, and envelope filters
+    - `/applyEdits` adds and deletes
+    - `MockFeatureService.admin_url` + `/cleanupChangeTracking`
+"""
+
+import asyncio
+from collections import deque
+import json
+import random
+import re
+import threading
+from typing import Any, Literal, Mapping, NamedTuple
+
+from aiohttp import web
+
+from arcgis_pbf_encoder import encode_feature_collection_pbf
+
+MockOperation = Literal["resource_info", "query", "applyEdits", "cleanupChangeTracking", "any"]
+
+class MockRequestRecord(NamedTuple):
+    """A request handled by the `MockFeatureService`"""
+    operation: str
+    method: str
+    status: int
+    request_bytes: int
+    response_bytes: int
+    headers: Mapping[str, str]
+
+class _Fault(NamedTuple):
+    status: int
+    operation: MockOperation
+    mode: Literal["status", "text_error"]
+    retry_after: int | None
+
+class MockFeatureService:
+    """
+    Local stand-in for a single-layer ArcGIS Online hosted feature service.
+
+    Attributes
+    ----------
+    features : list[dict]
+        Initial ArcGIS JSON features. Every feature must carry an `OBJECTID` attribute.
+    fields : list[dict]
+        Field definitions reported by layer resource info and query responses.
+    geometry_type : str
+        ESRI geometry type, for example "esriGeometryPolygon".
+    spatial_reference : dict
+        Spatial reference reported for all geometry, by default Web Mercator.
+    max_record_count : int
+        Maximum number of features returned by a single query, by default 2,000.
+    supports_pagination : bool
+        Value of `advancedQueryCapabilities.supportsPagination` in layer resource info, by default True.
+    latency_seconds : float
+        Delay added to every response, by default 0.
+    max_payload_bytes : int | None
+        Request bodies larger than this are rejected with HTTP 413, by default None.
+    fault_rates : dict[int, float] | None
+        Probability of answering any request with a given HTTP status code, for example `{429: 0.05, 504: 0.01}`.
+    seed : int
+        Seed for the fault injection random number generator, by default 0.
+    compress_responses : bool
+        Gzip or deflate JSON responses when the request accepts it, by default False.
+    unique_id_field : bool
+        Report a system-maintained `uniqueIdField` in resource info and query responses, by default True.
+        Older servers only report `objectIdField`.
+    """
+
+    def __init__(
+        self,
+        features: list[dict],
+        fields: list[dict],
+        geometry_type: str,
+        spatial_reference: dict | None = None,
+        max_record_count: int = 2_000,
+        supports_pagination: bool = True,
+        latency_seconds: float = 0.0,
+        max_payload_bytes: int | None = None,
+        fault_rates: dict[int, float] | None = None,
+        seed: int = 0,
+        service_name: str = "Mock_Layer",
+        compress_responses: bool = False,
+        unique_id_field: bool = True,
+    ):
+        self.fields = fields
+        self.geometry_type = geometry_type
+        self.spatial_reference = spatial_reference or {"wkid": 102100, "latestWkid": 3857}
+        self.max_record_count = max_record_count
+        self.supports_pagination = supports_pagination
+        self.latency_seconds = latency_seconds
+        self.max_payload_bytes = max_payload_bytes
+        self.fault_rates = fault_rates or dict()
+        self.service_name = service_name
+        self.compress_responses = compress_responses
+        self.unique_id_field = unique_id_field
+
+        self.features: dict[int, dict] = {feat["attributes"]["OBJECTID"]: feat for feat in features}
+        self.requests: list[MockRequestRecord] = list()
+        self.cleanup_change_tracking_calls = 0
+
+        self._rng = random.Random(seed)
+        self._faults: deque[_Fault] = deque()
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._runner: web.AppRunner | None = None
+        self._thread: threading.Thread | None = None
+        self._port: int | None = None
+
+    @classmethod
+    def from_arcgis_json(cls, arcgis_json: dict, **kwargs) -> "MockFeatureService":
+        """Create a service from an ArcGIS JSON feature set having `features`, `fields`, `geometryType`, and `spatialReference` properties"""
+        return cls(
+            features=arcgis_json["features"],
+            fields=arcgis_json["fields"],
+            geometry_type=arcgis_json["geometryType"],
+            spatial_reference=arcgis_json["spatialReference"],
+            **kwargs,
+        )
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        """Feature layer endpoint"""
+        return f"http://127.0.0.1:{self._port}/arcgis/rest/services/{self.service_name}/FeatureServer/0"
+
+    @property
+    def admin_url(self) -> str:
+        """Feature service admin endpoint"""
+        return f"http://127.0.0.1:{self._port}/arcgis/rest/admin/services/{self.service_name}/FeatureServer"
+
+    def start(self):
+        """Start serving on an ephemeral localhost port in a background thread"""
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._serve, args=(ready,), name=f"mock_feature_service_{self.service_name}", daemon=True)
+        self._thread.start()
+        if not ready.wait(timeout=10):
+            raise RuntimeError("MockFeatureService failed to start")
+
+    def stop(self):
+        """Stop serving and join the background thread"""
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(timeout=10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=10)
+        self._loop = None
+
+    def inject_faults(
+        self,
+        status: int,
+        count: int = 1,
+        operation: MockOperation = "any",
+        mode: Literal["status", "text_error"] = "status",
+        retry_after: int | None = None,
+    ):
+        """
+        Answer the next `count` requests for `operation` with an error instead of handling them.
+
+        Parameters
+        ----------
+        status : int
+            HTTP status code (mode "status") or ArcGIS error code (mode "text_error").
+        count : int, optional
+            Number of requests to fail, by default 1.
+        operation : MockOperation, optional
+            Operation to fail, by default "any".
+        mode : Literal["status", "text_error"], optional
+            "status" responds with the HTTP status code.
+            "text_error" responds with HTTP 200 and a text/plain ArcGIS error body, which is how upstream timeouts of applyEdits operations are often delivered.
+            By default "status".
+        retry_after : int | None, optional
+            Value of a `Retry-After` header to send with the error, by default None.
+        """
+        with self._lock:
+            for _ in range(count):
+                self._faults.append(_Fault(status, operation, mode, retry_after))
+
+    def count(self, operation: MockOperation = "any") -> int:
+        """Number of requests handled for `operation`"""
+        return sum(1 for r in self.requests if operation == "any" or r.operation == operation)
+
+    def _serve(self, ready: threading.Event):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+
+        app = web.Application(client_max_size=1024**3)
+        layer_path = f"/arcgis/rest/services/{self.service_name}/FeatureServer/0"
+        admin_path = f"/arcgis/rest/admin/services/{self.service_name}/FeatureServer"
+        app.router.add_route("*", layer_path, self._handler("resource_info", self._resource_info))
+        app.router.add_route("*", f"{layer_path}/query", self._handler("query", self._query))
+        app.router.add_route("POST", f"{layer_path}/applyEdits", self._handler("applyEdits", self._apply_edits))
+        app.router.add_route("POST", f"{admin_path}/cleanupChangeTracking", self._handler("cleanupChangeTracking", self._cleanup_change_tracking))
+
+        self._runner = web.AppRunner(app)
+        self._loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        self._loop.run_until_complete(site.start())
+        self._port = self._runner.addresses[0][1]
+        ready.set()
+        self._loop.run_forever()
+        self._loop.close()
+
+    def _handler(self, operation: str, func):
+
+        async def _handle(request: web.Request) -> web.StreamResponse:
+            body = await request.read()
+            params: dict[str, Any] = dict(request.query)
+            if request.method == "POST":
+                params.update(await request.post())
+
+            if self.latency_seconds:
+                await asyncio.sleep(self.latency_seconds)
+
+            response = self._fault_response(operation)
+            if response is None and self.max_payload_bytes is not None and len(body) > self.max_payload_bytes:
+                response = web.Response(status=413, text="Request Entity Too Large")
+            if response is None:
+                result = func(params)
+                if isinstance(result, bytes):
+                    response = web.Response(body=result, content_type="application/x-protobuf")
+                else:
+                    response = web.json_response(result)
+                if self.compress_responses:
+                    response.enable_compression()
+
+            self.requests.append(MockRequestRecord(operation, request.method, response.status, len(body), len(response.body or b""), dict(request.headers)))
+            return response
+
+        return _handle
+
+    def _fault_response(self, operation: str) -> web.Response | None:
+        fault = None
+        with self._lock:
+            for queued in self._faults:
+                if queued.operation in ("any", operation):
+                    fault = queued
+                    self._faults.remove(queued)
+                    break
+        if fault is None:
+            for status, rate in self.fault_rates.items():
+                if self._rng.random() < rate:
+                    fault = _Fault(status, "any", "status", None)
+                    break
+        if fault is None:
+            return None
+
+        headers = {"Retry-After": str(fault.retry_after)} if fault.retry_after is not None else None
+        if fault.mode == "text_error":
+            error = json.dumps({"error": {"code": fault.status, "message": "Your request has timed out.", "details": []}}, separators=(",", ":"))
+            return web.Response(status=200, text=error, content_type="text/plain", headers=headers)
+        return web.Response(status=fault.status, text=f"HTTP {fault.status}", headers=headers)
+
+    def _resource_info(self, params: dict) -> dict:
+        field_names = {field["name"] for field in self.fields}
+        geometry_properties = {
+            key: name
+            for key, name in (("shapeAreaFieldName", "Shape__Area"), ("shapeLengthFieldName", "Shape__Length"))
+            if name in field_names
+        }
+        return {
+            "currentVersion": 11.3,
+            "id": 0,
+            "name": self.service_name,
+            "type": "Feature Layer",
+            "geometryType": self.geometry_type,
+            "objectIdField": "OBJECTID",
+            **({"uniqueIdField": {"name": "OBJECTID", "isSystemMaintained": True}} if self.unique_id_field else dict()),
+            "fields": self.fields,
+            "maxRecordCount": self.max_record_count,
+            "supportedQueryFormats": "JSON, geoJSON, PBF",
+            "capabilities": "Query,Editing,Create,Delete",
+            "advancedQueryCapabilities": {"supportsPagination": self.supports_pagination},
+            **({"geometryProperties": geometry_properties} if geometry_properties else dict()),
+            "extent": self._extent(list(self.features.values())),
+        }
+
+    def _query(self, params: dict) -> dict | bytes:
+        try:
+            matches = self._select(params)
+        except ValueError as e:
+            return {"error": {"code": 400, "message": "Unable to complete operation.", "details": [str(e)]}}
+
+        if _true(params.get("returnIdsOnly")):
+            return {"objectIdFieldName": "OBJECTID", "objectIds": [feat["attributes"]["OBJECTID"] for feat in matches]}
+        if _true(params.get("returnCountOnly")) or _true(params.get("returnExtentOnly")):
+            response = dict()
+            if _true(params.get("returnCountOnly")):
+                response["count"] = len(matches)
+            if _true(params.get("returnExtentOnly")):
+                response["extent"] = self._extent(matches)
+            return response
+
+        offset = int(params.get("resultOffset", 0))
+        record_count = min(int(params.get("resultRecordCount", self.max_record_count)), self.max_record_count)
+        page = matches[offset: offset + record_count]
+
+        outfields = [f.strip() for f in str(params.get("outfields", params.get("outFields", "*"))).split(",")]
+        return_geometry = params.get("returnGeometry", "true") != "false"
+        geometry_precision = int(params["geometryPrecision"]) if params.get("geometryPrecision") else None
+        features = list()
+        for feat in page:
+            attributes = feat["attributes"] if "*" in outfields else {k: v for k, v in feat["attributes"].items() if k in outfields}
+            out_feat = {"attributes": attributes}
+            if return_geometry and feat.get("geometry") is not None:
+                out_feat["geometry"] = feat["geometry"]
+                if geometry_precision is not None:
+                    out_feat["geometry"] = _map_parts(out_feat["geometry"], lambda part: [[round(v, geometry_precision) for v in vertex] for vertex in part])
+            features.append(out_feat)
+
+        response = {
+            "objectIdFieldName": "OBJECTID",
+            **({"uniqueIdField": {"name": "OBJECTID", "isSystemMaintained": True}} if self.unique_id_field else dict()),
+            "geometryType": self.geometry_type,
+            "spatialReference": self.spatial_reference,
+            "fields": self.fields if "*" in outfields else [f for f in self.fields if f["name"] in outfields],
+            "features": features,
+        }
+        if offset + record_count < len(matches):
+            response["exceededTransferLimit"] = True
+        quantization_parameters = json.loads(params["quantizationParameters"]) if params.get("quantizationParameters") else None
+        if params.get("f") == "pbf":
+            if quantization_parameters:
+                return encode_feature_collection_pbf(response, scale=quantization_parameters["tolerance"], origin=quantization_parameters.get("originPosition", "upperLeft"))
+            return encode_feature_collection_pbf(response)
+        if quantization_parameters:
+            _quantize(response, quantization_parameters)
+        if not return_geometry:
+            response.pop("spatialReference")
+        return response
+
+    def _apply_edits(self, params: dict) -> dict:
+        adds = json.loads(params.get("adds") or "[]")
+        deletes = params.get("deletes") or "[]"
+        deletes = json.loads(deletes) if deletes.strip().startswith("[") else [int(oid) for oid in deletes.split(",") if oid.strip()]
+
+        delete_results = list()
+        for oid in deletes:
+            success = self.features.pop(int(oid), None) is not None
+            delete_results.append({"objectId": int(oid), "success": success})
+
+        add_results = list()
+        next_oid = max(self.features, default=0) + 1
+        for feat in adds:
+            attributes = {**feat.get("attributes", dict()), "OBJECTID": next_oid}
+            self.features[next_oid] = {"attributes": attributes, "geometry": feat.get("geometry")}
+            add_results.append({"objectId": next_oid, "success": True})
+            next_oid += 1
+
+        return {"addResults": add_results, "updateResults": [], "deleteResults": delete_results}
+
+    def _cleanup_change_tracking(self, params: dict) -> dict:
+        self.cleanup_change_tracking_calls += 1
+        return {"success": True}
+
+    def _select(self, params: dict) -> list[dict]:
+        predicate = _where_predicate(str(params.get("where", "1=1")))
+        envelope = _envelope(params.get("geometry"))
+        object_ids = {int(oid) for oid in str(params["objectIds"]).split(",") if oid.strip()} if params.get("objectIds") else None
+        matches = list()
+        for oid in sorted(self.features):
+            if object_ids is not None and oid not in object_ids:
+                continue
+            feat = self.features[oid]
+            if not predicate(feat["attributes"]):
+                continue
+            if envelope and not _bbox_intersects(_bbox(feat.get("geometry")), envelope):
+                continue
+            matches.append(feat)
+        return matches
+
+    def _extent(self, features: list[dict]) -> dict:
+        boxes = [box for box in (_bbox(feat.get("geometry")) for feat in features) if box]
+        if not boxes:
+            return {"xmin": "NaN", "ymin": "NaN", "xmax": "NaN", "ymax": "NaN", "spatialReference": self.spatial_reference}
+        return {
+            "xmin": min(b[0] for b in boxes),
+            "ymin": min(b[1] for b in boxes),
+            "xmax": max(b[2] for b in boxes),
+            "ymax": max(b[3] for b in boxes),
+            "spatialReference": self.spatial_reference,
+        }
+
+def _map_parts(geometry: dict, func) -> dict:
+    """Apply `func` to every part ( list of vertices ) of an ArcGIS JSON geometry, where a point is a part with a single vertex"""
+    if "x" in geometry:
+        [[x, y]] = func([[geometry["x"], geometry["y"]]])
+        return {**geometry, "x": x, "y": y}
+    if "points" in geometry:
+        return {**geometry, "points": func(geometry["points"])}
+    key = "rings" if "rings" in geometry else "paths"
+    return {**geometry, key: [func(part) for part in geometry[key]]}
+
+def _quantize(response: dict, quantization_parameters: dict):
+    """Quantize the geometry of a query response in place, like a query using `quantizationParameters` in "view" mode"""
+    tolerance = quantization_parameters["tolerance"]
+    origin = quantization_parameters.get("originPosition", "upperLeft")
+    extent = quantization_parameters["extent"]
+    translate_x = extent["xmin"]
+    translate_y = extent["ymax"] if origin == "upperLeft" else extent["ymin"]
+    direction_y = -1 if origin == "upperLeft" else 1
+
+    def _quantize_part(part: list[list[float]]) -> list[list[int]]:
+        quantized = list()
+        previous_x = previous_y = 0
+        for x, y, *_ in part:
+            qx = round((x - translate_x) / tolerance)
+            qy = round(direction_y * (y - translate_y) / tolerance)
+            quantized.append([qx - previous_x, qy - previous_y])
+            previous_x, previous_y = qx, qy
+        return quantized
+
+    for feat in response["features"]:
+        if "geometry" in feat:
+            feat["geometry"] = _map_parts(feat["geometry"], _quantize_part)
+    response["transform"] = {"originPosition": origin, "scale": [tolerance, tolerance], "translate": [translate_x, translate_y]}
+
+def _true(value: Any) -> bool:
+    return str(value).lower() == "true"
+
+_EQUALS = re.compile(r"^\s*(\w+)\s*=\s*(.+?)\s*$")
+_IN = re.compile(r"^\s*(\w+)\s+IN\s*\((.*)\)\s*$", re.IGNORECASE)
+
+def _literal(token: str) -> Any:
+    token = token.strip()
+    if token.startswith("'") and token.endswith("'"):
+        return token[1:-1].replace("''", "'")
+    return float(token) if "." in token else int(token)
+
+def _where_predicate(where: str):
+    """Supports `1=1`, `1<>1`, `field = literal`, and `field IN (literal, ...)`"""
+    where = where.strip()
+    if where == "1=1":
+        return lambda attributes: True
+    if where == "1<>1":
+        return lambda attributes: False
+    if match := _IN.match(where):
+        field, values = match.group(1), {_literal(v) for v in match.group(2).split(",") if v.strip()}
+        return lambda attributes: attributes.get(field) in values
+    if match := _EQUALS.match(where):
+        field, value = match.group(1), _literal(match.group(2))
+        return lambda attributes: attributes.get(field) == value
+    raise ValueError(f"Unsupported where clause in mock feature service: {where}")
+
+def _envelope(geometry: Any) -> tuple[float, float, float, float] | None:
+    if not geometry:
+        return None
+    if isinstance(geometry, str) and not geometry.strip().startswith("{"):
+        xmin, ymin, xmax, ymax = (float(v) for v in geometry.split(","))
+        return (xmin, ymin, xmax, ymax)
+    geometry = json.loads(geometry) if isinstance(geometry, str) else geometry
+    return (geometry["xmin"], geometry["ymin"], geometry["xmax"], geometry["ymax"])
+
+def _bbox(geometry: dict | None) -> tuple[float, float, float, float] | None:
+    if not geometry:
+        return None
+    if "x" in geometry:
+        return (geometry["x"], geometry["y"], geometry["x"], geometry["y"])
+    parts = geometry.get("rings") or geometry.get("paths") or [geometry.get("points", [])]
+    xs = [vertex[0] for part in parts for vertex in part]
+    ys = [vertex[1] for part in parts for vertex in part]
+    if not xs:
+        return None
+    return (min(xs), min(ys), max(xs), max(ys))
+
+def _bbox_intersects(box: tuple[float, float, float, float] | None, envelope: tuple[float, float, float, float]) -> bool:
+    if box is None:
+        return False
+    return not (box[2] < envelope[0] or box[0] > envelope[2] or box[3] < envelope[1] or box[1] > envelope[3])
@@ -0,0 +1,112 @@
+"""
+Deterministic synthetic ArcGIS JSON layers for offline tests and benchmarks.
+Feature attributes loosely mirror the parcel inputs (ids, owner strings, appraised values) so conversion costs resemble production data.
+"""
+
+import math
+import random
+from typing import Literal
+
+SyntheticGeometryType = Literal["point", "polyline", "polygon"]
+
+_ESRI_GEOMETRY_TYPES: dict[str, str] = {
+    "point": "esriGeometryPoint",
+    "polyline": "esriGeometryPolyline",
+    "polygon": "esriGeometryPolygon",
+}
+
+_ORIGIN_X, _ORIGIN_Y = -16_700_000.0, 8_500_000.0
+"""Approximate south-west corner of Alaska in EPSG:3857."""
+
+_SPAN = 2_000_000.0
+
+def synthetic_arcgis_json(
+    geometry_type: SyntheticGeometryType,
+    feature_count: int,
+    vertex_count: int = 12,
+    null_fraction: float = 0.05,
+    seed: int = 0,
+) -> dict:
+    """
+    Generate an ArcGIS JSON feature set like the one returned by a feature layer query operation.
+
+    Parameters
+    ----------
+    geometry_type : Literal["point", "polyline", "polygon"]
+    feature_count : int
+    vertex_count : int, optional
+        Vertices per path or ring, by default 12. Ignored for points.
+    null_fraction : float, optional
+        Approximate fraction of null attribute values, by default 0.05
+    seed : int, optional
+        Seed for the random number generator, by default 0
+
+    Returns
+    -------
+    dict
+        ArcGIS JSON with `geometryType`, `spatialReference`, `fields`, and `features` properties.
+    """
+    rng = random.Random(seed)
+    geometry_factory = {
+        "point": _point,
+        "polyline": _polyline,
+        "polygon": _polygon,
+    }[geometry_type]
+
+    features = list()
+    for oid in range(1, feature_count + 1):
+        features.append(
+            {
+                "attributes": {
+                    "OBJECTID": oid,
+                    "parcel_id": f"{rng.randrange(10**9):09d}",
+                    "owner": None if rng.random() < null_fraction else f"OWNER {rng.randrange(50_000)}, FIRST {rng.randrange(5_000)}",
+                    "property_use": rng.choice(("RESIDENTIAL", "COMMERCIAL", "VACANT", "INDUSTRIAL", None)),
+                    "land_value": None if rng.random() < null_fraction else rng.randrange(1_000, 2_000_000),
+                    "acres": round(rng.uniform(0.01, 640.0), 4),
+                },
+                "geometry": geometry_factory(rng, vertex_count),
+            }
+        )
+
+    return {
+        "objectIdFieldName": "OBJECTID",
+        "geometryType": _ESRI_GEOMETRY_TYPES[geometry_type],
+        "spatialReference": {"wkid": 102100, "latestWkid": 3857},
+        "fields": [
+            {"name": "OBJECTID", "type": "esriFieldTypeOID", "alias": "OBJECTID", "sqlType": "sqlTypeOther"},
+            {"name": "parcel_id", "type": "esriFieldTypeString", "alias": "parcel_id", "sqlType": "sqlTypeOther", "length": 50},
+            {"name": "owner", "type": "esriFieldTypeString", "alias": "owner", "sqlType": "sqlTypeOther", "length": 255},
+            {"name": "property_use", "type": "esriFieldTypeString", "alias": "property_use", "sqlType": "sqlTypeOther", "length": 50},
+            {"name": "land_value", "type": "esriFieldTypeInteger", "alias": "land_value", "sqlType": "sqlTypeOther"},
+            {"name": "acres", "type": "esriFieldTypeDouble", "alias": "acres", "sqlType": "sqlTypeOther"},
+        ],
+        "features": features,
+    }
+
+def _anchor(rng: random.Random) -> tuple[float, float]:
+    return (round(_ORIGIN_X + rng.uniform(0, _SPAN), 2), round(_ORIGIN_Y + rng.uniform(0, _SPAN), 2))
+
+def _point(rng: random.Random, vertex_count: int) -> dict:
+    x, y = _anchor(rng)
+    return {"x": x, "y": y}
+
+def _polyline(rng: random.Random, vertex_count: int) -> dict:
+    x, y = _anchor(rng)
+    path = list()
+    for _ in range(max(vertex_count, 2)):
+        x, y = round(x + rng.uniform(-200, 200), 2), round(y + rng.uniform(-200, 200), 2)
+        path.append([x, y])
+    return {"paths": [path]}
+
+def _polygon(rng: random.Random, vertex_count: int) -> dict:
+    cx, cy = _anchor(rng)
+    radius = rng.uniform(20, 500)
+    vertex_count = max(vertex_count, 3)
+    # ArcGIS JSON outer rings are clockwise, so vertices are generated with a decreasing angle
+    ring = [
+        [round(cx + radius * math.cos(-2 * math.pi * i / vertex_count), 2), round(cy + radius * math.sin(-2 * math.pi * i / vertex_count), 2)]
+        for i in range(vertex_count)
+    ]
+    ring.append(list(ring[0]))
+    return {"rings": [ring]}
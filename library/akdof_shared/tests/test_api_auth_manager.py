@@ -0,0 +1,104 @@
+import asyncio
+from datetime import datetime as dt, timezone as tz, timedelta
+
+from akdof_shared.protocol.datetime_info import iso_from_datetime
+from akdof_shared.security import api_auth_manager
+from akdof_shared.security.api_auth_manager import ApiAuthManager, TimedToken
+from akdof_shared.security.cryptfile_keyring_manager import ProjectSecret
+
+class _FakeCryptfileKeyringManager:
+    def _lazy_set_cryptfile_keyring(self):
+        pass
+
+class _FakeKeyring:
+    def __init__(self):
+        self.passwords = dict()
+        self.reads = 0
+
+    def get_password(self, service_name, username):
+        self.reads += 1
+        return self.passwords.get((service_name, username))
+
+    def set_password(self, service_name, username, password):
+        self.passwords[(service_name, username)] = password
+
+class _CountingAuthManager(ApiAuthManager):
+    def __init__(self, *args, lifespan_minutes: list[float], **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lifespan_minutes = lifespan_minutes
+        self.generated = 0
+
+    def _timed_token(self) -> TimedToken:
+        self.generated += 1
+        expiration = dt.now(tz.utc) + timedelta(minutes=self.lifespan_minutes[min(self.generated, len(self.lifespan_minutes)) - 1])
+        return TimedToken(token=f"token{self.generated}", expiration_time=iso_from_datetime(expiration))
+
+    def _generate_token(self) -> TimedToken:
+        return self._timed_token()
+
+    async def _generate_token_async(self) -> TimedToken:
+        await asyncio.sleep(0.05)
+        return self._timed_token()
+
+def _auth_manager(monkeypatch, lifespan_minutes: list[float], refresh_threshold_minutes: float = 10) -> tuple[_CountingAuthManager, _FakeKeyring]:
+    fake_keyring = _FakeKeyring()
+    monkeypatch.setattr(api_auth_manager, "keyring", fake_keyring)
+    auth_manager = _CountingAuthManager(
+        _FakeCryptfileKeyringManager(),
+        ProjectSecret(service_name="https://example.com", username="user"),
+        refresh_threshold_minutes=refresh_threshold_minutes,
+        lifespan_minutes=lifespan_minutes,
+    )
+    return auth_manager, fake_keyring
+
+def test_checkout_token_uses_in_memory_cache(monkeypatch):
+    auth_manager, fake_keyring = _auth_manager(monkeypatch, lifespan_minutes=[60, 120])
+
+    assert auth_manager.checkout_token(minutes_needed=5) == "token1"
+    reads = fake_keyring.reads
+    assert auth_manager.checkout_token(minutes_needed=30) == "token1"
+    assert fake_keyring.reads == reads
+
+    assert auth_manager.checkout_token(minutes_needed=90) == "token2"
+    assert fake_keyring.passwords[("https://example.com", "__TimedToken__")].startswith("token2||")
+
+def test_checkout_token_async_refreshes_in_background(monkeypatch):
+    auth_manager, fake_keyring = _auth_manager(monkeypatch, lifespan_minutes=[15, 120])
+
+    async def run():
+        first = await auth_manager.checkout_token_async(minutes_needed=10)
+        assert auth_manager._refresh_task is not None and not auth_manager._refresh_task.done()
+        # the current token still lasts long enough, so checkout does not wait on the refresh
+        assert await auth_manager.checkout_token_async(minutes_needed=10) == first
+        await auth_manager._refresh_task
+        second = await auth_manager.checkout_token_async(minutes_needed=10)
+        await auth_manager.close()
+        return first, second
+
+    assert asyncio.run(run()) == ("token1", "token2")
+    assert auth_manager.generated == 2
+    assert fake_keyring.passwords[("https://example.com", "__TimedToken__")].startswith("token2||")
+
+def test_checkout_token_async_waits_on_refresh_when_token_too_short(monkeypatch):
+    auth_manager, _ = _auth_manager(monkeypatch, lifespan_minutes=[15, 120])
+
+    async def run():
+        await auth_manager.checkout_token_async(minutes_needed=10)
+        token = await auth_manager.checkout_token_async(minutes_needed=60)
+        await auth_manager.close()
+        return token
+
+    assert asyncio.run(run()) == "token2"
+    assert auth_manager.generated == 2
+
+def test_concurrent_checkout_token_async_generates_one_token(monkeypatch):
+    auth_manager, fake_keyring = _auth_manager(monkeypatch, lifespan_minutes=[120])
+
+    async def run():
+        tokens = await asyncio.gather(*(auth_manager.checkout_token_async(minutes_needed=10) for _ in range(2)))
+        await auth_manager.close()
+        return tokens
+
+    assert asyncio.run(run()) == ["token1", "token1"]
+    assert auth_manager.generated == 1
+    assert fake_keyring.passwords[("https://example.com", "__TimedToken__")].startswith("token1||")
@@ -0,0 +1,94 @@
+import json
+import os
+
+import geopandas as gpd
+import pytest
+from shapely.geometry import Point
+
+from akdof_shared.gis.arcgis_gdf_conversion_prep import (
+    ArcGisTargetLayerConfig,
+    ArcGisSchemaPlan,
+    SchemaPlanMismatch,
+    format_gdf_using_arcgis_config,
+)
+
+_CONFIG = {
+    "url": "https://example.com/arcgis/rest/services/Example/FeatureServer/0",
+    "fields": [
+        {"name": "OBJECTID", "type": "esriFieldTypeOID", "alias": "OBJECTID", "sqlType": "sqlTypeOther"},
+        {"name": "name", "type": "esriFieldTypeString", "alias": "name", "sqlType": "sqlTypeOther", "length": 4},
+        {"name": "count", "type": "esriFieldTypeInteger", "alias": "count", "sqlType": "sqlTypeOther"},
+    ],
+}
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / "example.json"
+    path.write_text(json.dumps(_CONFIG))
+    return path
+
+@pytest.mark.unit
+def test_compile_plan(config_path):
+    plan = ArcGisTargetLayerConfig.load(config_path).compile()
+    assert plan.columns == ("name", "count")
+    assert dict(plan.pd_types) == {"name": "string", "count": "Int32"}
+    assert dict(plan.field_lengths) == {"name": 4}
+    assert "OBJECTID" in plan.ignored_fields
+    with pytest.raises(TypeError):
+        plan.pd_types["name"] = "object"
+
+@pytest.mark.unit
+def test_load_plan_is_cached_until_file_changes(config_path):
+    plan_a = ArcGisTargetLayerConfig.load_plan(config_path)
+    plan_b = ArcGisTargetLayerConfig.load_plan(config_path)
+    assert plan_a is plan_b
+
+    changed = {**_CONFIG, "fields": _CONFIG["fields"][:2]}
+    config_path.write_text(json.dumps(changed))
+    stat = config_path.stat()
+    os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    plan_c = ArcGisTargetLayerConfig.load_plan(config_path)
+    assert plan_c is not plan_a
+    assert plan_c.columns == ("name",)
+
+@pytest.mark.unit
+def test_load_plan_validates_resource_info(config_path):
+    resource_info = {"fields": [dict(field) for field in _CONFIG["fields"]]}
+    ArcGisTargetLayerConfig.load_plan(config_path, resource_info=resource_info)
+
+    resource_info["fields"][1]["length"] = 10
+    with pytest.raises(SchemaPlanMismatch):
+        ArcGisTargetLayerConfig.load_plan(config_path, resource_info=resource_info)
+
+@pytest.mark.unit
+def test_format_gdf_config_and_plan_agree(config_path):
+    gdf = gpd.GeoDataFrame(
+        {"name": ["abcdefg", None], "count": ["3", "x"], "extra": [1, 2]},
+        geometry=[Point(0, 0), Point(1, 1)],
+        crs="EPSG:4326",
+    )
+    config = ArcGisTargetLayerConfig.load(config_path)
+    from_config = format_gdf_using_arcgis_config(gdf=gdf.copy(), target_layer_config=config)
+    from_plan = format_gdf_using_arcgis_config(gdf=gdf.copy(), target_layer_config=config.compile())
+
+    assert isinstance(config.compile(), ArcGisSchemaPlan)
+    assert set(from_plan.columns) == {"name", "count", "geometry"}
+    assert from_plan["name"].tolist()[0] == "abcd"
+    assert from_plan["count"].isna().tolist() == [False, True]
+    assert from_config.equals(from_plan)
+
+@pytest.mark.unit
+def test_format_gdf_pyarrow_backend(config_path):
+    pytest.importorskip("pyarrow")
+    gdf = gpd.GeoDataFrame(
+        {"name": ["abcdefg", None], "count": ["3", "x"]},
+        geometry=[Point(0, 0), Point(1, 1)],
+        crs="EPSG:4326",
+    )
+    plan = ArcGisTargetLayerConfig.load_plan(config_path, dtype_backend="pyarrow")
+    formatted = format_gdf_using_arcgis_config(gdf=gdf, target_layer_config=plan)
+
+    assert formatted["name"].dtype == "string[pyarrow]"
+    assert formatted["count"].dtype == "int32[pyarrow]"
+    assert formatted["name"].tolist()[0] == "abcd"
+    assert formatted["count"].isna().tolist() == [False, True]
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from akdof_shared.gis.arcgis_pbf import PbfDecodeError, decode_feature_collection_pbf
+from akdof_shared.gis.spatial_json_conversion import arcgis_json_to_gdf
+from akdof_shared.io.async_requester import AsyncArcGisRequester
+
+from arcgis_pbf_encoder import encode_feature_collection_pbf
+from mock_feature_service import MockFeatureService
+from synthetic_arcgis_json import synthetic_arcgis_json
+
+@pytest.mark.parametrize("origin", ("upperLeft", "lowerLeft"))
+@pytest.mark.parametrize("geometry_type", ("point", "polyline", "polygon"))
+def test_decode_matches_json(geometry_type, origin):
+    arcgis_json = synthetic_arcgis_json(geometry_type=geometry_type, feature_count=500, null_fraction=0.2)
+    arcgis_json["features"][3]["geometry"] = None
+    arcgis_json["features"][3].pop("geometry")
+
+    decoded = decode_feature_collection_pbf(encode_feature_collection_pbf(arcgis_json, origin=origin))
+
+    assert decoded["features"] == arcgis_json["features"]
+    assert decoded["geometryType"] == arcgis_json["geometryType"]
+    assert decoded["spatialReference"] == arcgis_json["spatialReference"]
+    assert [(f["name"], f["type"]) for f in decoded["fields"]] == [(f["name"], f["type"]) for f in arcgis_json["fields"]]
+    assert decoded["uniqueIdField"] == {"name": "OBJECTID", "isSystemMaintained": True}
+    assert "exceededTransferLimit" not in decoded
+    assert len(arcgis_json_to_gdf(decoded)) == 500
+
+def test_coordinates_snap_to_quantization_grid():
+    arcgis_json = synthetic_arcgis_json(geometry_type="point", feature_count=10)
+    decoded = decode_feature_collection_pbf(encode_feature_collection_pbf(arcgis_json, scale=0.5))
+    xs = [feat["geometry"]["x"] for feat in decoded["features"]]
+    for original, x in zip(arcgis_json["features"], xs):
+        assert x == pytest.approx(original["geometry"]["x"], abs=0.26)
+        assert ((x - min(xs)) / 0.5) == pytest.approx(round((x - min(xs)) / 0.5), abs=0.01)
+
+def test_invalid_message_raises():
+    content = encode_feature_collection_pbf(synthetic_arcgis_json(geometry_type="polygon", feature_count=5))
+    with pytest.raises(PbfDecodeError):
+        decode_feature_collection_pbf(content[: len(content) // 2])
+    with pytest.raises(PbfDecodeError):
+        decode_feature_collection_pbf(b"")
+
+@pytest.mark.integration
+def test_paginate_pbf_features_matches_json():
+    arcgis_json = synthetic_arcgis_json(geometry_type="polygon", feature_count=1_200)
+
+    with MockFeatureService.from_arcgis_json(arcgis_json, max_record_count=500) as service:
+
+        async def _paginate():
+            async with AsyncArcGisRequester() as requester:
+                params = {"f": "json", "where": "1=1", "outfields": "*"}
+                return (
+                    await requester.paginate_json_features(base_url=service.url, params=params, max_record_count=500),
+                    await requester.paginate_pbf_features(base_url=service.url, params=params, max_record_count=500),
+                )
+
+        json_features, pbf_features = asyncio.run(_paginate())
+        pbf_responses = [record for record in service.requests if record.operation == "query"][3:]
+
+    assert pbf_features == json_features
+    assert len(pbf_responses) == 3
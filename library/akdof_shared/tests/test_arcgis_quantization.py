@@ -0,0 +1,74 @@
+import asyncio
+import json
+
+import pytest
+
+from akdof_shared.gis.arcgis_quantization import dequantize_arcgis_json
+from akdof_shared.io.async_requester import AsyncArcGisRequester
+
+from mock_feature_service import MockFeatureService
+from synthetic_arcgis_json import synthetic_arcgis_json
+
+def _extent(arcgis_json: dict) -> dict:
+    vertices = [vertex for feat in arcgis_json["features"] for part in feat["geometry"]["rings"] for vertex in part]
+    return {
+        "xmin": min(v[0] for v in vertices),
+        "ymin": min(v[1] for v in vertices),
+        "xmax": max(v[0] for v in vertices),
+        "ymax": max(v[1] for v in vertices),
+    }
+
+def test_dequantize_point_and_lower_left_origin():
+    quantized = {
+        "transform": {"originPosition": "lowerLeft", "scale": [0.5, 0.25, 0, 0], "translate": [100.0, 50.0, 0, 0]},
+        "features": [{"attributes": {"OBJECTID": 1}, "geometry": {"x": 3, "y": 4}}, {"attributes": {"OBJECTID": 2}}],
+    }
+    dequantized = dequantize_arcgis_json(quantized)
+    assert "transform" not in dequantized
+    assert dequantized["features"][0]["geometry"] == {"x": 101.5, "y": 51.0}
+    assert "geometry" not in dequantized["features"][1]
+
+def test_unquantized_response_is_unchanged():
+    arcgis_json = synthetic_arcgis_json(geometry_type="polyline", feature_count=5)
+    expected = json.loads(json.dumps(arcgis_json))
+    assert dequantize_arcgis_json(arcgis_json) == expected
+
+@pytest.mark.integration
+@pytest.mark.parametrize("query_format", ("json", "pbf"))
+def test_paginate_quantized_features(query_format):
+    arcgis_json = synthetic_arcgis_json(geometry_type="polygon", feature_count=600)
+    tolerance = 1e-3
+    quantization_parameters = {"mode": "view", "originPosition": "upperLeft", "tolerance": tolerance, "extent": _extent(arcgis_json)}
+
+    with MockFeatureService.from_arcgis_json(arcgis_json, max_record_count=250) as service:
+
+        async def _paginate():
+            async with AsyncArcGisRequester() as requester:
+                params = {"f": query_format, "where": "1=1", "outfields": "*", "quantizationParameters": json.dumps(quantization_parameters)}
+                paginate = requester.paginate_pbf_features if query_format == "pbf" else requester.paginate_json_features
+                return await paginate(base_url=service.url, params=params, max_record_count=250)
+
+        features = asyncio.run(_paginate())["features"]
+
+    assert len(features) == 600
+    for original, feat in zip(arcgis_json["features"], features):
+        assert feat["attributes"] == original["attributes"]
+        for original_ring, ring in zip(original["geometry"]["rings"], feat["geometry"]["rings"]):
+            assert len(ring) == len(original_ring)
+            for original_vertex, vertex in zip(original_ring, ring):
+                assert vertex == pytest.approx(original_vertex, abs=tolerance)
+
+@pytest.mark.integration
+def test_geometry_precision_rounds_coordinates():
+    arcgis_json = synthetic_arcgis_json(geometry_type="point", feature_count=20)
+
+    with MockFeatureService.from_arcgis_json(arcgis_json) as service:
+
+        async def _paginate():
+            async with AsyncArcGisRequester() as requester:
+                params = {"f": "json", "where": "1=1", "outfields": "*", "geometryPrecision": 2}
+                return await requester.paginate_json_features(base_url=service.url, params=params, max_record_count=1_000)
+
+        features = asyncio.run(_paginate())["features"]
+
+    assert [feat["geometry"]["x"] for feat in features] == [round(feat["geometry"]["x"], 2) for feat in arcgis_json["features"]]
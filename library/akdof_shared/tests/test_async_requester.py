@@ -0,0 +1,108 @@
+import asyncio
+import json
+
+import pytest
+
+from akdof_shared.io.async_requester import AsyncArcGisRequester, AsyncRequester, ConnectorConfig, SharedConnector
+from akdof_shared.io.request_metrics import RequestMetrics
+
+from mock_feature_service import MockFeatureService
+from synthetic_arcgis_json import synthetic_arcgis_json
+
+pytestmark = pytest.mark.integration
+
+def test_shared_connector_outlives_requester_sessions():
+    shared_connector = SharedConnector(ConnectorConfig(limit_per_host=4, ttl_dns_cache=60, accept_encoding="gzip, deflate"))
+
+    with MockFeatureService.from_arcgis_json(synthetic_arcgis_json(geometry_type="point", feature_count=10)) as service:
+
+        async def _requests():
+            first = AsyncRequester(shared_connector=shared_connector)
+            second = AsyncRequester(shared_connector=shared_connector)
+            for requester in (first, second, first):
+                await requester.send_request(url=service.url, request_method="get", read_method="json", params={"f": "json"})
+                assert requester.session.connector is shared_connector.connector
+                await requester.close()
+            assert not shared_connector.connector.closed
+            await shared_connector.close()
+            return shared_connector.connector
+
+        asyncio.run(_requests())
+
+    assert service.count("resource_info") == 3
+    assert all(record.headers.get("Accept-Encoding") == "gzip, deflate" for record in service.requests)
+
+def test_requester_owns_its_connector_by_default():
+
+    async def _session():
+        requester = AsyncRequester(connector_config=ConnectorConfig(limit_per_host=2, use_aiodns=False))
+        connector = requester.session.connector
+        assert connector.limit_per_host == 2
+        await requester.close()
+        return connector
+
+    assert asyncio.run(_session()).closed
+
+def test_default_connector_config_keeps_aiohttp_defaults():
+
+    async def _session():
+        async with AsyncRequester() as requester:
+            connector = requester.session.connector
+            assert (connector.limit, connector.limit_per_host) == (100, 0)
+            assert "Accept-Encoding" not in requester.session.headers
+
+    asyncio.run(_session())
+
+@pytest.mark.parametrize("stream_feature_pages", (False, True))
+def test_paginate_compressed_feature_pages(stream_feature_pages):
+    if stream_feature_pages:
+        pytest.importorskip("ijson")
+    arcgis_json = synthetic_arcgis_json(geometry_type="polygon", feature_count=1_200)
+    metrics = RequestMetrics()
+
+    with MockFeatureService.from_arcgis_json(arcgis_json, max_record_count=500, compress_responses=True) as service:
+
+        async def _paginate():
+            async with AsyncArcGisRequester(stream_feature_pages=stream_feature_pages, metrics_hook=metrics) as requester:
+                return await requester.paginate_json_features(
+                    base_url=service.url,
+                    params={"f": "json", "where": "1=1", "outfields": "*"},
+                    max_record_count=500,
+                )
+
+        paginated = asyncio.run(_paginate())
+
+    assert paginated["features"] == arcgis_json["features"]
+    assert paginated["spatialReference"] == arcgis_json["spatialReference"]
+    # response sizes are measured after decompression
+    assert [record.response_bytes for record in sorted(metrics.slowest, key=lambda record: int(record.label.split("=")[1]))] == [
+        record.response_bytes for record in service.requests
+    ]
+
+class _ChunkedContent:
+    def __init__(self, body: bytes, chunk_size: int):
+        self.chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+
+    async def iter_chunked(self, n: int):
+        for chunk in self.chunks:
+            yield chunk
+
+class _ChunkedResponse:
+    content_type = "application/json"
+
+    def __init__(self, body: bytes, chunk_size: int):
+        self.content = _ChunkedContent(body, chunk_size)
+
+def test_read_json_stream_builds_response_from_streamed_features():
+    pytest.importorskip("ijson")
+    arcgis_json = synthetic_arcgis_json(geometry_type="polygon", feature_count=50)
+    arcgis_json["features"][3]["geometry"] = None
+    arcgis_json["exceededTransferLimit"] = True
+    body = json.dumps(arcgis_json).encode()
+
+    async def _read(body: bytes) -> dict:
+        return await AsyncRequester()._read_json_stream(_ChunkedResponse(body, chunk_size=97))
+
+    assert asyncio.run(_read(body)) == json.loads(body)
+    error = {"error": {"code": 400, "message": "Invalid query", "details": []}}
+    assert asyncio.run(_read(json.dumps(error).encode())) == error
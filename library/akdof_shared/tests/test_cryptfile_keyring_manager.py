@@ -0,0 +1,113 @@
+import os
+from pathlib import Path
+import stat
+
+import argon2.low_level
+import keyring
+import keyring.backend
+import pytest
+
+from akdof_shared.security import cryptfile_keyring_manager
+from akdof_shared.security.cryptfile_keyring_manager import DERIVED_KEYS_FILE_ENV_VAR, CryptfileKeyringManager, ProjectSecret, receive_derived_keys
+
+class _MemoryKeyring(keyring.backend.KeyringBackend):
+    priority = 1
+
+    def __init__(self):
+        super().__init__()
+        self.passwords = dict()
+
+    def get_password(self, service, username):
+        return self.passwords.get((service, username))
+
+    def set_password(self, service, username, password):
+        self.passwords[(service, username)] = password
+
+    def delete_password(self, service, username):
+        self.passwords.pop((service, username), None)
+
+@pytest.fixture
+def kdf_calls(monkeypatch):
+    calls = list()
+    hash_secret_raw = argon2.low_level.hash_secret_raw
+
+    def counting_hash_secret_raw(**kwargs):
+        calls.append(kwargs["salt"])
+        return hash_secret_raw(**{**kwargs, "time_cost": 1, "memory_cost": 64})
+
+    monkeypatch.setattr(argon2.low_level, "hash_secret_raw", counting_hash_secret_raw)
+    monkeypatch.setattr(cryptfile_keyring_manager, "_DERIVED_KEY_CACHES", dict())
+    monkeypatch.setattr(cryptfile_keyring_manager, "_RECEIVED_DERIVED_KEYS", dict())
+    monkeypatch.delenv(DERIVED_KEYS_FILE_ENV_VAR, raising=False)
+    previous_keyring = keyring.get_keyring()
+    yield calls
+    keyring.set_keyring(previous_keyring)
+
+def _manager(master_keyring: _MemoryKeyring, tmp_path) -> CryptfileKeyringManager:
+    return CryptfileKeyringManager(
+        master_password_keyring_backend=master_keyring,
+        master_password_service_name="master_service",
+        master_password_username="master_user",
+        cryptfile_path=tmp_path / "keyring_cryptfile.cfg",
+    )
+
+def _start_child(monkeypatch, handoff_env: dict[str, str]):
+    """Simulate a child process, which starts with an empty cache and reads the handoff at the top of its entry point"""
+    monkeypatch.setattr(cryptfile_keyring_manager, "_DERIVED_KEY_CACHES", dict())
+    monkeypatch.setenv(DERIVED_KEYS_FILE_ENV_VAR, handoff_env[DERIVED_KEYS_FILE_ENV_VAR])
+    receive_derived_keys()
+
+def test_derived_keys_are_cached_and_handed_off(kdf_calls, monkeypatch, tmp_path):
+    master_keyring = _MemoryKeyring()
+    master_keyring.set_password("master_service", "master_user", "master password")
+    secret = ProjectSecret(service_name="https://example.com", username="user", password="secret")
+    other_secret = ProjectSecret(service_name="ftp.example.com", username="user", password="other secret")
+
+    ckm = _manager(master_keyring, tmp_path)
+    ckm.store_secrets((secret, other_secret))
+    calls_after_store = len(kdf_calls)
+    for _ in range(3):
+        assert ckm.get_full_secret(secret._replace(password="")).password == "secret"
+    assert len(kdf_calls) == calls_after_store
+
+    with ckm.derived_keys_handoff(secret) as handoff_env:
+        handoff_file = Path(handoff_env[DERIVED_KEYS_FILE_ENV_VAR])
+        if os.name == "posix":
+            assert stat.S_IMODE(handoff_file.stat().st_mode) == 0o600
+        _start_child(monkeypatch, handoff_env)
+        # the child deletes the handoff file and removes its path from the environment as soon as it is read
+        assert not handoff_file.exists()
+        assert DERIVED_KEYS_FILE_ENV_VAR not in os.environ
+
+        kdf_calls.clear()
+        child_ckm = _manager(master_keyring, tmp_path)
+        assert child_ckm.get_full_secret(secret._replace(password="")).password == "secret"
+        assert not kdf_calls
+        # keys of entries the child was not handed are derived again
+        assert child_ckm.get_full_secret(other_secret._replace(password="")).password == "other secret"
+        assert len(kdf_calls) == 1
+
+def test_unread_handoff_is_deleted_on_exit(kdf_calls, tmp_path):
+    master_keyring = _MemoryKeyring()
+    master_keyring.set_password("master_service", "master_user", "master password")
+    secret = ProjectSecret(service_name="https://example.com", username="user", password="secret")
+    ckm = _manager(master_keyring, tmp_path)
+    ckm.store_secrets(secret)
+
+    with ckm.derived_keys_handoff(secret) as handoff_env:
+        handoff_file = Path(handoff_env[DERIVED_KEYS_FILE_ENV_VAR])
+        assert handoff_file.exists()
+    assert not handoff_file.exists()
+
+def test_expired_handoff_is_ignored(kdf_calls, monkeypatch, tmp_path):
+    master_keyring = _MemoryKeyring()
+    master_keyring.set_password("master_service", "master_user", "master password")
+    secret = ProjectSecret(service_name="https://example.com", username="user", password="secret")
+    ckm = _manager(master_keyring, tmp_path)
+    ckm.store_secrets(secret)
+
+    with ckm.derived_keys_handoff(secret, lifetime_seconds=-1) as handoff_env:
+        _start_child(monkeypatch, handoff_env)
+        kdf_calls.clear()
+        assert _manager(master_keyring, tmp_path).get_full_secret(secret._replace(password="")).password == "secret"
+    assert kdf_calls
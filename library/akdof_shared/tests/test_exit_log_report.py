@@ -0,0 +1,49 @@
+from datetime import timedelta
+from pathlib import Path
+
+import pandas as pd
+
+from akdof_shared.io.exit_log_report import attach_run_durations, exit_log_report, load_exit_log
+from akdof_shared.io.run_history import RunHistoryStore, RunRecord
+
+EXIT_LOG = Path(__file__).resolve().parents[3] / "admin" / "exit_log" / "exit_log.csv"
+
+def test_load_exit_log_and_report_reliability():
+    exit_log_df = load_exit_log(EXIT_LOG)
+    assert list(exit_log_df.columns) == ["exit_datetime", "project", "script", "exit_code"]
+    assert str(exit_log_df["exit_datetime"].dt.tz) == "UTC"
+    assert exit_log_df["exit_datetime"].is_monotonic_increasing
+
+    report = exit_log_report(exit_log_df).set_index("project")
+    kmz = report.loc["regional_kmz_for_ftp"]
+    kmz_codes = exit_log_df.loc[exit_log_df["project"] == "regional_kmz_for_ftp", "exit_code"]
+    assert kmz["runs"] == len(kmz_codes)
+    assert kmz["failure_rate"] == (kmz_codes >= 40).mean()
+    assert kmz["ok_rate"] == (kmz_codes == 1).mean()
+    assert pd.isna(kmz["seconds_p50"]) and not kmz["slowdown"]
+
+def test_attach_run_durations_flags_slowdown(tmp_path):
+    store = RunHistoryStore(tmp_path / "run_history.sqlite")
+    start = pd.Timestamp("2025-01-01T09:00:00Z")
+    lines = list()
+    for day in range(14):
+        seconds = 600 if day < 7 else 900 + day
+        started = start + pd.Timedelta(days=day)
+        store.record(RunRecord(alias="ak_parcels", operation="main", started_utc=started.isoformat(), seconds=seconds, status="succeeded"))
+        exit_datetime = started + pd.Timedelta(seconds=seconds + 5)
+        lines.append(f"{exit_datetime.strftime('%Y-%m-%dT%H:%M:%S.%f')}0Z,ak_parcels,main,{40 if day == 13 else 1}")
+    # a run with no recorded duration, such as a crash before the exit manager
+    lines.append("2025-01-20T09:00:00.0000000Z,ak_parcels,main,-1")
+    exit_log = tmp_path / "exit_log.csv"
+    exit_log.write_text("\r\n".join(lines) + "\r\n")
+
+    exit_log_df = attach_run_durations(load_exit_log(exit_log), store, tolerance=timedelta(minutes=1))
+    assert exit_log_df["seconds"].notna().sum() == 14
+
+    (row,) = exit_log_report(exit_log_df, recent_runs=7).to_dict("records")
+    assert row["runs"] == 15
+    assert row["failure_rate"] == 2 / 15
+    assert row["earlier_seconds_p50"] == 600 and row["recent_seconds_p50"] == 910
+    assert row["seconds_max"] == 913
+    assert row["seconds_per_day_trend"] > 0
+    assert row["slowdown"]
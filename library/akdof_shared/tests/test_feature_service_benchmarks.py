@@ -0,0 +1,29 @@
+"""
+Offline throughput benchmarks for the request and edit engines, run against a local `MockFeatureService`.
+
+Run only the benchmarks with `pytest -m benchmark`, or skip them with `pytest -m "not benchmark"`.
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from akdof_shared.io.async_requester import AsyncArcGisRequester
+
+from mock_feature_service import MockFeatureService
+from synthetic_arcgis_json import synthetic_arcgis_json
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("latency_seconds", (0.0, 0.05))
+def test_benchmark_paginate_json_features(benchmark, latency_seconds):
+    arcgis_json = synthetic_arcgis_json(geometry_type="point", feature_count=10_000)
+
+    async def _paginate(url: str):
+        async with AsyncArcGisRequester() as requester:
+            return await requester.paginate_json_features(base_url=url, params={"f": "json", "where": "1=1", "outfields": "*"}, max_record_count=1_000)
+
+    with MockFeatureService.from_arcgis_json(arcgis_json, max_record_count=1_000, latency_seconds=latency_seconds) as service:
+        result = benchmark.pedantic(lambda: asyncio.run(_paginate(service.url)), rounds=3)
+    assert len(result["features"]) == 10_000
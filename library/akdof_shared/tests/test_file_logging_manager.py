@@ -0,0 +1,131 @@
+import gzip
+import json
+import logging
+import time
+
+import pytest
+
+from akdof_shared.protocol.datetime_info import datetime_from_iso, now_utc_iso
+from akdof_shared.protocol.file_logging_manager import ExitStatus, FileLoggingManager, read_json_lines_log
+
+@pytest.fixture(params=["pipe", "jsonl"])
+def flm(request, tmp_path):
+    manager = FileLoggingManager(log_directory=tmp_path / "logs", log_format=request.param, log_file_max_lines=5)
+    yield manager
+    manager.close_all_handlers()
+
+def test_status_and_emails_only_consider_records_since_start(flm: FileLoggingManager):
+    logger = flm.get_file_logger(logger_name="test_flm_previous", file_name="run")
+    logger.error("previous run | failed")
+    flm.close_all_handlers()
+    flm._configured_loggers.clear()
+    time.sleep(0.01)
+
+    start = datetime_from_iso(now_utc_iso())
+    logger = flm.get_file_logger(logger_name="test_flm_current", file_name="run")
+    logger.info("current run started")
+    logger.warning("current run\nwarning")
+    flm.flush_all_handlers()
+
+    assert flm.check_log_files_for_status(start_datetime=start) == ExitStatus.WARNING
+    emails = flm.write_log_check_emails(start_datetime=start)
+    (lines,) = emails.values()
+    assert len(lines) == 1
+    assert "WARNING" in lines[0] and "current run" in lines[0]
+
+def test_jsonl_reader_seeks_to_start_offset(tmp_path):
+    flm = FileLoggingManager(log_directory=tmp_path, log_format="jsonl")
+    try:
+        logger = flm.get_file_logger(logger_name="test_flm_jsonl", file_name="run")
+        logger.info("first")
+        flm.flush_all_handlers()
+        log_file = tmp_path / "run.jsonl"
+        assert log_file.suffix == ".jsonl"
+        offset = log_file.stat().st_size
+        logger.error("second | with pipe")
+        flm.flush_all_handlers()
+
+        records = list(read_json_lines_log(log_file, start_offset=offset))
+        assert [(r["levelno"], r["message"]) for r in records] == [(40, "second | with pipe")]
+        assert json.loads(log_file.read_text().splitlines()[0])["message"] == "first"
+    finally:
+        flm.close_all_handlers()
+
+def test_check_log_files_to_archive(flm: FileLoggingManager):
+    logger = flm.get_file_logger(logger_name=f"test_flm_archive_{flm.log_format}", file_name="run")
+    for i in range(4):
+        logger.info(f"line {i}")
+    flm.flush_all_handlers()
+    flm.check_log_files_to_archive()
+    assert not list(flm._archive_directory.iterdir())
+
+    logger.info("line 4")
+    flm.flush_all_handlers()
+    flm.check_log_files_to_archive()
+    (archived,) = flm._archive_directory.iterdir()
+    assert archived.suffix == (".jsonl" if flm.log_format == "jsonl" else ".log")
+
+def test_exit_checks_use_in_memory_records(flm: FileLoggingManager, monkeypatch):
+    logger = flm.get_file_logger(logger_name=f"test_flm_memory_{flm.log_format}", file_name="run")
+    logger.error("before start")
+    time.sleep(0.01)
+    start = datetime_from_iso(now_utc_iso())
+    logger.debug("not kept")
+    logger.error("first | error")
+    logger.critical("second\nerror")
+    flm.flush_all_handlers()
+
+    with monkeypatch.context() as m:
+        m.setattr(flm, "_exit_log_aggregators_covering", lambda start_datetime: None)
+        from_files = (flm.check_log_files_for_status(start_datetime=start), flm.write_log_check_emails(start_datetime=start))
+    monkeypatch.setattr(flm, "_load_log_manifest", lambda *args, **kwargs: pytest.fail("log files were re-read"))
+    flm.close_all_handlers()
+    from_memory = (flm.check_log_files_for_status(start_datetime=start), flm.write_log_check_emails(start_datetime=start))
+
+    assert from_memory[0] == ExitStatus.CRITICAL
+    assert [line.split(" | ")[1] for line in from_memory[1][flm.log_directory.resolve() / f"run{'.jsonl' if flm.log_format == 'jsonl' else '.log'}"]] == ["CRITICAL", "ERROR"]
+    assert from_memory[0] == from_files[0]
+    assert {k: sorted(v) for k, v in from_memory[1].items()} == {k: sorted(v) for k, v in from_files[1].items()}
+
+@pytest.mark.parametrize("log_format", ["pipe", "jsonl"])
+def test_queue_logging_writes_from_listener_thread(tmp_path, log_format):
+    flm = FileLoggingManager(log_directory=tmp_path, log_format=log_format, queue_logging=True)
+    try:
+        start = datetime_from_iso(now_utc_iso())
+        logger = flm.get_file_logger(logger_name=f"test_flm_queue_{log_format}", file_name="run")
+        assert not any(isinstance(handler, logging.FileHandler) for handler in logger.handlers)
+        for i in range(500):
+            logger.info(f"line {i}")
+        logger.warning("done")
+
+        flm.flush_all_handlers()
+        log_file = tmp_path / f"run.{'jsonl' if log_format == 'jsonl' else 'log'}"
+        assert len(log_file.read_text().splitlines()) == 501 + (log_format == "pipe")
+        assert flm.check_log_files_for_status(start_datetime=start) == ExitStatus.WARNING
+
+        logger.info("after flush")
+        flm.close_all_handlers()
+        assert flm._queue_listener is None
+        assert log_file.read_text().splitlines()[-1].endswith("after flush" if log_format == "pipe" else '"after flush"}')
+    finally:
+        flm.close_all_handlers()
+
+def test_check_log_files_to_archive_by_size_compressed(tmp_path):
+    flm = FileLoggingManager(log_directory=tmp_path, log_format="jsonl", log_file_max_bytes=1_000, compress_archives=True)
+    try:
+        logger = flm.get_file_logger(logger_name="test_flm_archive_size", file_name="run")
+        logger.info("short")
+        flm.flush_all_handlers()
+        flm.check_log_files_to_archive()
+        assert not list(flm._archive_directory.iterdir())
+
+        logger.info("x" * 1_000)
+        flm.close_all_handlers()
+        flm.check_log_files_to_archive()
+        (archived,) = flm._archive_directory.iterdir()
+        assert archived.name.endswith(".jsonl.gz")
+        assert not (tmp_path / "run.jsonl").exists()
+        with gzip.open(archived, "rt") as file:
+            assert [json.loads(line)["message"] for line in file][0] == "short"
+    finally:
+        flm.close_all_handlers()
@@ -0,0 +1,52 @@
+import email
+
+from akdof_shared.utils import gmail_sender
+from akdof_shared.utils.gmail_sender import GmailSender
+
+class _FakeSMTP:
+    connections: list["_FakeSMTP"] = list()
+
+    def __init__(self, host, port, timeout=None):
+        self.timeout = timeout
+        self.logins = 0
+        self.sent = list()
+        self.closed = False
+        _FakeSMTP.connections.append(self)
+
+    def login(self, user, password):
+        self.logins += 1
+
+    def sendmail(self, from_address, to_addresses, message):
+        self.sent.append((from_address, to_addresses, message))
+
+    def quit(self):
+        self.closed = True
+
+def test_session_sends_every_message_on_one_connection(monkeypatch):
+    _FakeSMTP.connections.clear()
+    monkeypatch.setattr(gmail_sender.smtplib, "SMTP_SSL", _FakeSMTP)
+    sender = GmailSender(sender_address="a@example.com", sender_app_password="pw", recipient_address=["b@example.com", "c@example.com"], timeout=5)
+
+    with sender.session():
+        pass
+    assert not _FakeSMTP.connections
+
+    with sender.session() as session:
+        for i in range(3):
+            session.plain_text(subject=f"subject {i}", body="body")
+
+    (connection,) = _FakeSMTP.connections
+    assert connection.logins == 1 and connection.timeout == 5 and connection.closed
+    assert [email.message_from_string(m)["Subject"] for _, _, m in connection.sent] == ["subject 0", "subject 1", "subject 2"]
+    assert connection.sent[0][1] == ("b@example.com", "c@example.com")
+
+def test_sink_directory_writes_messages_to_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(gmail_sender.smtplib, "SMTP_SSL", None)
+    sender = GmailSender(sender_address="a@example.com", sender_app_password="pw", recipient_address="b@example.com", sink_directory=tmp_path)
+
+    sender.plain_text(subject="LOGGING NOTIFICATION: project, main", body="line 1\n\nline 2")
+
+    (eml,) = tmp_path.glob("*.eml")
+    message = email.message_from_string(eml.read_text())
+    assert message["Subject"] == "LOGGING NOTIFICATION: project, main"
+    assert message.get_payload() == "line 1\n\nline 2"
@@ -0,0 +1,76 @@
+import asyncio
+from datetime import datetime as dt, timedelta, timezone as tz
+from email.utils import format_datetime
+import time
+
+import pytest
+
+from akdof_shared.io.async_requester import AsyncRequester
+from akdof_shared.io.host_rate_limiter import HostLimits, HostRateLimiter, parse_retry_after
+
+from mock_feature_service import MockFeatureService
+from synthetic_arcgis_json import synthetic_arcgis_json
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("garbage") is None
+    assert parse_retry_after("3") == 3.0
+    http_date = format_datetime(dt.now(tz.utc) + timedelta(seconds=30), usegmt=True)
+    assert 25 < parse_retry_after(http_date) <= 30
+
+def test_hosts_matching_a_pattern_share_a_bucket():
+    limiter = HostRateLimiter(
+        default_limits=HostLimits(requests_per_second=2, burst=1, max_concurrency=1),
+        host_limits={"services*.arcgis.com": HostLimits(requests_per_second=10, burst=10, max_concurrency=5)},
+    )
+    limiter.throttle("https://services1.arcgis.com/abc/arcgis/rest/services/a/FeatureServer/0")
+    assert limiter.current_rate("https://services3.arcgis.com/xyz/arcgis/rest/services/b/FeatureServer/0") == 5
+    assert limiter.current_rate("https://gis.borough.example.org/arcgis/rest/services/c/MapServer/0") == 2
+
+def test_token_bucket_and_concurrency():
+    limiter = HostRateLimiter(default_limits=HostLimits(requests_per_second=20, burst=2, max_concurrency=2))
+    in_flight = 0
+    peak = 0
+
+    async def _request():
+        nonlocal in_flight, peak
+        async with limiter.limit("https://gis.borough.example.org/query"):
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+    async def _requests():
+        await asyncio.gather(*(_request() for _ in range(8)))
+
+    started = time.monotonic()
+    asyncio.run(_requests())
+    # two requests are covered by the burst, the remaining six wait for tokens at 20 per second
+    assert time.monotonic() - started >= 0.25
+    assert peak == 2
+
+@pytest.mark.integration
+def test_429_tightens_rate_and_honors_retry_after():
+    arcgis_json = synthetic_arcgis_json(geometry_type="point", feature_count=10)
+    limiter = HostRateLimiter(default_limits=HostLimits(requests_per_second=50, burst=50, max_concurrency=5))
+
+    with MockFeatureService.from_arcgis_json(arcgis_json) as service:
+        service.inject_faults(status=429, count=1, operation="resource_info", retry_after=1)
+
+        async def _request():
+            async with AsyncRequester(rate_limiter=limiter) as requester:
+                return await requester.send_request(
+                    url=service.url,
+                    request_method="get",
+                    read_method="json",
+                    status_code_plan={429: {"sleep_seconds": 0.1, "attempt_increment": 1}},
+                    params={"f": "json"},
+                )
+
+        started = time.monotonic()
+        asyncio.run(_request())
+        elapsed = time.monotonic() - started
+
+    assert elapsed >= 1
+    # halved by the 429, then partially restored by the successful retry
+    assert limiter.current_rate(service.url) == pytest.approx(30)
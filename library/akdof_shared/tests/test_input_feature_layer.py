@@ -0,0 +1,286 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+import json
+
+import pytest
+
+from akdof_shared.gis.arcgis_helpers import split_envelope
+from akdof_shared.gis.input_feature_layer import (
+    REFRESH_METADATA_FILE_NAME,
+    InputFeatureLayer,
+    InputFeatureLayerCache,
+    InputFeatureLayersConfig,
+    LayerRefreshPlan,
+    LayerRefreshResult
+)
+from akdof_shared.io.async_requester import AsyncArcGisRequester
+from akdof_shared.io.file_cache_manager import FileCacheManager, PurgeMethod
+
+from mock_feature_service import MockFeatureService
+from synthetic_arcgis_json import synthetic_arcgis_json
+
+def _shape_area(geometry: dict) -> float:
+    ring = geometry["rings"][0]
+    return abs(sum(x1 * y2 - x2 * y1 for (x1, y1), (x2, y2) in zip(ring, ring[1:]))) / 2
+
+def _parcels_with_shape_area(feature_count: int) -> dict:
+    arcgis_json = synthetic_arcgis_json(geometry_type="polygon", feature_count=feature_count, null_fraction=0.0)
+    arcgis_json["fields"].append({"name": "Shape__Area", "type": "esriFieldTypeDouble", "alias": "Shape__Area", "sqlType": "sqlTypeDouble"})
+    for feat in arcgis_json["features"]:
+        feat["attributes"]["Shape__Area"] = _shape_area(feat["geometry"])
+    return arcgis_json
+
+def _input_feature_layer(url: str, cache_path, refresh_mode: str = "full", alias: str = "Mock Parcels", **kwargs) -> InputFeatureLayer:
+    return InputFeatureLayer(
+        url=url,
+        alias=alias,
+        cache=InputFeatureLayerCache(
+            resource_info=FileCacheManager(path=cache_path / "resource_info", max_age=timedelta(hours=1), max_count=3, purge_method=PurgeMethod.OLDEST_WHILE_MAX_COUNT_EXCEEDED),
+            features=FileCacheManager(path=cache_path / "features", max_age=timedelta(days=1), max_count=3, purge_method=PurgeMethod.OLDEST_WHILE_MAX_COUNT_EXCEEDED),
+        ),
+        outfields=["parcel_id", "owner"],
+        refresh_mode=refresh_mode,
+        thread_executor=ThreadPoolExecutor(max_workers=2),
+        **kwargs,
+    )
+
+def _refresh(layer: InputFeatureLayer, plan: LayerRefreshPlan | None = None) -> dict:
+
+    async def _run():
+        layer.semaphore = asyncio.Semaphore(2)
+        async with AsyncArcGisRequester() as requester:
+            layer.requester = requester
+            await layer.refresh_features(plan=plan)
+
+    asyncio.run(_run())
+    with open(layer.cache.features.latest_entry(), "r") as file:
+        return json.load(file)
+
+@pytest.mark.integration
+def test_attributes_first_refresh_only_queries_changed_geometry(tmp_path):
+    arcgis_json = _parcels_with_shape_area(feature_count=1_200)
+
+    with MockFeatureService.from_arcgis_json(arcgis_json, max_record_count=500) as service:
+        layer = _input_feature_layer(service.url, tmp_path / "attributes_first", refresh_mode="attributes_first")
+        first_cache = _refresh(layer)
+        assert set(first_cache["geometry_fingerprints"]["values"]) == {str(oid) for oid in service.features}
+
+        for oid in range(1, 11):
+            service.features[oid]["attributes"]["owner"] = f"NEW OWNER {oid}"
+        for oid in range(11, 16):
+            ring = service.features[oid]["geometry"]["rings"][0]
+            service.features[oid]["geometry"] = {"rings": [[[x + (x - ring[0][0]), y + (y - ring[0][1])] for x, y in ring]]}
+            service.features[oid]["attributes"]["Shape__Area"] = _shape_area(service.features[oid]["geometry"])
+        del service.features[20]
+        service.requests.clear()
+
+        second_cache = _refresh(layer)
+        object_id_queries = [record for record in service.requests if record.operation == "query" and record.method == "POST"]
+
+        full_layer = _input_feature_layer(service.url, tmp_path / "full", refresh_mode="full")
+        full_cache = _refresh(full_layer)
+
+    assert len(object_id_queries) == 1
+    assert second_cache["arcgis_json"]["features"] == full_cache["arcgis_json"]["features"]
+    assert second_cache["arcgis_json"]["spatialReference"] == full_cache["arcgis_json"]["spatialReference"]
+    assert "geometry_fingerprints" not in full_cache
+    assert all("Shape__Area" not in feat["attributes"] for feat in second_cache["arcgis_json"]["features"])
+    assert second_cache["geometry_fingerprints"]["values"]["11"] != first_cache["geometry_fingerprints"]["values"]["11"]
+    assert "20" not in second_cache["geometry_fingerprints"]["values"]
+
+@pytest.mark.integration
+def test_attributes_first_refresh_without_unique_id_field(tmp_path):
+    arcgis_json = _parcels_with_shape_area(feature_count=300)
+
+    with MockFeatureService.from_arcgis_json(arcgis_json, max_record_count=100, unique_id_field=False) as service:
+        layer = _input_feature_layer(service.url, tmp_path, refresh_mode="attributes_first")
+        first_cache = _refresh(layer)
+        service.features[7]["attributes"]["owner"] = "NEW OWNER"
+        service.requests.clear()
+        second_cache = _refresh(layer)
+        object_id_queries = [record for record in service.requests if record.operation == "query" and record.method == "POST"]
+
+    assert all("OBJECTID" not in feat["attributes"] for feat in second_cache["arcgis_json"]["features"])
+    assert second_cache["geometry_fingerprints"]["object_ids"] == [str(oid) for oid in range(1, 301)]
+    assert not object_id_queries
+    assert [feat["geometry"] for feat in second_cache["arcgis_json"]["features"]] == [feat["geometry"] for feat in first_cache["arcgis_json"]["features"]]
+    assert second_cache["arcgis_json"]["features"][6]["attributes"]["owner"] == "NEW OWNER"
+
+@pytest.mark.integration
+def test_attributes_first_refresh_without_fingerprint_fields_is_full(tmp_path):
+    arcgis_json = synthetic_arcgis_json(geometry_type="polygon", feature_count=50)
+
+    with MockFeatureService.from_arcgis_json(arcgis_json) as service:
+        layer = _input_feature_layer(service.url, tmp_path, refresh_mode="attributes_first")
+        _refresh(layer)
+        cache = _refresh(layer)
+        geometry_queries = [record for record in service.requests if record.operation == "query" and record.method == "POST"]
+
+    assert "geometry_fingerprints" not in cache
+    assert len(cache["arcgis_json"]["features"]) == 50
+    assert not geometry_queries
+
+@pytest.mark.integration
+def test_attributes_first_refresh_periodically_downloads_full_geometry(tmp_path):
+    arcgis_json = _parcels_with_shape_area(feature_count=100)
+
+    with MockFeatureService.from_arcgis_json(arcgis_json) as service:
+        layer = _input_feature_layer(service.url, tmp_path, refresh_mode="attributes_first", max_geometry_reuse_runs=1)
+        _refresh(layer)
+        # a translated parcel keeps its area, so its fingerprint does not change
+        service.features[5]["geometry"] = {"rings": [[[x + 1_000, y] for x, y in service.features[5]["geometry"]["rings"][0]]]}
+        reused_cache = _refresh(layer)
+        full_cache = _refresh(layer)
+
+    assert reused_cache["geometry_fingerprints"]["reuse_runs"] == 1
+    assert reused_cache["arcgis_json"]["features"][4]["geometry"] != service.features[5]["geometry"]
+    assert full_cache["geometry_fingerprints"]["reuse_runs"] == 0
+    assert full_cache["arcgis_json"]["features"][4]["geometry"] == service.features[5]["geometry"]
+
+def test_split_envelope_covers_extent():
+    envelope = {"xmin": 0, "ymin": 10, "xmax": 30, "ymax": 30, "spatialReference": {"wkid": 3338}}
+    tiles = split_envelope(envelope, rows=2, columns=3)
+    assert len(tiles) == 6
+    assert tiles[0] == {"xmin": 0, "ymin": 10, "xmax": 10, "ymax": 20, "spatialReference": {"wkid": 3338}}
+    assert tiles[-1] == {"xmin": 20, "ymin": 20, "xmax": 30, "ymax": 30, "spatialReference": {"wkid": 3338}}
+    assert sum((t["xmax"] - t["xmin"]) * (t["ymax"] - t["ymin"]) for t in tiles) == pytest.approx(600)
+
+@pytest.mark.integration
+def test_tiled_refresh_deduplicates_features(tmp_path):
+    arcgis_json = synthetic_arcgis_json(geometry_type="polygon", feature_count=1_500)
+
+    with MockFeatureService.from_arcgis_json(arcgis_json, max_record_count=250) as service:
+        tiled_cache = _refresh(_input_feature_layer(service.url, tmp_path / "tiled", tile_grid=(3, 3)))
+        tile_queries = [record for record in service.requests if record.operation == "query"]
+        full_cache = _refresh(_input_feature_layer(service.url, tmp_path / "full"))
+
+    assert tiled_cache["arcgis_json"] == full_cache["arcgis_json"]
+    # one count and extent query, and at least one page per tile
+    assert len(tile_queries) >= 1 + 9
+
+@pytest.mark.integration
+def test_tiled_refresh_without_unique_id_field_or_with_null_geometry(tmp_path):
+    arcgis_json = synthetic_arcgis_json(geometry_type="polygon", feature_count=400, null_fraction=0.0)
+    for feat in arcgis_json["features"][::50]:
+        feat["geometry"] = None
+
+    with MockFeatureService.from_arcgis_json(arcgis_json, max_record_count=100, unique_id_field=False) as service:
+        tiled_cache = _refresh(_input_feature_layer(service.url, tmp_path / "tiled", tile_grid=(2, 2)))
+        full_cache = _refresh(_input_feature_layer(service.url, tmp_path / "full"))
+
+    assert len(tiled_cache["arcgis_json"]["features"]) == 400
+    assert all("OBJECTID" not in feat["attributes"] for feat in tiled_cache["arcgis_json"]["features"])
+    assert tiled_cache["arcgis_json"] == full_cache["arcgis_json"]
+
+@pytest.mark.integration
+def test_refresh_seconds_exclude_semaphore_wait(tmp_path):
+    arcgis_json = synthetic_arcgis_json(geometry_type="point", feature_count=50)
+
+    with MockFeatureService.from_arcgis_json(arcgis_json) as service:
+        layer = _input_feature_layer(service.url, tmp_path / "queued")
+
+        async def _run():
+            layer.semaphore = asyncio.Semaphore(1)
+            async with AsyncArcGisRequester() as requester:
+                layer.requester = requester
+                plan = await layer.probe()
+                async with layer.semaphore:
+                    refresh = asyncio.ensure_future(layer.refresh_features(plan=plan))
+                    # another layer holds the semaphore while this refresh is queued
+                    await asyncio.sleep(1)
+                await refresh
+
+        asyncio.run(_run())
+
+    with open(layer.cache.features.latest_entry(), "r") as file:
+        assert json.load(file)["refresh_seconds"] < 1
+
+@pytest.mark.integration
+def test_probe_plan_replaces_refresh_warm_up(tmp_path):
+    arcgis_json = synthetic_arcgis_json(geometry_type="polygon", feature_count=700)
+
+    with MockFeatureService.from_arcgis_json(arcgis_json, max_record_count=250) as service:
+        config = InputFeatureLayersConfig([
+            _input_feature_layer(service.url, tmp_path / "a", alias="a", sql_where_clause=f"OBJECTID IN ({','.join(str(oid) for oid in range(1, 401))})"),
+            _input_feature_layer(service.url, tmp_path / "b", alias="b"),
+        ])
+
+        async def _probe():
+            async with AsyncArcGisRequester() as requester:
+                for layer in config:
+                    layer.semaphore = asyncio.Semaphore(2)
+                    layer.requester = requester
+                return await config.probe(include_object_ids=True)
+
+        plans = asyncio.run(_probe())
+        probe_requests = list(service.requests)
+        service.requests.clear()
+        cache = _refresh(config.get_layer("a"), plan=plans["a"])
+        refresh_requests = list(service.requests)
+
+    assert plans["a"].target_feature_count == 400
+    assert plans["a"].object_ids == list(range(1, 401))
+    assert plans["b"].target_feature_count == 700
+    assert plans["b"].resource_info["objectIdField"] == "OBJECTID"
+    assert len([record for record in probe_requests if record.operation == "resource_info"]) == 2
+    assert {record.operation for record in refresh_requests} == {"query"}
+    assert len(refresh_requests) == 2
+    assert cache["target_feature_count"] == 400
+    assert len(cache["arcgis_json"]["features"]) == 400
+
+def _schedule(config: InputFeatureLayersConfig, cancel_alias: str | None = None, **kwargs) -> dict[str, LayerRefreshResult]:
+
+    async def _run():
+        async with AsyncArcGisRequester() as requester:
+            semaphore = asyncio.Semaphore(4)
+            for layer in config:
+                layer.semaphore = semaphore
+                layer.requester = requester
+            plans = await config.probe(return_exceptions=True)
+            schedule = asyncio.ensure_future(config.schedule_refresh(plans=plans, **kwargs))
+            if cancel_alias:
+                await asyncio.sleep(0.3)
+                assert config.cancel_refresh(cancel_alias)
+            return await schedule
+
+    return asyncio.run(_run())
+
+@pytest.mark.integration
+def test_schedule_refresh_starts_largest_layers_first(tmp_path):
+    arcgis_json = synthetic_arcgis_json(geometry_type="point", feature_count=900)
+    where = lambda count: f"OBJECTID IN ({','.join(str(oid) for oid in range(1, count + 1))})"
+
+    with MockFeatureService.from_arcgis_json(arcgis_json) as service:
+        config = InputFeatureLayersConfig([
+            _input_feature_layer(service.url, tmp_path / "small", alias="small", sql_where_clause=where(100)),
+            _input_feature_layer(service.url, tmp_path / "large", alias="large"),
+            _input_feature_layer(service.url, tmp_path / "medium", alias="medium", sql_where_clause=where(400)),
+            _input_feature_layer(service.url.replace("/0", "/9"), tmp_path / "missing", alias="missing"),
+        ])
+        first = _schedule(config, max_concurrency=1)
+        second = _schedule(config, max_concurrency=1, deadline_seconds={"medium": 1e-6})
+
+    assert list(first) == ["missing", "large", "medium", "small"]
+    assert first["missing"].status == "failed"
+    assert [first[alias].status for alias in ("large", "medium", "small")] == ["refreshed"] * 3
+    assert first["large"].estimated_seconds == pytest.approx(900 * 1e-3)
+    assert second["medium"].status == "timed_out"
+    # estimates are now based on previous refresh durations, read from the sidecar next to the feature cache
+    with open(tmp_path / "large" / "features" / REFRESH_METADATA_FILE_NAME, "r") as file:
+        assert json.load(file)["target_feature_count"] == 900
+    assert 0 < second["large"].estimated_seconds <= first["large"].seconds
+
+@pytest.mark.integration
+def test_cancel_refresh(tmp_path):
+    arcgis_json = synthetic_arcgis_json(geometry_type="point", feature_count=50)
+
+    with MockFeatureService.from_arcgis_json(arcgis_json, max_record_count=10, latency_seconds=0.1) as service:
+        config = InputFeatureLayersConfig([
+            _input_feature_layer(service.url, tmp_path / "a", alias="a"),
+            _input_feature_layer(service.url, tmp_path / "b", alias="b"),
+        ])
+        results = _schedule(config, cancel_alias="a")
+
+    assert results["a"].status == "cancelled"
+    assert results["b"].status == "refreshed"
@@ -0,0 +1,137 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from akdof_shared.protocol.file_logging_manager import ExitStatus, FileLoggingManager
+from akdof_shared.protocol.main_exit_manager import AsyncMainExitManager, CleanupCallable, MainExitManager
+from akdof_shared.utils.gmail_sender import GmailSender
+
+def test_async_cleanup_calls_run_concurrently_with_deadlines(tmp_path):
+    flm = FileLoggingManager(log_directory=tmp_path / "logs", log_format="jsonl")
+    logger = flm.get_file_logger(logger_name="test_exit_manager", file_name="main")
+    gmail_sender = GmailSender(sender_address="a@example.com", sender_app_password="pw", recipient_address="b@example.com", sink_directory=tmp_path / "emails")
+    called = list()
+    release = threading.Event()
+
+    async def slow_close():
+        await asyncio.sleep(0.2)
+        called.append("slow_close")
+
+    def slow_sync():
+        time.sleep(0.2)
+        called.append("slow_sync")
+
+    async def hung_close():
+        await asyncio.sleep(60)
+
+    def failing():
+        raise ValueError("cleanup failed")
+
+    async def run() -> AsyncMainExitManager:
+        async with AsyncMainExitManager(
+            project_directory=tmp_path,
+            file_logging_manager=flm,
+            main_logger=logger,
+            gmail_sender=gmail_sender,
+            cleanup_callables=(
+                CleanupCallable(slow_close),
+                CleanupCallable(slow_sync),
+                CleanupCallable(hung_close, timeout=0.3),
+                CleanupCallable(release.wait, {"timeout": 60}),
+                CleanupCallable(failing),
+            ),
+            cleanup_timeout_seconds=0.5,
+        ) as exit_manager:
+            pass
+        return exit_manager
+
+    start = time.perf_counter()
+    exit_manager = asyncio.run(run())
+    elapsed = time.perf_counter() - start
+    release.set()
+
+    assert elapsed < 2
+    assert sorted(called) == ["slow_close", "slow_sync"]
+    assert exit_manager.exit_status == ExitStatus.ERROR
+    (email_file,) = (tmp_path / "emails").glob("*.eml")
+    body = email_file.read_text()
+    assert "timed out after 0.3 seconds" in body
+    assert "abandoned calling" in body and "cleanup deadline" in body
+    assert "cleanup failed" in body
+
+def test_cleanup_timeout_applies_to_regular_functions(tmp_path):
+    flm = FileLoggingManager(log_directory=tmp_path / "logs", log_format="jsonl")
+    logger = flm.get_file_logger(logger_name="test_sync_exit_manager", file_name="main")
+    gmail_sender = GmailSender(sender_address="a@example.com", sender_app_password="pw", recipient_address="b@example.com", sink_directory=tmp_path / "emails")
+    called = list()
+    release = threading.Event()
+
+    def quick_sync():
+        called.append("quick_sync")
+
+    def failing():
+        raise ValueError("cleanup failed")
+
+    start = time.perf_counter()
+    with MainExitManager(
+        project_directory=tmp_path,
+        file_logging_manager=flm,
+        main_logger=logger,
+        gmail_sender=gmail_sender,
+        cleanup_callables=(
+            CleanupCallable(release.wait, {"timeout": 60}, timeout=0.3),
+            CleanupCallable(quick_sync),
+            CleanupCallable(failing, timeout=5),
+        ),
+    ) as exit_manager:
+        pass
+    elapsed = time.perf_counter() - start
+    release.set()
+
+    assert elapsed < 2
+    assert called == ["quick_sync"]
+    assert exit_manager.exit_status == ExitStatus.ERROR
+    (email_file,) = (tmp_path / "emails").glob("*.eml")
+    body = email_file.read_text()
+    assert "timed out after 0.3 seconds" in body
+    assert "cleanup failed" in body
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_timeout_error_raised_by_cleanup_call_is_logged_as_failure(tmp_path, use_async):
+    flm = FileLoggingManager(log_directory=tmp_path / "logs", log_format="jsonl")
+    logger = flm.get_file_logger(logger_name=f"test_timeout_error_exit_manager_{use_async}", file_name="main")
+    gmail_sender = GmailSender(sender_address="a@example.com", sender_app_password="pw", recipient_address="b@example.com", sink_directory=tmp_path / "emails")
+
+    def sync_timeout_error():
+        raise TimeoutError("sync connection timed out")
+
+    async def async_timeout_error():
+        raise TimeoutError("async connection timed out")
+
+    exit_manager_kwargs = dict(
+        project_directory=tmp_path,
+        file_logging_manager=flm,
+        main_logger=logger,
+        gmail_sender=gmail_sender,
+        cleanup_callables=(
+            CleanupCallable(sync_timeout_error),
+            CleanupCallable(sync_timeout_error, timeout=5),
+            CleanupCallable(async_timeout_error),
+            CleanupCallable(async_timeout_error, timeout=5),
+        ),
+    )
+    if use_async:
+        async def run():
+            async with AsyncMainExitManager(**exit_manager_kwargs):
+                pass
+        asyncio.run(run())
+    else:
+        with MainExitManager(**exit_manager_kwargs):
+            pass
+
+    (email_file,) = (tmp_path / "emails").glob("*.eml")
+    body = email_file.read_text()
+    assert "timed out after" not in body
+    assert body.count("failed calling") == 4
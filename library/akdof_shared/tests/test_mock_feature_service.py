@@ -0,0 +1,108 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from akdof_shared.gis.arcgis_helpers import (
+    cleanup_change_tracking,
+    get_feature_count_and_extent,
+    get_feature_layer_resource_info,
+    get_object_ids,
+)
+from akdof_shared.gis.feature_layer_editor import FeatureLayerEditor
+from akdof_shared.io.async_requester import AsyncArcGisRequester, AsyncRequester
+
+from mock_feature_service import MockFeatureService
+from synthetic_arcgis_json import synthetic_arcgis_json
+
+pytestmark = pytest.mark.integration
+
+@pytest.fixture
+def polygon_service():
+    arcgis_json = synthetic_arcgis_json(geometry_type="polygon", feature_count=2_500)
+    with MockFeatureService.from_arcgis_json(arcgis_json, max_record_count=1_000) as service:
+        yield service
+
+def test_resource_info_count_extent_and_ids(polygon_service):
+    resource_info = get_feature_layer_resource_info(base_url=polygon_service.url)
+    assert resource_info["maxRecordCount"] == 1_000
+    assert resource_info["advancedQueryCapabilities"]["supportsPagination"] is True
+
+    count, extent = get_feature_count_and_extent(base_url=polygon_service.url)
+    assert count == 2_500
+    assert extent["xmin"] < extent["xmax"]
+
+    vacant = [f for f in polygon_service.features.values() if f["attributes"]["property_use"] == "VACANT"]
+    object_ids = get_object_ids(base_url=polygon_service.url, where="property_use = 'VACANT'")
+    assert sorted(object_ids) == sorted(f["attributes"]["OBJECTID"] for f in vacant)
+
+def test_paginate_json_features(polygon_service):
+
+    async def _paginate():
+        async with AsyncArcGisRequester() as requester:
+            return await requester.paginate_json_features(
+                base_url=polygon_service.url,
+                params={"f": "json", "where": "1=1", "outfields": "*"},
+                max_record_count=1_000,
+            )
+
+    arcgis_json = asyncio.run(_paginate())
+    assert len(arcgis_json["features"]) == 2_500
+    assert polygon_service.count("query") == 3
+
+def test_send_request_retries_injected_429(polygon_service):
+    polygon_service.inject_faults(status=429, count=1, operation="resource_info", retry_after=1)
+
+    async def _request():
+        async with AsyncRequester() as requester:
+            return await requester.send_request(
+                url=polygon_service.url,
+                request_method="get",
+                read_method="json",
+                status_code_plan={429: {"sleep_seconds": 0.1, "attempt_increment": 1}},
+                params={"f": "json"},
+            )
+
+    resource_info = asyncio.run(_request())
+    assert resource_info["name"] == polygon_service.service_name
+    assert [r.status for r in polygon_service.requests] == [429, 200]
+
+def test_feature_layer_editor_falls_back_to_batches(polygon_service):
+    polygon_service.inject_faults(status=504, count=1, operation="applyEdits", mode="text_error")
+    features_to_add = synthetic_arcgis_json(geometry_type="polygon", feature_count=300, seed=1)["features"]
+    for feat in features_to_add:
+        feat["attributes"].pop("OBJECTID")
+
+    async def _edit():
+        async with FeatureLayerEditor(
+            base_url=polygon_service.url,
+            token="mock",
+            feature_deletion_query="property_use = 'VACANT'",
+            features_to_add=features_to_add,
+            adds_batch_size=100,
+        ) as editor:
+            return await editor.apply_edits_with_validation()
+
+    edit_metrics = asyncio.run(_edit())
+    assert edit_metrics["target_feature_count_discrepancy"] == 0
+    assert edit_metrics["features_to_add"] == 300
+    assert polygon_service.count("applyEdits") == 1 + 1 + 3
+
+def test_payload_limit_and_cleanup_change_tracking(polygon_service):
+    polygon_service.max_payload_bytes = 1_000
+
+    async def _edit():
+        async with AsyncRequester() as requester:
+            await requester.send_request(
+                url=f"{polygon_service.url}/applyEdits",
+                request_method="post",
+                read_method="json",
+                data={"adds": "[" + ",".join(["{}"] * 1_000) + "]", "f": "json"},
+            )
+
+    with pytest.raises(aiohttp.ClientResponseError) as exc_info:
+        asyncio.run(_edit())
+    assert exc_info.value.status == 413
+
+    cleanup_change_tracking(admin_base_url=polygon_service.admin_url, token="mock", layers=0, retention_period=10, retention_period_units="seconds")
+    assert polygon_service.cleanup_change_tracking_calls == 1
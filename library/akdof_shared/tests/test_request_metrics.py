@@ -0,0 +1,85 @@
+import asyncio
+import logging
+
+import pytest
+
+from akdof_shared.io.async_requester import AsyncArcGisRequester, AsyncRequester
+from akdof_shared.io.request_metrics import RequestMetrics
+
+from mock_feature_service import MockFeatureService
+from synthetic_arcgis_json import synthetic_arcgis_json
+
+pytestmark = pytest.mark.integration
+
+@pytest.fixture
+def point_service():
+    arcgis_json = synthetic_arcgis_json(geometry_type="point", feature_count=1_500)
+    with MockFeatureService.from_arcgis_json(arcgis_json, max_record_count=1_000) as service:
+        yield service
+
+def test_pagination_records_per_page(point_service):
+    metrics = RequestMetrics()
+
+    async def _paginate():
+        async with AsyncArcGisRequester(metrics_hook=metrics) as requester:
+            return await requester.paginate_json_features(
+                base_url=point_service.url,
+                params={"f": "json", "where": "1=1", "outfields": "*"},
+                max_record_count=1_000,
+            )
+
+    asyncio.run(_paginate())
+    summary = metrics.summary()[f"{point_service.url.split('/')[2]} pagination"]
+    assert summary["requests"] == 2
+    assert summary["errors"] == 0
+    assert summary["status_codes"] == {"200": 2}
+    assert sorted(record.label for record in metrics.slowest) == ["resultOffset=0", "resultOffset=1000"]
+    assert all(record.response_bytes > 0 and record.ttfb_seconds is not None for record in metrics.slowest)
+
+def test_retries_and_failures_are_recorded(point_service, caplog):
+    metrics = RequestMetrics()
+    point_service.inject_faults(status=429, count=1, operation="resource_info")
+    point_service.inject_faults(status=500, count=1, operation="query")
+
+    async def _requests():
+        async with AsyncRequester(metrics_hook=metrics) as requester:
+            await requester.send_request(
+                url=point_service.url,
+                request_method="get",
+                read_method="json",
+                status_code_plan={429: {"sleep_seconds": 0.1, "attempt_increment": 1}},
+                operation="resource_info",
+                params={"f": "json"},
+            )
+            with pytest.raises(Exception):
+                await requester.send_request(
+                    url=f"{point_service.url}/query",
+                    request_method="get",
+                    read_method="json",
+                    status_code_plan=None,
+                    params={"f": "json", "where": "1=1", "returnCountOnly": "true"},
+                )
+
+    asyncio.run(_requests())
+    query, resource_info = sorted(metrics.slowest, key=lambda record: record.operation)
+    assert (query.operation, query.status, query.retries) == ("query", 500, 0)
+    assert (resource_info.operation, resource_info.status, resource_info.retries) == ("resource_info", 200, 1)
+    assert resource_info.sleep_seconds > 0
+    assert resource_info.latency_seconds >= resource_info.sleep_seconds
+
+    logger = logging.getLogger("test_request_metrics")
+    with caplog.at_level(logging.INFO, logger=logger.name):
+        metrics.log_summary(logger)
+    assert sum("REQUEST METRICS" in message for message in caplog.messages) == 2
+    assert sum("SLOW REQUEST" in message for message in caplog.messages) == 2
+
+def test_failing_hook_does_not_interrupt_requests(point_service):
+
+    def _hook(record):
+        raise RuntimeError("hook failure")
+
+    async def _request():
+        async with AsyncRequester(metrics_hook=_hook) as requester:
+            return await requester.send_request(url=point_service.url, request_method="get", read_method="json", params={"f": "json"})
+
+    assert asyncio.run(_request())["maxRecordCount"] == 1_000
@@ -0,0 +1,124 @@
+import asyncio
+import time
+
+import aiohttp
+import pytest
+
+from akdof_shared.io.async_requester import AsyncArcGisRequester, AsyncRequester
+from akdof_shared.io.retry_policy import CircuitBreaker, CircuitOpen, RetryBudget
+
+from mock_feature_service import MockFeatureService
+from synthetic_arcgis_json import synthetic_arcgis_json
+
+pytestmark = pytest.mark.integration
+
+_FAST_PLAN = {"5": {"sleep_seconds": 0.1, "attempt_increment": 1}}
+
+@pytest.fixture
+def point_service():
+    with MockFeatureService.from_arcgis_json(synthetic_arcgis_json(geometry_type="point", feature_count=10)) as service:
+        yield service
+
+def _send(service, requester_kwargs: dict, status_code_plan: dict, requests: int = 1) -> list:
+    """Send `requests` resource info requests sequentially, returning the result or raised exception of each"""
+
+    async def _requests():
+        results = list()
+        async with AsyncRequester(**requester_kwargs) as requester:
+            for _ in range(requests):
+                try:
+                    results.append(
+                        await requester.send_request(url=service.url, request_method="get", read_method="json", status_code_plan=status_code_plan, params={"f": "json"})
+                    )
+                except Exception as e:
+                    results.append(e)
+        return results
+
+    return asyncio.run(_requests())
+
+def _paginate(service, requester_kwargs: dict) -> dict | Exception:
+    """Paginate all features of `service`, returning the result or raised exception"""
+
+    async def _pagination():
+        async with AsyncArcGisRequester(**requester_kwargs) as requester:
+            try:
+                return await requester.paginate_json_features(
+                    base_url=service.url,
+                    params={"f": "json", "where": "1=1", "outfields": "*"},
+                    max_record_count=100,
+                )
+            except Exception as e:
+                return e
+
+    return asyncio.run(_pagination())
+
+def test_retry_after_beyond_max_sleep_fails_fast(point_service):
+    point_service.inject_faults(status=503, count=1, operation="resource_info", retry_after=3600)
+    plan = {503: {"sleep_seconds": 0.1, "attempt_increment": 1, "max_sleep_seconds": 60}}
+
+    started = time.monotonic()
+    [result] = _send(point_service, dict(), plan)
+    assert isinstance(result, aiohttp.ClientResponseError) and result.status == 503
+    assert time.monotonic() - started < 1
+    assert point_service.count("resource_info") == 1
+
+def test_retry_after_extends_planned_sleep(point_service):
+    point_service.inject_faults(status=503, count=1, operation="resource_info", retry_after=1)
+
+    started = time.monotonic()
+    [result] = _send(point_service, dict(), _FAST_PLAN)
+    assert isinstance(result, dict)
+    assert time.monotonic() - started >= 1
+
+def test_circuit_breaker_opens_and_fails_fast(point_service):
+    point_service.inject_faults(status=500, count=100, operation="resource_info")
+    breaker = CircuitBreaker(failure_threshold=2, cooldown_seconds=60)
+
+    results = _send(point_service, {"circuit_breaker": breaker}, _FAST_PLAN, requests=3)
+    # the second failure opens the circuit, so the first request abandons its last retry
+    assert isinstance(results[0], aiohttp.ClientResponseError)
+    assert all(isinstance(result, CircuitOpen) for result in results[1:])
+    assert point_service.count("resource_info") == 2
+
+def test_circuit_breaker_half_open_probe_closes_circuit(point_service):
+    point_service.inject_faults(status=500, count=2, operation="resource_info")
+    breaker = CircuitBreaker(failure_threshold=2, cooldown_seconds=0.2)
+
+    results = _send(point_service, {"circuit_breaker": breaker}, dict(), requests=3)
+    assert all(isinstance(result, aiohttp.ClientResponseError) for result in results[:2])
+    assert isinstance(results[2], CircuitOpen)
+
+    time.sleep(0.25)
+    [probe] = _send(point_service, {"circuit_breaker": breaker}, dict())
+    assert isinstance(probe, dict)
+    assert not breaker.is_open(point_service.url)
+
+def test_retry_budget_limits_retries(point_service):
+    point_service.inject_faults(status=500, count=100, operation="resource_info")
+    budget = RetryBudget(ratio=0, minimum=1)
+
+    results = _send(point_service, {"retry_budget": budget}, _FAST_PLAN, requests=2)
+    assert all(isinstance(result, aiohttp.ClientResponseError) for result in results)
+    # one retry for the first request, none for the second
+    assert point_service.count("resource_info") == 3
+
+def test_page_not_retried_once_circuit_is_open(point_service):
+    point_service.inject_faults(status=500, count=100, operation="query")
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_seconds=60)
+
+    started = time.monotonic()
+    result = _paginate(point_service, {"circuit_breaker": breaker})
+    # the page level retry gives up on the open circuit instead of sleeping and failing with CircuitOpen
+    assert isinstance(result, aiohttp.ClientResponseError) and result.status == 500
+    assert time.monotonic() - started < 1
+    assert point_service.count("query") == 1
+
+def test_page_retries_withdraw_from_retry_budget(point_service):
+    point_service.inject_faults(status=500, count=1, operation="query")
+    budget = RetryBudget(ratio=0, minimum=0)
+
+    started = time.monotonic()
+    result = _paginate(point_service, {"retry_budget": budget})
+    assert isinstance(result, aiohttp.ClientResponseError) and result.status == 500
+    assert time.monotonic() - started < 1
+    assert point_service.count("query") == 1
@@ -0,0 +1,75 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import pytest
+
+from akdof_shared.gis.feature_layer_editor import FeatureLayerEditor
+from akdof_shared.gis.input_feature_layer import InputFeatureLayer, InputFeatureLayerCache
+from akdof_shared.io.async_requester import AsyncArcGisRequester
+from akdof_shared.io.file_cache_manager import FileCacheManager
+from akdof_shared.io.run_history import RunHistoryStore, RunRecord
+
+from mock_feature_service import MockFeatureService
+from synthetic_arcgis_json import synthetic_arcgis_json
+
+def test_store_queries_and_summary(tmp_path):
+    store = RunHistoryStore(path=tmp_path / "history" / "runs.sqlite")
+    for day, seconds in enumerate((10.0, 12.0, 30.0), start=1):
+        store.record(RunRecord(alias="Borough", operation="refresh", started_utc=f"2026-01-0{day}T08:00:00.000+00:00", seconds=seconds, status="succeeded", feature_count=1_000, pages=2, response_bytes=1_000_000))
+    store.record(RunRecord(alias="Borough", operation="refresh", started_utc="2026-01-04T08:00:00.000+00:00", seconds=1.0, status="failed", details={"exception": "HTTP 503"}))
+    store.record(RunRecord(alias="City", operation="edit", started_utc="2026-01-04T09:00:00.000+00:00", seconds=5.0, status="succeeded", feature_count=10))
+
+    assert [run.seconds for run in store.runs(alias="Borough")] == [1.0, 30.0, 12.0, 10.0]
+    assert store.runs(alias="Borough", status="failed")[0].details == {"exception": "HTTP 503"}
+    assert store.latest("Borough", "refresh").seconds == 30.0
+    assert store.latest("Nowhere", "refresh") is None
+    assert len(store.runs(since="2026-01-03T00:00:00+00:00")) == 3
+
+    summary = store.summary()
+    assert summary["Borough refresh"]["runs"] == 4
+    assert summary["Borough refresh"]["succeeded"] == 3
+    assert summary["Borough refresh"]["max_seconds"] == 30.0
+    assert summary["City edit"]["latest_started_utc"] == "2026-01-04T09:00:00.000+00:00"
+
+@pytest.mark.integration
+def test_refresh_and_edit_record_runs(tmp_path):
+    store = RunHistoryStore(path=tmp_path / "runs.sqlite")
+    arcgis_json = synthetic_arcgis_json(geometry_type="polygon", feature_count=1_100)
+
+    with MockFeatureService.from_arcgis_json(arcgis_json, max_record_count=500) as service:
+        layer = InputFeatureLayer(
+            url=service.url,
+            alias="Mock Parcels",
+            cache=InputFeatureLayerCache(
+                resource_info=FileCacheManager(path=tmp_path / "resource_info", max_age=timedelta(hours=1), max_count=3),
+                features=FileCacheManager(path=tmp_path / "features", max_age=timedelta(days=1), max_count=3),
+            ),
+            run_history=store,
+            thread_executor=ThreadPoolExecutor(max_workers=2),
+        )
+        features_to_add = synthetic_arcgis_json(geometry_type="polygon", feature_count=20, seed=1)["features"]
+        for feat in features_to_add:
+            feat["attributes"].pop("OBJECTID")
+
+        async def _run():
+            layer.semaphore = asyncio.Semaphore(2)
+            async with AsyncArcGisRequester() as requester:
+                layer.requester = requester
+                await layer.refresh_features()
+            async with FeatureLayerEditor(base_url=service.url, token="mock", features_to_add=features_to_add, run_history=store, alias="Mock Parcels") as editor:
+                await editor.apply_edits_with_validation()
+
+        asyncio.run(_run())
+
+    refresh = store.latest("Mock Parcels", "refresh")
+    assert refresh.feature_count == 1_100
+    assert refresh.pages == 3
+    assert refresh.requests == 3
+    assert refresh.response_bytes > 0
+    assert refresh.details["refresh_mode"] == "full"
+
+    edit = store.latest("Mock Parcels", "edit")
+    assert edit.feature_count == 20
+    assert edit.requests == 1
+    assert edit.details["resulting_feature_count"] == 1_120
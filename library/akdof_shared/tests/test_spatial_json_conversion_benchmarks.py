@@ -0,0 +1,89 @@
+"""
+Offline performance benchmarks for `akdof_shared.gis.spatial_json_conversion` and `akdof_shared.gis.arcgis_pbf`, using synthetic point, polyline, and polygon layers.
+
+Run only the benchmarks with `pytest -m benchmark`, or skip them with `pytest -m "not benchmark"`.
+Benchmarks at 100,000 features are skipped unless the `AKDOF_LARGE_BENCHMARKS` environment variable is set.
+Results can be saved and compared across converter rewrites with `--benchmark-autosave` and `--benchmark-compare`.
+"""
+
+from functools import lru_cache
+import os
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from akdof_shared.gis.arcgis_pbf import decode_feature_collection_pbf
+from akdof_shared.gis.spatial_json_conversion import (
+    arcgis_json_to_gdf,
+    gdf_to_arcgis_json,
+    json_features_to_dataframe,
+)
+
+from arcgis_pbf_encoder import encode_feature_collection_pbf
+from synthetic_arcgis_json import synthetic_arcgis_json
+
+_LARGE = pytest.mark.skipif(not os.getenv("AKDOF_LARGE_BENCHMARKS"), reason="set AKDOF_LARGE_BENCHMARKS to run 100k feature benchmarks")
+
+GEOMETRY_TYPES = ("point", "polyline", "polygon")
+FEATURE_COUNTS = (1_000, 10_000, pytest.param(100_000, marks=_LARGE))
+
+@lru_cache(maxsize=None)
+def _layer(geometry_type: str, feature_count: int) -> dict:
+    return synthetic_arcgis_json(geometry_type=geometry_type, feature_count=feature_count)
+
+@lru_cache(maxsize=None)
+def _layer_gdf(geometry_type: str, feature_count: int):
+    return arcgis_json_to_gdf(_layer(geometry_type, feature_count))
+
+def _rounds(feature_count: int) -> int:
+    return {1_000: 5, 10_000: 3}.get(feature_count, 1)
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("feature_count", FEATURE_COUNTS)
+@pytest.mark.parametrize("geometry_type", GEOMETRY_TYPES)
+def test_benchmark_arcgis_json_to_gdf(benchmark, geometry_type, feature_count):
+    arcgis_json = _layer(geometry_type, feature_count)
+    gdf = benchmark.pedantic(arcgis_json_to_gdf, args=(arcgis_json,), rounds=_rounds(feature_count))
+    assert len(gdf) == feature_count
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("feature_count", FEATURE_COUNTS)
+@pytest.mark.parametrize("geometry_type", GEOMETRY_TYPES)
+def test_benchmark_gdf_to_arcgis_json(benchmark, geometry_type, feature_count):
+    gdf = _layer_gdf(geometry_type, feature_count)
+    arcgis_json = benchmark.pedantic(gdf_to_arcgis_json, args=(gdf,), rounds=_rounds(feature_count))
+    assert len(arcgis_json["features"]) == feature_count
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("feature_count", FEATURE_COUNTS)
+@pytest.mark.parametrize("geometry_type", GEOMETRY_TYPES)
+def test_benchmark_json_features_to_dataframe(benchmark, geometry_type, feature_count):
+    features = _layer(geometry_type, feature_count)["features"]
+    df = benchmark.pedantic(json_features_to_dataframe, args=(features, "arcgis"), rounds=_rounds(feature_count))
+    assert len(df) == feature_count
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("feature_count", FEATURE_COUNTS)
+@pytest.mark.parametrize("geometry_type", GEOMETRY_TYPES)
+def test_benchmark_round_trip(benchmark, geometry_type, feature_count):
+    arcgis_json = _layer(geometry_type, feature_count)
+    round_trip = benchmark.pedantic(lambda: gdf_to_arcgis_json(arcgis_json_to_gdf(arcgis_json)), rounds=_rounds(feature_count))
+    assert len(round_trip["features"]) == feature_count
+
+@pytest.mark.parametrize("geometry_type", GEOMETRY_TYPES)
+def test_round_trip_fidelity(geometry_type):
+    arcgis_json = _layer(geometry_type, 1_000)
+    round_trip = gdf_to_arcgis_json(arcgis_json_to_gdf(arcgis_json))
+
+    assert round_trip["geometryType"] == arcgis_json["geometryType"]
+    assert round_trip["spatialReference"]["latestWkid"] == arcgis_json["spatialReference"]["latestWkid"]
+    assert round_trip["features"] == arcgis_json["features"]
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("feature_count", FEATURE_COUNTS)
+@pytest.mark.parametrize("geometry_type", GEOMETRY_TYPES)
+def test_benchmark_decode_pbf(benchmark, geometry_type, feature_count):
+    content = encode_feature_collection_pbf(_layer(geometry_type, feature_count))
+    arcgis_json = benchmark.pedantic(decode_feature_collection_pbf, args=(content,), rounds=_rounds(feature_count))
+    assert len(arcgis_json["features"]) == feature_count
@@ -7,17 +7,36 @@ import os
 from pathlib import Path
 
 from akdof_shared.io.file_cache_manager import FileCacheManager, PurgeMethod
-from akdof_shared.io.async_requester import AsyncArcGisRequester
+from akdof_shared.io.async_requester import AsyncArcGisRequester, ConnectorConfig, SharedConnector
+from akdof_shared.io.host_rate_limiter import HostLimits, HostRateLimiter
+from akdof_shared.io.retry_policy import CircuitBreaker, RetryBudget
 from akdof_shared.utils.create_file_diff import create_file_diff
 from akdof_shared.gis.input_feature_layer import InputFeatureLayerCache, InputFeatureLayer, InputFeatureLayersConfig
 
-from config.logging_config import FLM
-from config.process_config import PROJ_DIR, TARGET_EPSG
+from config.logging_config import FLM, REQUEST_METRICS, RUN_HISTORY
+from config.process_config import INPUT_GEOMETRY_REUSE_MAX_RUNS, PROJ_DIR, TARGET_EPSG
 
 _LOGGER = FLM.get_file_logger(logger_name=__name__, file_name=__file__)
 
-_SHARED_SEMAPHORE = asyncio.Semaphore(15)
-_SHARED_REQUESTER = AsyncArcGisRequester(logger=_LOGGER)
+# the semaphore caps total concurrency, while the rate limiter keeps ArcGIS Online and the smaller local government servers within their own limits
+_SHARED_SEMAPHORE = asyncio.Semaphore(30)
+_SHARED_RATE_LIMITER = HostRateLimiter(
+    default_limits=HostLimits(requests_per_second=4, burst=4, max_concurrency=3),
+    host_limits={"services*.arcgis.com": HostLimits(requests_per_second=20, burst=20, max_concurrency=12)}
+)
+# only a handful of hosts are polled, so idle connections and resolved addresses are kept long enough to be reused between layers
+SHARED_CONNECTOR = SharedConnector(
+    ConnectorConfig(limit_per_host=20, keepalive_timeout=60, ttl_dns_cache=300, use_aiodns=True, accept_encoding="gzip, deflate")
+)
+"""Connection pool shared by the input requester and the target layer editing requester, closed as a cleanup call on exit."""
+_SHARED_REQUESTER = AsyncArcGisRequester(
+    logger=_LOGGER,
+    metrics_hook=REQUEST_METRICS,
+    rate_limiter=_SHARED_RATE_LIMITER,
+    circuit_breaker=CircuitBreaker(),
+    retry_budget=RetryBudget(),
+    shared_connector=SHARED_CONNECTOR
+)
 _SHARED_THREAD_EXECUTOR = ThreadPoolExecutor(thread_name_prefix="inputs_config")
 
 def parcel_feature_layer_cache_factory(cache_path: Path) -> InputFeatureLayerCache:
@@ -86,6 +105,9 @@ def input_parcel_factory(url: str, alias: str | None, field_map: dict[str, str],
         output_epsg=TARGET_EPSG,
         outfields=[source_field for source_field in field_map.values() if source_field is not None],
         field_map={source_field: target_field for target_field, source_field in field_map.items() if source_field is not None},
+        refresh_mode="attributes_first",
+        max_geometry_reuse_runs=INPUT_GEOMETRY_REUSE_MAX_RUNS,
+        run_history=RUN_HISTORY,
         logger=_LOGGER,
         semaphore=_SHARED_SEMAPHORE,
         requester=_SHARED_REQUESTER,
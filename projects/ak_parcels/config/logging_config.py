@@ -1,15 +1,36 @@
 """Centralized logging configuration for project-wide file logging."""
 
 from akdof_shared.protocol.file_logging_manager import FileLoggingManager
+from akdof_shared.io.request_metrics import RequestMetrics
+from akdof_shared.io.run_history import RunHistoryStore
 
 from config.process_config import PROJ_DIR
 
 FLM = FileLoggingManager(
     log_directory=PROJ_DIR / "data" / "logs",
     logging_level="DEBUG",
+    log_format="jsonl",
+    queue_logging=True,
+    log_file_max_bytes=10 * 1024**2,
+    compress_archives=True,
 )
 """
 Project-wide file logging manager.
 
 The caller can modify the logging level parameter in accordance with development / production needs.
-"""
\ No newline at end of file
+Logs are written as JSON lines, so exit checks only read records written since the process started, rather than re-parsing every DEBUG level log file.
+File writes are made by a background listener thread, keeping them off of the event loop.
+"""
+
+REQUEST_METRICS = RequestMetrics()
+"""
+Project-wide request timing and size metrics, shared by every `AsyncRequester`.
+
+Summarized to the main log file as a cleanup call when the process exits.
+"""
+RUN_HISTORY = RunHistoryStore(path=PROJ_DIR / "data" / "run_history.sqlite")
+"""
+Persistent per-layer refresh and edit metrics (duration, feature count, pages, bytes downloaded), keyed by alias and run start time.
+
+Used by the input refresh scheduler for cost estimates, and for spotting regressions in source services.
+"""
@@ -3,7 +3,7 @@
 import os
 from pathlib import Path
 
-from akdof_shared.gis.arcgis_gdf_conversion_prep import ArcGisTargetLayerConfig
+from akdof_shared.gis.arcgis_gdf_conversion_prep import ArcGisTargetLayerConfig, DtypeBackend
 
 PROJ_DIR = Path(os.getenv("AKDOF_ROOT")) / "projects" / "ak_parcels"
 """Project root directory."""
@@ -14,4 +14,20 @@ TARGET_EPSG = 3857
 TARGET_LAYER_CONFIG = ArcGisTargetLayerConfig.load(
     json_path=PROJ_DIR / "config" / "target_layer_config" / "ak_parcels.json"
 )
-"""Data type and field length configuration for the hosted feature layer which gets updated by this project."""
\ No newline at end of file
+"""Data type and field length configuration for the hosted feature layer which gets updated by this project."""
+
+DTYPE_BACKEND: DtypeBackend | None = None
+"""
+Pandas data type backend used when loading and formatting parcel attributes. None loads attributes with their default data types.
+"pyarrow" substantially reduces memory use for string-heavy parcel attributes, but requires `pyarrow` in the project environment.
+Any backend converts whole-number float columns to nullable integers, which changes the `feature_id` hash of affected parcels.
+"""
+INPUT_REFRESH_DEADLINE_SECONDS = 45 * 60
+"""Time limit for refreshing the features of a single input parcel layer, so one slow source cannot hold up the nightly run."""
+INPUT_REFRESH_MAX_CONCURRENCY = 6
+"""Input parcel layers refreshed at the same time. The remaining layers wait their turn, starting with the layers expected to take longest."""
+INPUT_GEOMETRY_REUSE_MAX_RUNS = 6
+"""
+Nightly input parcel refreshes that may reuse cached geometry, after which parcel geometry is downloaded in full again.
+Keeps a parcel that was moved or realigned without changing its area or perimeter from keeping stale geometry for more than a week.
+"""
@@ -4,6 +4,7 @@ import geopandas as gpd
 
 from config.logging_config import FLM
 from config.inputs_config import INPUT_FEATURE_LAYERS_CONFIG
+from config.process_config import DTYPE_BACKEND, INPUT_REFRESH_DEADLINE_SECONDS, INPUT_REFRESH_MAX_CONCURRENCY
 
 from akdof_shared.gis.input_feature_layer import FeaturesGdf
 from akdof_shared.gis.gdf_change_detection import gdf_no_index_change_detection
@@ -14,29 +15,31 @@ async def load_parcel_feature_history() -> dict[str, list[FeaturesGdf]]:
     """
     Load parcel feature history for all configured input layers.
     
-    Refreshes features for all configured layers, then loads feature history 
-    (2 cache entries) for layers that successfully refreshed. Exceptions are
-    logged but don't halt processing of other layers.
+    Probes all configured layers concurrently, refreshes features for layers that
+    were successfully probed (a few at a time, largest layers first, each within a deadline), then
+    loads feature history (2 cache entries) for layers that successfully refreshed.
+    Exceptions are logged but don't halt processing of other layers.
     
     Returns
     -------
     dict[str, list[FeaturesGdf]]
         Feature history by layer alias, containing current and previous features.
     """
-    refresh_features_results = await asyncio.gather(
-        *(layer.track_method_call("refresh_features") for layer in INPUT_FEATURE_LAYERS_CONFIG),
-        return_exceptions=True
+    refresh_plans = await INPUT_FEATURE_LAYERS_CONFIG.probe(return_exceptions=True)
+    refresh_features_results = await INPUT_FEATURE_LAYERS_CONFIG.schedule_refresh(
+        plans=refresh_plans,
+        deadline_seconds=INPUT_REFRESH_DEADLINE_SECONDS,
+        max_concurrency=INPUT_REFRESH_MAX_CONCURRENCY
     )
-    
-    exceptions = [e for e in refresh_features_results if isinstance(e, Exception)]
-    for e in exceptions:
-        _LOGGER.error(FLM.format_exception(e))
 
-    results = [r for r in refresh_features_results if not isinstance(r, Exception)]
-    valid_feature_refresh_aliases = [alias for r in results for alias in r.keys()]
+    for result in refresh_features_results.values():
+        if result.status != "refreshed":
+            _LOGGER.error(f"{result.alias}: Refresh {result.status}. {FLM.format_exception(result.exception)}")
+
+    valid_feature_refresh_aliases = [alias for alias, result in refresh_features_results.items() if result.status == "refreshed"]
 
     feature_history_results = await asyncio.gather(
-        *(layer.track_method_call("load_feature_history", cache_count=2, apply_field_map=True) for layer in INPUT_FEATURE_LAYERS_CONFIG if layer.alias in valid_feature_refresh_aliases),
+        *(layer.track_method_call("load_feature_history", cache_count=2, apply_field_map=True, dtype_backend=DTYPE_BACKEND) for layer in INPUT_FEATURE_LAYERS_CONFIG if layer.alias in valid_feature_refresh_aliases),
         return_exceptions=True
     )
 
@@ -7,12 +7,12 @@ from akdof_shared.utils.with_retry import with_retry_async
 from akdof_shared.gis.arcgis_helpers import get_feature_count_and_extent
 from akdof_shared.gis.spatial_json_conversion import gdf_to_arcgis_json
 from akdof_shared.gis.feature_layer_editor import FeatureLayerEditor, ResultingFeatureCountInvalid, BatchEditException, EditFailureResponse
-from akdof_shared.gis.arcgis_gdf_conversion_prep import format_gdf_using_arcgis_config, ArcGisTargetLayerConfig
+from akdof_shared.gis.arcgis_gdf_conversion_prep import format_gdf_using_arcgis_config, ArcGisTargetLayerConfig, ArcGisSchemaPlan
 from akdof_shared.io.async_requester import AsyncRequester
 
-from config.process_config import TARGET_LAYER_CONFIG
-from config.inputs_config import INPUT_FEATURE_LAYERS_CONFIG
-from config.logging_config import FLM
+from config.process_config import TARGET_LAYER_CONFIG, DTYPE_BACKEND
+from config.inputs_config import INPUT_FEATURE_LAYERS_CONFIG, SHARED_CONNECTOR
+from config.logging_config import FLM, REQUEST_METRICS, RUN_HISTORY
 
 _LOGGER = FLM.get_file_logger(logger_name=__name__, file_name=__file__)
 
@@ -33,9 +33,10 @@ async def update_target_layer(target_layer_config: ArcGisTargetLayerConfig, toke
         Features to update, keyed by local government alias.
     """
     try:
-        editor_requester = AsyncRequester(timeout=3600, logger=_LOGGER)
+        editor_requester = AsyncRequester(timeout=3600, logger=_LOGGER, metrics_hook=REQUEST_METRICS, shared_connector=SHARED_CONNECTOR)
+        schema_plan = target_layer_config.compile(dtype_backend=DTYPE_BACKEND or "numpy_nullable")
         for alias, gdf in features_to_update.items():
-            arcgis_json = _format_agol_json_features(gdf=gdf, alias=alias, target_layer_config=target_layer_config)
+            arcgis_json = _format_agol_json_features(gdf=gdf, alias=alias, schema_plan=schema_plan)
             editor = FeatureLayerEditor(
                 base_url=target_layer_config.url,
                 token=token,
@@ -43,6 +44,8 @@ async def update_target_layer(target_layer_config: ArcGisTargetLayerConfig, toke
                 features_to_add=arcgis_json["features"],
                 logger=_LOGGER,
                 requester=editor_requester,
+                run_history=RUN_HISTORY,
+                alias=alias,
             )
             try:
                 edit_metrics = await with_retry_async(
@@ -77,9 +80,9 @@ def target_feature_count_validation() -> None:
         except Exception as e:
             _LOGGER.error(f"{input_feature_layer.alias} target feature count validation failed with Exception: {FLM.format_exception(e)}")
 
-def _format_agol_json_features(gdf: gpd.GeoDataFrame, alias: str, target_layer_config: ArcGisTargetLayerConfig) -> dict:
+def _format_agol_json_features(gdf: gpd.GeoDataFrame, alias: str, schema_plan: ArcGisSchemaPlan) -> dict:
     """
-    Formats GeoDataFrame according to `target_layer_config` and converts rows to ArcGIS JSON features.
+    Formats GeoDataFrame according to `schema_plan` and converts rows to ArcGIS JSON features.
     
     Adds local_gov, datetime_processed, and feature_id fields.
     Conditionally creates 'owner' field from first/last names and
@@ -92,8 +95,8 @@ def _format_agol_json_features(gdf: gpd.GeoDataFrame, alias: str, target_layer_c
         Input parcel features to format.
     alias : str
         Local government alias identifier.
-    target_layer_config : ArcGisTargetLayerConfig
-        Configuration for the ArcGIS Online target hosted feature layer.
+    schema_plan : ArcGisSchemaPlan
+        Compiled configuration for the ArcGIS Online target hosted feature layer.
         
     Returns
     -------
@@ -106,7 +109,8 @@ def _format_agol_json_features(gdf: gpd.GeoDataFrame, alias: str, target_layer_c
     gdf["feature_id"] = pd.util.hash_pandas_object(gdf, index=False)
 
     if "owner" not in gdf.columns and ("first_name" in gdf.columns and "last_name" in gdf.columns):
-        gdf["owner"] = (gdf["last_name"].fillna("").astype(str) + ", " + gdf["first_name"].fillna("").astype(str)).str.strip(", ")
+        string_dtype = "string[pyarrow]" if DTYPE_BACKEND == "pyarrow" else "string"
+        gdf["owner"] = (gdf["last_name"].astype(string_dtype).fillna("") + ", " + gdf["first_name"].astype(string_dtype).fillna("")).str.strip(", ")
         
     if "total_value" not in gdf.columns and ("land_value" in gdf.columns and "building_value" in gdf.columns):
         land_numeric = pd.to_numeric(gdf["land_value"], errors='coerce')
@@ -114,7 +118,7 @@ def _format_agol_json_features(gdf: gpd.GeoDataFrame, alias: str, target_layer_c
         mask = land_numeric.notna() | building_numeric.notna()
         gdf.loc[mask, "total_value"] = land_numeric.fillna(0) + building_numeric.fillna(0)
 
-    formatted_gdf = format_gdf_using_arcgis_config(gdf=gdf, target_layer_config=target_layer_config, logger=_LOGGER)
+    formatted_gdf = format_gdf_using_arcgis_config(gdf=gdf, target_layer_config=schema_plan, logger=_LOGGER)
     arcgis_json = gdf_to_arcgis_json(gdf=formatted_gdf)
 
     return arcgis_json
\ No newline at end of file
@@ -7,8 +7,8 @@ from akdof_shared.protocol.file_logging_manager import ExitStatus
 from akdof_shared.gis.arcgis_helpers import cleanup_change_tracking, CleanupChangeTrackingFailure
 
 from config.process_config import PROJ_DIR, TARGET_LAYER_CONFIG
-from config.logging_config import FLM
-from config.inputs_config import INPUT_FEATURE_LAYERS_CONFIG
+from config.logging_config import FLM, REQUEST_METRICS, RUN_HISTORY
+from config.inputs_config import INPUT_FEATURE_LAYERS_CONFIG, SHARED_CONNECTOR
 from config.secrets_config import SOA_ARCGIS_AUTH, GMAIL_SENDER
 from core.extract_parcel_inputs import load_parcel_feature_history, identify_parcel_features_to_update
 from core.update_target_layer import update_target_layer, target_feature_count_validation
@@ -23,8 +23,12 @@ async def main() -> ExitStatus:
         gmail_sender=GMAIL_SENDER,
         cleanup_callables=(
             CleanupCallable(INPUT_FEATURE_LAYERS_CONFIG.shutdown_thread_executors),
-            CleanupCallable(INPUT_FEATURE_LAYERS_CONFIG.close_requesters)
-        )
+            CleanupCallable(INPUT_FEATURE_LAYERS_CONFIG.close_requesters, timeout=30),
+            CleanupCallable(SHARED_CONNECTOR.close, timeout=30),
+            CleanupCallable(SOA_ARCGIS_AUTH.close, timeout=30),
+            CleanupCallable(REQUEST_METRICS.log_summary, {"logger": _LOGGER})
+        ),
+        run_history=RUN_HISTORY,
     ) as exit_manager:
 
         feature_history_results = await load_parcel_feature_history()
@@ -32,7 +36,7 @@ async def main() -> ExitStatus:
         if not features_to_update:
             raise EarlyExitSignal
 
-        soa_token = SOA_ARCGIS_AUTH.checkout_token(minutes_needed=45)
+        soa_token = await SOA_ARCGIS_AUTH.checkout_token_async(minutes_needed=45)
         await update_target_layer(target_layer_config=TARGET_LAYER_CONFIG, token=soa_token, features_to_update=features_to_update)
         target_feature_count_validation()
 
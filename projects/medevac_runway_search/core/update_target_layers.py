@@ -36,12 +36,12 @@ async def update_target_layers(features_to_update: dict[str, gpd.GeoDataFrame],
         success_status = True
         editor_requester = AsyncRequester(logger=_LOGGER)
         for alias, gdf in features_to_update.items():
-            target_layer_config = ArcGisTargetLayerConfig.load(json_path=PROJ_DIR / "config" / "target_layer_config" / f"{alias}.json")
-            formatted_gdf = format_gdf_using_arcgis_config(gdf=gdf, target_layer_config=target_layer_config, logger=_LOGGER)
+            schema_plan = ArcGisTargetLayerConfig.load_plan(json_path=PROJ_DIR / "config" / "target_layer_config" / f"{alias}.json")
+            formatted_gdf = format_gdf_using_arcgis_config(gdf=gdf, target_layer_config=schema_plan, logger=_LOGGER)
             arcgis_json = gdf_to_arcgis_json(gdf=formatted_gdf)
 
             editor = FeatureLayerEditor(
-                base_url=target_layer_config.url,
+                base_url=schema_plan.url,
                 token=token,
                 feature_deletion_query="1=1",
                 features_to_add=arcgis_json["features"],
@@ -7,6 +7,10 @@ Exits with ExitStatus enum values (1 = operations normal).
 
 import sys
 
+# derived cryptfile keys handed off by main.py are read before arcpy is imported, so processes started by arcpy do not inherit the handoff
+from akdof_shared.security.cryptfile_keyring_manager import receive_derived_keys
+receive_derived_keys()
+
 from core.arcpy_create_kmzs import arcpy_create_kmzs
 
 if __name__ == "__main__":
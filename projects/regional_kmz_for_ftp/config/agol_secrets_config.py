@@ -0,0 +1,35 @@
+"""
+ArcGIS Online credentials, kept apart from `secrets_config.py` so the ArcPy subprocess only reads the keyring entries it uses.
+The subprocess imports this module, while `secrets_config.py` re-exports it for the main process.
+"""
+
+import os
+from pathlib import Path
+
+from keyring.backends.Windows import WinVaultKeyring
+
+from akdof_shared.security.cryptfile_keyring_manager import CryptfileKeyringManager, ProjectSecret
+from akdof_shared.security.api_auth_manager import ArcGisApiAuthManager
+
+CKM = CryptfileKeyringManager(
+    master_password_keyring_backend=WinVaultKeyring(),
+    master_password_service_name="akdof_monorepo_master_service",
+    master_password_username="akdof_monorepo_master_user",
+    cryptfile_path=Path(os.getenv("AKDOF_ROOT")) / "admin" / "secrets" / "keyring_cryptfile.cfg"
+)
+"""Central keyring manager for encrypted credential storage."""
+
+NIFC_AGOL_CREDENTIALS = CKM.get_full_secret(ProjectSecret(service_name="https://nifc.maps.arcgis.com/", username="AK_State_Authoritative_nifc"))
+"""ArcGIS Online credentials - contains <portal_url>, <username>, <password>."""
+
+NIFC_ARCGIS_AUTH = ArcGisApiAuthManager(
+    cryptfile_keyring_manager=CKM,
+    project_secret=NIFC_AGOL_CREDENTIALS
+)
+"""Token lifecycle manager for NIFC ArcGIS Online authentication."""
+
+SUBPROCESS_PROJECT_SECRETS = (
+    NIFC_AGOL_CREDENTIALS,
+    ProjectSecret(service_name=NIFC_AGOL_CREDENTIALS.service_name, username="__TimedToken__"),
+)
+"""Keyring entries read by the ArcPy subprocess, whose derived keys `main.py` hands off to it."""
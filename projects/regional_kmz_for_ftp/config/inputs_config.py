@@ -10,7 +10,7 @@ from akdof_shared.gis.input_feature_layer import InputFeatureLayerCache, InputFe
 
 from config.logging_config import FLM
 from config.process_config import PROJ_DIR
-from config.secrets_config import NIFC_ARCGIS_AUTH
+from config.agol_secrets_config import NIFC_ARCGIS_AUTH
 
 _LOGGER = FLM.get_file_logger(logger_name=__name__, file_name=__file__)
 
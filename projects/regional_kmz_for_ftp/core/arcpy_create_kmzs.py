@@ -13,7 +13,7 @@ from config.process_config import (
     PROCESSING_CYCLE,
     PROCESSING_REGIONS,
 )
-from config.secrets_config import NIFC_AGOL_CREDENTIALS
+from config.agol_secrets_config import NIFC_AGOL_CREDENTIALS
 
 _LOGGER = FLM.get_file_logger(logger_name=__name__, file_name=__file__)
 
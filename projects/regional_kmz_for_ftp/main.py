@@ -1,3 +1,4 @@
+import os
 import subprocess
 import sys
 
@@ -7,9 +8,11 @@ from akdof_shared.protocol.main_exit_manager import MainExitManager
 from config.logging_config import FLM
 from config.process_config import AKSD_KMZ_ITEM_IDS, OUTPUT_KMZ_DIRECTORY, PROCESSING_REGIONS, PROJ_DIR
 from config.secrets_config import (
+    CKM,
     NIFC_FTP_CREDENTIALS,
     NIFC_ARCGIS_AUTH,
-    GMAIL_SENDER
+    GMAIL_SENDER,
+    SUBPROCESS_PROJECT_SECRETS
 )
 from core.agol_upload_aksd_kmzs import agol_upload_aksd_kmzs
 from core.ftp_upload_kmzs import ftp_upload_kmzs
@@ -31,7 +34,13 @@ def main() -> ExitStatus:
         # kmz outputs are created using arcpy
         # arcpy is contained in a subprocess to prevent its imports from modifying the main runtime environment
         # _subprocess.py exits using the ExitStatus enum (1 indicates an "operations normal" status)
-        result = subprocess.run([sys.executable, str(PROJ_DIR / "_subprocess.py")], timeout=3600)
+        # cryptfile keys for the arcgis online secrets the subprocess reads are handed off, so it does not repeat their key derivation
+        with CKM.derived_keys_handoff(SUBPROCESS_PROJECT_SECRETS) as handoff_env:
+            result = subprocess.run(
+                [sys.executable, str(PROJ_DIR / "_subprocess.py")],
+                env={**os.environ, **handoff_env},
+                timeout=3600
+            )
         if result.returncode != 1:
             raise ArcPySubprocessCriticalError(f"Exit Status: {result.returncode}. Check logs for details.")
 
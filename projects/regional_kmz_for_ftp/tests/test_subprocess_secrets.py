@@ -0,0 +1,119 @@
+"""
+Checks that the ArcPy subprocess reads its secrets with the derived keys handed off by `main.py`, without repeating key derivation.
+
+The parent and child run as real processes against a throwaway cryptfile under a temporary `AKDOF_ROOT`.
+The Windows master password backend is replaced by an in-memory one, and Argon2 is made cheap and counted.
+"""
+
+import ast
+from datetime import datetime as dt, timedelta, timezone as tz
+import json
+import os
+from pathlib import Path
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+_PROJ_DIR = Path(__file__).resolve().parents[1]
+
+_PATCH_KEYRING_AND_KDF = textwrap.dedent("""
+    import argon2.low_level
+    import keyring.backend
+    import keyring.backends.Windows
+
+    class _MasterKeyring(keyring.backend.KeyringBackend):
+        priority = 1
+
+        def get_password(self, service, username):
+            return "master password"
+
+        def set_password(self, service, username, password):
+            pass
+
+        def delete_password(self, service, username):
+            pass
+
+    keyring.backends.Windows.WinVaultKeyring = _MasterKeyring
+    KDF_CALLS = list()
+    _hash_secret_raw = argon2.low_level.hash_secret_raw
+
+    def _counting_hash_secret_raw(**kwargs):
+        KDF_CALLS.append(kwargs["salt"])
+        return _hash_secret_raw(**{**kwargs, "time_cost": 1, "memory_cost": 64})
+
+    argon2.low_level.hash_secret_raw = _counting_hash_secret_raw
+""")
+
+_STORE_SECRETS = _PATCH_KEYRING_AND_KDF + textwrap.dedent("""
+    import os
+    from pathlib import Path
+    from akdof_shared.security.cryptfile_keyring_manager import CryptfileKeyringManager, ProjectSecret
+
+    CryptfileKeyringManager(
+        master_password_keyring_backend=_MasterKeyring(),
+        master_password_service_name="akdof_monorepo_master_service",
+        master_password_username="akdof_monorepo_master_user",
+        cryptfile_path=Path(os.getenv("AKDOF_ROOT")) / "admin" / "secrets" / "keyring_cryptfile.cfg"
+    ).store_secrets((
+        ProjectSecret("https://nifc.maps.arcgis.com/", "AK_State_Authoritative_nifc", "agol password"),
+        ProjectSecret("https://nifc.maps.arcgis.com/", "__TimedToken__", os.environ["TIMED_TOKEN"]),
+        ProjectSecret("ftp.wildfire.gov", "cedick", "ftp password"),
+        ProjectSecret("gmail", "akdofscripts@gmail.com", "gmail password"),
+        ProjectSecret("send_gmail", "regional_kmz_for_ftp", "recipient@example.com"),
+    ))
+""")
+
+# mirrors the top of _subprocess.py and the secrets read by the modules it imports, short of importing arcpy
+_CHILD = textwrap.dedent("""
+    from akdof_shared.security.cryptfile_keyring_manager import receive_derived_keys
+    receive_derived_keys()
+""") + _PATCH_KEYRING_AND_KDF + textwrap.dedent("""
+    import json
+    from config.agol_secrets_config import NIFC_ARCGIS_AUTH, NIFC_AGOL_CREDENTIALS
+    assert NIFC_AGOL_CREDENTIALS.password == "agol password"
+    assert NIFC_ARCGIS_AUTH.checkout_token(minutes_needed=1) == "token"
+    print(json.dumps(len(KDF_CALLS)))
+""")
+
+# mirrors main.py
+_PARENT = _PATCH_KEYRING_AND_KDF + textwrap.dedent("""
+    import os
+    import subprocess
+    import sys
+    from config.secrets_config import CKM, SUBPROCESS_PROJECT_SECRETS
+
+    with CKM.derived_keys_handoff(SUBPROCESS_PROJECT_SECRETS) as handoff_env:
+        result = subprocess.run([sys.executable, "-c", os.environ["CHILD_SCRIPT"]], env={**os.environ, **handoff_env}, capture_output=True, text=True)
+    sys.stderr.write(result.stderr)
+    print(result.stdout, end="")
+    sys.exit(result.returncode)
+""")
+
+def _run(script: str, env: dict[str, str]) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, "-c", script], cwd=_PROJ_DIR, env={**os.environ, **env}, capture_output=True, text=True, timeout=120)
+
+def _imported_modules(file_path: Path) -> set[str]:
+    return {node.module for node in ast.walk(ast.parse(file_path.read_text())) if isinstance(node, ast.ImportFrom)}
+
+@pytest.mark.integration
+def test_subprocess_reads_secrets_without_key_derivation(tmp_path):
+    pytest.importorskip("argon2")
+    env = {
+        "AKDOF_ROOT": str(tmp_path),
+        "PYTHONPATH": os.pathsep.join(filter(None, (str(_PROJ_DIR), os.getenv("PYTHONPATH")))),
+        "TIMED_TOKEN": f"token||{(dt.now(tz.utc) + timedelta(hours=1)).isoformat()}",
+        "CHILD_SCRIPT": _CHILD,
+    }
+    (tmp_path / "admin" / "secrets").mkdir(parents=True)
+    stored = _run(_STORE_SECRETS, env)
+    assert stored.returncode == 0, stored.stderr
+
+    result = _run(_PARENT, env)
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout) == 0
+
+def test_subprocess_imports_only_agol_secrets():
+    for file_path in (_PROJ_DIR / "core" / "arcpy_create_kmzs.py", _PROJ_DIR / "config" / "inputs_config.py"):
+        assert "config.secrets_config" not in _imported_modules(file_path)
@@ -6,6 +6,7 @@ from typing import Iterable
 
 from akdof_shared.io.file_cache_manager import FileCacheManager, PurgeMethod
 from akdof_shared.io.async_requester import AsyncArcGisRequester
+from akdof_shared.io.host_rate_limiter import HostLimits, HostRateLimiter
 from akdof_shared.utils.create_file_diff import create_file_diff
 from akdof_shared.gis.input_feature_layer import InputFeatureLayerCache, InputFeatureLayer, InputFeatureLayersConfig
 
@@ -15,7 +16,8 @@ from config.logging_config import FLM
 _LOGGER = FLM.get_file_logger(logger_name=__name__, file_name=__file__)
 
 _SHARED_SEMAPHORE = asyncio.Semaphore(15)
-_SHARED_REQUESTER = AsyncArcGisRequester(logger=_LOGGER)
+_SHARED_RATE_LIMITER = HostRateLimiter(host_limits={"services*.arcgis.com": HostLimits(requests_per_second=20, burst=20, max_concurrency=12)})
+_SHARED_REQUESTER = AsyncArcGisRequester(logger=_LOGGER, rate_limiter=_SHARED_RATE_LIMITER)
 _SHARED_THREAD_EXECUTOR = ThreadPoolExecutor(thread_name_prefix="wfigs_inputs_config")
 
 def wfigs_feature_layer_cache_factory(cache_path: Path) -> InputFeatureLayerCache:
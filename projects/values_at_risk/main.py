@@ -3,7 +3,11 @@ import asyncio
 from config.wfigs_inputs_config import INPUT_FEATURE_LAYERS_CONFIG
 
 async def refresh_wfigs_features():
-    await asyncio.gather(*(layer.refresh_features() for layer in INPUT_FEATURE_LAYERS_CONFIG))
+    refresh_plans = await INPUT_FEATURE_LAYERS_CONFIG.probe()
+    refresh_results = await INPUT_FEATURE_LAYERS_CONFIG.schedule_refresh(plans=refresh_plans)
+    for result in refresh_results.values():
+        if result.exception is not None:
+            raise result.exception
 
 async def main():
     """Entry point for taking a snapshot of 2025 wfigs data, to be used for 2026 testing purposes."""